@@ -12,24 +12,58 @@ class Settings(BaseSettings):
 
     app_name: str = Field(default="Tohum v1")
     debug: bool = Field(default=False)
+    startup_budget_seconds: float = Field(default=3.0)
+    warmup_models: bool = Field(default=True)
+    warmup_inference: bool = Field(default=False)
 
     sqlite_path: str = Field(default="data/memory.sqlite")
     sqlite_journal_mode: str = Field(default="WAL")
+    sqlite_synchronous: str = Field(default="NORMAL")
+    sqlite_cache_size_kib: int = Field(default=16384)
+    sqlite_mmap_size: int = Field(default=268435456)
+    sqlite_busy_timeout_ms: int = Field(default=5000)
+    sqlite_temp_store: str = Field(default="MEMORY")
+    session_cache_size: int = Field(default=10000)
+    message_durability: str = Field(default="sync")
+    message_flush_interval_ms: int = Field(default=50)
+    message_flush_max_rows: int = Field(default=256)
+    message_commit_timeout_seconds: float = Field(default=5.0)
 
     chroma_path: str = Field(default="data/embeddings")
     chroma_collection: str = Field(default="tohum_memory")
     chroma_top_k: int = Field(default=5)
+    chroma_upsert_batch_size: int = Field(default=1024)
+    vector_store: str = Field(default="chroma")
+    vector_store_path: str = Field(default="data/vectors")
+    vector_store_dtype: str = Field(default="float32")
+    vector_store_compact_ratio: float = Field(default=0.25)
+    vector_store_fsync: bool = Field(default=True)
+    vector_prefilter_max_selectivity: float = Field(default=0.2)
 
     embedding_model: str = Field(default="intfloat/multilingual-e5-small")
     embedding_fallback_model: str = Field(
         default="sentence-transformers/paraphrase-multilingual-MiniLM-L12-v2"
     )
+    embedding_backend: str = Field(default="sentence-transformers")
+    embedding_onnx_path: Optional[str] = Field(default=None)
+    embedding_onnx_file: str = Field(default="model_quantized.onnx")
+    embedding_onnx_threads: int = Field(default=0)
+    embedding_max_length: int = Field(default=512)
+    embedding_batch_size: int = Field(default=64)
+    embedding_cache_size: int = Field(default=4096)
+    embedding_cache_path: Optional[str] = Field(default=None)
 
     rank_bm25_k1: float = Field(default=1.5)
     rank_bm25_b: float = Field(default=0.75)
+    memory_search_mode: str = Field(default="hybrid")
+    rrf_k: int = Field(default=60)
 
     memory_chunk_size: int = Field(default=800)
     memory_chunk_overlap: int = Field(default=80)
+    memory_chunk_oversample: int = Field(default=3)
+    memory_batch_max_items: int = Field(default=5000)
+    search_cache_size: int = Field(default=1024)
+    search_cache_ttl_seconds: float = Field(default=300.0)
 
     cors_origins: List[str] = Field(default_factory=lambda: ["http://localhost:3000"])
 
@@ -39,11 +73,37 @@ class Settings(BaseSettings):
 
     whisper_device: str = Field(default="cpu", env="WHISPER_DEVICE")
     whisper_model: str = Field(default="base", env="WHISPER_MODEL")
+    stt_stream_window_seconds: float = Field(default=12.0)
+    stt_stream_commit_margin_seconds: float = Field(default=1.5)
+    stt_upload_step_seconds: float = Field(default=10.0)
+    stt_batch_enabled: bool = Field(default=False)
+    stt_batch_max_size: int = Field(default=8)
+    stt_batch_max_wait_ms: float = Field(default=5.0)
+
+    vad_enabled: bool = Field(default=True)
+    vad_frame_ms: int = Field(default=30)
+    vad_energy_threshold_db: float = Field(default=-45.0)
+    vad_zcr_threshold: float = Field(default=0.35)
+    vad_hangover_ms: int = Field(default=300)
+    vad_padding_ms: int = Field(default=200)
+
+    inference_decode_workers: int = Field(default=2)
+    inference_stt_workers: int = Field(
+        default_factory=lambda: max(1, min(4, os.cpu_count() or 1))
+    )
+    inference_tts_workers: int = Field(default=2)
+    inference_chat_workers: int = Field(default=2)
+    voice_queue_size: int = Field(default=32)
+    tts_stream_max_chars: int = Field(default=240)
+    tts_stream_prefetch: int = Field(default=2)
 
     tts_profile: str = Field(default="offline", env="TTS_PROFILE")
     tts_voice: str = Field(default="default", env="TTS_VOICE")
     piper_model_path: Optional[str] = Field(default=None, env="PIPER_MODEL_PATH")
     piper_speaker: Optional[str] = Field(default=None, env="PIPER_SPEAKER")
+    piper_workers: int = Field(default=2)
+    piper_request_timeout_seconds: float = Field(default=30.0)
+    piper_health_interval_seconds: float = Field(default=30.0)
     gtts_language: str = Field(default="tr", env="GTTS_LANGUAGE")
 
     # platform-bağımsız temp dizini
@@ -51,6 +111,8 @@ class Settings(BaseSettings):
         default_factory=lambda: os.path.join(gettempdir(), "tohum_audio")
     )
     audio_ttl_hours: int = Field(default=24)
+    tts_cache_max_bytes: int = Field(default=268435456)
+    tts_cache_sweep_seconds: float = Field(default=300.0)
 
     # ✅ parantez artık tam kapalı
     model_config = SettingsConfigDict(
@@ -66,6 +128,54 @@ class Settings(BaseSettings):
             return value
         return [origin.strip() for origin in value.split(",") if origin.strip()]
 
+    @field_validator("memory_search_mode")
+    @classmethod
+    def _validate_memory_search_mode(cls, value: str) -> str:
+        allowed = {"vector", "lexical", "hybrid"}
+        if value not in allowed:
+            raise ValueError(
+                f"MEMORY_SEARCH_MODE must be one of {', '.join(sorted(allowed))}"
+            )
+        return value
+
+    @field_validator("vector_store")
+    @classmethod
+    def _validate_vector_store(cls, value: str) -> str:
+        allowed = {"chroma", "flat"}
+        if value not in allowed:
+            raise ValueError(f"VECTOR_STORE must be one of {', '.join(sorted(allowed))}")
+        return value
+
+    @field_validator("vector_store_dtype")
+    @classmethod
+    def _validate_vector_store_dtype(cls, value: str) -> str:
+        allowed = {"float32", "float16"}
+        if value not in allowed:
+            raise ValueError(
+                f"VECTOR_STORE_DTYPE must be one of {', '.join(sorted(allowed))}"
+            )
+        return value
+
+    @field_validator("embedding_backend")
+    @classmethod
+    def _validate_embedding_backend(cls, value: str) -> str:
+        allowed = {"sentence-transformers", "onnx"}
+        if value not in allowed:
+            raise ValueError(
+                f"EMBEDDING_BACKEND must be one of {', '.join(sorted(allowed))}"
+            )
+        return value
+
+    @field_validator("message_durability")
+    @classmethod
+    def _validate_message_durability(cls, value: str) -> str:
+        allowed = {"sync", "group", "async"}
+        if value not in allowed:
+            raise ValueError(
+                f"MESSAGE_DURABILITY must be one of {', '.join(sorted(allowed))}"
+            )
+        return value
+
     @field_validator("tts_profile")
     @classmethod
     def _validate_tts_profile(cls, value: str) -> str:
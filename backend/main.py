@@ -1,14 +1,27 @@
 from __future__ import annotations
 
+import logging
+import time
+
+_IMPORT_STARTED = time.perf_counter()
+
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 
 from core.config import get_settings
 from routes.chat import router as chat_router
+from routes.chat import wait_for_pending_writes
 from routes.health import router as health_router
 from routes.memory import router as memory_router
 from routes.voice import router as voice_router
 from routes.voice_ws import router as voice_ws_router
+from services.executor import get_inference_executor
+from services.lifecycle import get_lifecycle
+from services.memory import get_memory_service, memory_service_loaded
+from services.stt import get_stt_service
+from services.tts import get_tts_service
+
+logger = logging.getLogger(__name__)
 
 settings = get_settings()
 
@@ -32,3 +45,37 @@ app.include_router(voice_ws_router)
 @app.get("/")
 def root() -> dict[str, bool]:
     return {"ok": True}
+
+
+@app.on_event("startup")
+def start_lifecycle() -> None:
+    lifecycle = get_lifecycle()
+    lifecycle.startup_seconds = round(time.perf_counter() - _IMPORT_STARTED, 3)
+    if lifecycle.startup_seconds > settings.startup_budget_seconds:
+        logger.warning(
+            "Startup took %.2fs, over the %.2fs budget",
+            lifecycle.startup_seconds,
+            settings.startup_budget_seconds,
+        )
+    if not settings.warmup_models:
+        return
+    # Models load in the background; /ready reports progress meanwhile.
+    lifecycle.register(
+        "memory", get_memory_service, warm_up=lambda: get_memory_service().warm_up()
+    )
+    lifecycle.register(
+        "stt", get_stt_service().load, warm_up=get_stt_service().warm_up
+    )
+    lifecycle.register("tts", get_tts_service().start_workers)
+    lifecycle.start(run_warm_up=settings.warmup_inference)
+
+
+@app.on_event("shutdown")
+async def shutdown_executors() -> None:
+    # Streamed chat replies are acknowledged before they are written, so let
+    # those writes finish while the executor and the database are still open.
+    await wait_for_pending_writes(settings.message_commit_timeout_seconds)
+    get_inference_executor().shutdown()
+    get_tts_service().close()
+    if memory_service_loaded():
+        get_memory_service().close()
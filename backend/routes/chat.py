@@ -1,14 +1,26 @@
 from __future__ import annotations
 
-from typing import Any, Dict, List, Optional
+import asyncio
+import json
+import logging
+import uuid
+from typing import Any, AsyncIterator, Dict, List, Optional, Set
 
 from fastapi import APIRouter, Depends, HTTPException
+from fastapi.responses import StreamingResponse
 from pydantic import BaseModel, Field
 
+from routes.utils import iterate_in_pool
 from services.chat import ChatService, get_chat_service
+from services.executor import InferenceExecutor, get_inference_executor
+
+logger = logging.getLogger(__name__)
 
 router = APIRouter(tags=["chat"])
 
+# Assistant-message writes still running after their stream has ended.
+_pending_writes: Set[asyncio.Task] = set()
+
 
 class ChatRequest(BaseModel):
     session_id: str = Field(..., description="Active chat session identifier")
@@ -47,3 +59,86 @@ def chat_endpoint(
         user_message_id=result.user_message_id,
         context=result.context,
     )
+
+
+@router.post("/chat/stream", summary="Create a chat turn streamed as Server-Sent Events")
+async def chat_stream_endpoint(
+    req: ChatRequest,
+    service: ChatService = Depends(get_chat_service),
+    executor: InferenceExecutor = Depends(get_inference_executor),
+) -> StreamingResponse:
+    """Stream a chat turn as ``context``, ``token``… and ``done`` events.
+
+    The user message is persisted while memory is searched, the context is
+    sent as soon as the search returns, and the assistant message is written
+    in the background after ``done``. Failures end the stream with an
+    ``error`` event.
+    """
+
+    return StreamingResponse(
+        _chat_events(req, service, executor),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+
+async def _chat_events(
+    req: ChatRequest, service: ChatService, executor: InferenceExecutor
+) -> AsyncIterator[str]:
+    persist = asyncio.ensure_future(
+        executor.run(
+            "chat", service.persist_user_message, req.session_id, req.message, req.user_id
+        )
+    )
+    try:
+        context = await executor.run(
+            "chat", service.retrieve_context, req.session_id, req.message
+        )
+        yield _sse("context", {"context": context})
+
+        user_message_id = await persist
+        tokens: List[str] = []
+        replies = service.iter_reply(req.session_id, req.message, context, mode=req.mode)
+        async for token in iterate_in_pool(executor, replies):
+            tokens.append(token)
+            yield _sse("token", {"text": token})
+    except Exception as exc:
+        logger.exception("Streaming chat turn failed for session %s", req.session_id)
+        yield _sse("error", {"detail": str(exc)})
+        return
+    finally:
+        if not persist.done():
+            persist.cancel()
+
+    reply = "".join(tokens)
+    message_id = str(uuid.uuid4())
+    task = asyncio.ensure_future(
+        executor.run("chat", service.persist_reply, req.session_id, reply, message_id)
+    )
+    _pending_writes.add(task)
+    task.add_done_callback(_finish_write)
+    yield _sse(
+        "done",
+        {"reply": reply, "message_id": message_id, "user_message_id": user_message_id},
+    )
+
+
+async def wait_for_pending_writes(timeout: Optional[float] = None) -> bool:
+    """Wait for background assistant-message writes; ``False`` on timeout."""
+
+    if not _pending_writes:
+        return True
+    _, pending = await asyncio.wait(set(_pending_writes), timeout=timeout)
+    if pending:
+        logger.error("%s streamed replies were not persisted before shutdown", len(pending))
+    return not pending
+
+
+def _finish_write(task: asyncio.Task) -> None:
+    _pending_writes.discard(task)
+    if not task.cancelled() and task.exception() is not None:
+        logger.error("Failed to persist streamed reply: %s", task.exception())
+
+
+def _sse(event: str, data: Dict[str, Any]) -> str:
+    return f"event: {event}\ndata: {json.dumps(data, ensure_ascii=False)}\n\n"
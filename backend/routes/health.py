@@ -7,7 +7,8 @@ from typing import Dict
 from fastapi import APIRouter
 
 from core.config import get_settings
-from services.memory import get_memory_service
+from services.lifecycle import get_lifecycle
+from services.memory import get_memory_service, memory_service_loaded
 from services.stt import get_stt_service
 from services.tts import get_tts_service
 
@@ -26,7 +27,8 @@ def ready() -> Dict[str, object]:
     ffmpeg_path = _which("ffmpeg")
     stt_service = get_stt_service()
     tts_service = get_tts_service()
-    memory_service = get_memory_service()
+    lifecycle = get_lifecycle()
+    models = lifecycle.status()
 
     sqlite_ok = _check_sqlite(settings.sqlite_path)
     chroma_ok = _check_chroma(settings.chroma_path)
@@ -46,23 +48,46 @@ def ready() -> Dict[str, object]:
         "ffmpeg": {"ok": ffmpeg_ok, "path": ffmpeg_path},
         "sqlite": {"ok": sqlite_ok, "path": settings.sqlite_path},
         "chroma": {"ok": chroma_ok, "path": settings.chroma_path},
-        "stt": {"ok": stt_ok, "profile": settings.whisper_model},
-        "tts": {"ok": tts_ok, "profile": settings.tts_profile, "details": tts_details},
+        "stt": {
+            "ok": stt_ok,
+            "profile": settings.whisper_model,
+            "batching": stt_service.batching_stats(),
+        },
+        "tts": {
+            "ok": tts_ok,
+            "profile": settings.tts_profile,
+            "details": tts_details,
+            "cache": tts_service.cache_stats(),
+            "piper_pool": tts_service.piper_pool_stats(),
+        },
         "env": {"ok": len(missing_env) == 0, "missing": missing_env},
         "audio_tmp": _check_audio_tmp(settings.audio_tmp_dir),
+        "models": models,
     }
 
-    try:
-        memory_service.list_memory_items(limit=1)
-        checks["memory_service"] = {"ok": True}
-    except Exception as exc:  # pragma: no cover - runtime guard
-        checks["memory_service"] = {"ok": False, "error": str(exc)}
+    # Never build the memory service here: that would block this probe on
+    # loading the embedding model.
+    if not memory_service_loaded():
+        memory_state = models["tasks"].get("memory", {}).get("state", "not_loaded")
+        checks["memory_service"] = {"ok": False, "state": memory_state}
+    else:
+        memory_service = get_memory_service()
+        try:
+            memory_service.list_memory_items(limit=1)
+            checks["memory_service"] = {
+                "ok": True,
+                "embedding_cache": memory_service.embedding_cache_stats(),
+                "search_cache": memory_service.search_cache_stats(),
+            }
+        except Exception as exc:  # pragma: no cover - runtime guard
+            checks["memory_service"] = {"ok": False, "error": str(exc)}
 
     checks["ready"] = (
         ffmpeg_ok
         and sqlite_ok
         and chroma_ok
         and tts_ok
+        and models["ready"]
         and len(missing_env) == 0
     )
     return checks
@@ -2,10 +2,11 @@ from __future__ import annotations
 
 from typing import Any, Dict, List, Optional
 
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, Depends, HTTPException, Response
 from pydantic import BaseModel, Field
 
-from services.memory import MemoryService, get_memory_service
+from core.config import get_settings
+from services.memory import IndexingError, MemoryService, get_memory_service
 
 router = APIRouter(prefix="/memory", tags=["memory"])
 
@@ -24,6 +25,18 @@ class RememberResponse(BaseModel):
     memory_id: str
 
 
+class RememberBatchRequest(BaseModel):
+    items: List[RememberRequest] = Field(..., min_length=1)
+
+
+class RememberBatchResponse(BaseModel):
+    memory_ids: List[str]
+    not_indexed: List[str] = Field(
+        default_factory=list,
+        description="Stored items that are not searchable yet because indexing failed",
+    )
+
+
 @router.get(
     "/{session_id}",
     summary="Fetch messages and memory items for a session",
@@ -64,3 +77,37 @@ def remember_endpoint(
     except Exception as exc:
         raise HTTPException(status_code=500, detail=str(exc)) from exc
     return RememberResponse(memory_id=memory_id)
+
+
+@router.post(
+    "/remember/batch",
+    response_model=RememberBatchResponse,
+    summary="Store many memory snippets in one batch",
+    status_code=201,
+)
+def remember_batch_endpoint(
+    payload: RememberBatchRequest,
+    response: Response,
+    service: MemoryService = Depends(get_memory_service),
+) -> RememberBatchResponse:
+    max_items = get_settings().memory_batch_max_items
+    if len(payload.items) > max_items:
+        raise HTTPException(
+            status_code=413,
+            detail=f"Batch exceeds the limit of {max_items} items.",
+        )
+    try:
+        with service.unit_of_work():
+            for session_id in {item.session_id for item in payload.items}:
+                if session_id:
+                    service.ensure_session(session_id)
+            memory_ids = service.remember_many(
+                item.model_dump() for item in payload.items
+            )
+    except IndexingError as exc:
+        # The items are stored; only search is missing them.
+        response.status_code = 207
+        return RememberBatchResponse(memory_ids=exc.memory_ids, not_indexed=exc.memory_ids)
+    except Exception as exc:
+        raise HTTPException(status_code=500, detail=str(exc)) from exc
+    return RememberBatchResponse(memory_ids=memory_ids)
@@ -1,14 +1,19 @@
 from __future__ import annotations
 
+import asyncio
+import io
 import subprocess
-from typing import Optional
+import threading
+import wave
+from typing import AsyncIterator, Iterator, List, Optional, Tuple
 
+from services.executor import InferenceExecutor
 
-def webm_to_pcm16(audio_bytes: bytes, sr: int = 16000) -> bytes:
-    """Convert WebM/Opus audio bytes to PCM16 mono using FFmpeg."""
 
-    command = [
+def _ffmpeg_pcm_command(sr: int, *input_args: str) -> List[str]:
+    return [
         "ffmpeg",
+        *input_args,
         "-i",
         "pipe:0",
         "-f",
@@ -22,8 +27,13 @@ def webm_to_pcm16(audio_bytes: bytes, sr: int = 16000) -> bytes:
         "-loglevel",
         "error",
     ]
+
+
+def webm_to_pcm16(audio_bytes: bytes, sr: int = 16000) -> bytes:
+    """Convert WebM/Opus audio bytes to PCM16 mono using FFmpeg."""
+
     process = subprocess.run(
-        command,
+        _ffmpeg_pcm_command(sr),
         input=audio_bytes,
         capture_output=True,
     )
@@ -32,3 +42,172 @@ def webm_to_pcm16(audio_bytes: bytes, sr: int = 16000) -> bytes:
             f"FFmpeg conversion failed: {process.stderr.decode('utf-8', errors='ignore')}"
         )
     return process.stdout
+
+
+def split_wav(payload: bytes) -> Tuple[bytes, Optional[int]]:
+    """Return ``(pcm, sample_rate)`` for a WAV payload, or ``(payload, None)``.
+
+    Only 16-bit mono WAV is unwrapped; any other payload is passed through
+    unchanged and treated as raw PCM16 by the caller. A malformed WAV raises
+    ``ValueError``.
+    """
+
+    if payload[:4] != b"RIFF" or payload[8:12] != b"WAVE":
+        return payload, None
+    try:
+        with wave.open(io.BytesIO(payload), "rb") as wav:
+            if wav.getsampwidth() != 2 or wav.getnchannels() != 1:
+                raise ValueError("Only 16-bit mono WAV audio is supported.")
+            return wav.readframes(wav.getnframes()), wav.getframerate()
+    except (wave.Error, EOFError) as exc:
+        raise ValueError(f"Malformed WAV audio: {exc}") from exc
+
+
+async def iterate_in_pool(
+    executor: InferenceExecutor, items: Iterator[str], pool: str = "chat"
+) -> AsyncIterator[str]:
+    """Drive a blocking iterator on an executor pool, yielding items as they come."""
+
+    loop = asyncio.get_running_loop()
+    queue: asyncio.Queue = asyncio.Queue()
+    stop = threading.Event()
+    end = object()
+
+    def pump() -> None:
+        try:
+            for item in items:
+                if stop.is_set():
+                    return
+                loop.call_soon_threadsafe(queue.put_nowait, item)
+        finally:
+            loop.call_soon_threadsafe(queue.put_nowait, end)
+
+    job = asyncio.ensure_future(executor.run(pool, pump))
+    try:
+        while (item := await queue.get()) is not end:
+            yield item
+        await job
+    finally:
+        stop.set()
+
+
+class StreamingPcmDecoder:
+    """Long-lived FFmpeg process turning a WebM/Opus stream into PCM16 mono.
+
+    MediaRecorder only emits the container header in its first chunk, so the
+    chunks of one recording are written to a single FFmpeg stdin and the
+    decoded audio is collected asynchronously from stdout. The process is
+    started lazily on the first chunk and must be finished or closed once the
+    recording ends.
+    """
+
+    def __init__(self, sr: int = 16000):
+        self.sample_rate = sr
+        self._process: Optional[asyncio.subprocess.Process] = None
+        self._stdout_task: Optional[asyncio.Task] = None
+        self._stderr_task: Optional[asyncio.Task] = None
+        self._output = bytearray()
+        self._stderr = bytearray()
+
+    @property
+    def running(self) -> bool:
+        return self._process is not None
+
+    async def start(self) -> None:
+        if self._process is not None:
+            return
+        try:
+            self._process = await asyncio.create_subprocess_exec(
+                *_ffmpeg_pcm_command(self.sample_rate, "-fflags", "nobuffer"),
+                stdin=asyncio.subprocess.PIPE,
+                stdout=asyncio.subprocess.PIPE,
+                stderr=asyncio.subprocess.PIPE,
+            )
+        except FileNotFoundError as exc:
+            raise RuntimeError("FFmpeg binary not found.") from exc
+        self._output.clear()
+        self._stderr.clear()
+        self._stdout_task = asyncio.create_task(
+            self._pump(self._process.stdout, self._output)
+        )
+        self._stderr_task = asyncio.create_task(
+            self._pump(self._process.stderr, self._stderr, keep=4096)
+        )
+
+    async def feed(self, chunk: bytes) -> None:
+        """Write an encoded chunk; decoded PCM is collected in the background."""
+
+        await self.start()
+        assert self._process is not None and self._process.stdin is not None
+        try:
+            self._process.stdin.write(chunk)
+            await self._process.stdin.drain()
+        except (BrokenPipeError, ConnectionResetError) as exc:
+            reason = self._stderr.decode("utf-8", errors="ignore").strip()
+            await self.close()
+            raise RuntimeError(f"FFmpeg decoder stopped: {reason}") from exc
+
+    def read_available(self) -> bytes:
+        usable = len(self._output) - len(self._output) % 2
+        data = bytes(self._output[:usable])
+        del self._output[:usable]
+        return data
+
+    async def finish(self) -> bytes:
+        """Close the input stream and return the remaining decoded PCM."""
+
+        process = self._process
+        if process is None:
+            return b""
+        if process.stdin is not None and not process.stdin.is_closing():
+            process.stdin.close()
+        await asyncio.gather(
+            *(task for task in (self._stdout_task, self._stderr_task) if task)
+        )
+        returncode = await process.wait()
+        self._reset_process()
+
+        data = self.read_available()
+        if returncode != 0 and not data:
+            raise RuntimeError(
+                "FFmpeg conversion failed: "
+                f"{self._stderr.decode('utf-8', errors='ignore').strip()}"
+            )
+        return data
+
+    async def close(self) -> None:
+        """Terminate the decoder and discard any buffered audio."""
+
+        process = self._process
+        if process is None:
+            return
+        if process.returncode is None:
+            process.kill()
+        for task in (self._stdout_task, self._stderr_task):
+            if task:
+                task.cancel()
+        try:
+            await process.wait()
+        except ProcessLookupError:  # pragma: no cover - already reaped
+            pass
+        self._reset_process()
+        self._output.clear()
+
+    def _reset_process(self) -> None:
+        self._process = None
+        self._stdout_task = None
+        self._stderr_task = None
+
+    @staticmethod
+    async def _pump(
+        stream: Optional[asyncio.StreamReader], sink: bytearray, keep: int = 0
+    ) -> None:
+        if stream is None:
+            return
+        while True:
+            data = await stream.read(65536)
+            if not data:
+                return
+            sink.extend(data)
+            if keep and len(sink) > keep:
+                del sink[: len(sink) - keep]
@@ -1,20 +1,35 @@
 from __future__ import annotations
 
+import asyncio
 import base64
 from typing import Any, Dict, Optional
 
-from fastapi import APIRouter, Depends, HTTPException
+import numpy as np
+
+from fastapi import APIRouter, Depends, File, Form, HTTPException, Query, Request, UploadFile
+from fastapi.responses import Response
 from pydantic import BaseModel, Field
 
-from services.stt import SpeechToTextService, get_stt_service
-from services.tts import TextToSpeechService, get_tts_service
+from routes.utils import StreamingPcmDecoder, split_wav
+from services.executor import InferenceExecutor, get_inference_executor
+from services.resample import StreamingResampler
+from services.stt import (
+    SpeechToTextService,
+    StreamingTranscriber,
+    get_stt_service,
+    pcm16_to_float32,
+)
+from services.tts import TextToSpeechService, TTSResult, get_tts_service
 
 router = APIRouter(prefix="/voice", tags=["voice"])
 
+AUDIO_MEDIA_TYPES = {"wav": "audio/wav", "mp3": "audio/mpeg"}
+RAW_PCM_CONTENT_TYPES = {"audio/l16", "audio/pcm", "application/octet-stream"}
+
 
 class TranscribeRequest(BaseModel):
     audio_base64: str = Field(..., description="Base64 encoded audio payload")
-    sample_rate: int = Field(default=16000, description="Audio sample rate")
+    sample_rate: int = Field(default=16000, gt=0, description="Audio sample rate")
     language: Optional[str] = Field(
         default=None, description="Force transcription language (e.g. 'tr')"
     )
@@ -68,6 +83,186 @@ def transcribe_endpoint(
     except Exception as exc:  # pragma: no cover - runtime guard
         raise HTTPException(status_code=500, detail="Transcription failed") from exc
 
+    return _transcribe_response(result)
+
+
+@router.post(
+    "/transcribe/raw",
+    response_model=TranscribeResponse,
+    summary="Speech-to-text from a raw PCM16 or WAV request body",
+)
+async def transcribe_raw_endpoint(
+    request: Request,
+    sample_rate: int = Query(default=16000, ge=1, description="Sample rate of raw PCM"),
+    language: Optional[str] = Query(default=None, description="Force language"),
+    stt: SpeechToTextService = Depends(get_stt_service),
+    executor: InferenceExecutor = Depends(get_inference_executor),
+) -> TranscribeResponse:
+    payload = await request.body()
+    return await _transcribe_binary(stt, executor, payload, sample_rate, language)
+
+
+@router.post(
+    "/transcribe/upload",
+    response_model=TranscribeResponse,
+    summary="Speech-to-text from a multipart PCM16 or WAV upload",
+)
+async def transcribe_upload_endpoint(
+    file: UploadFile = File(..., description="PCM16 mono or 16-bit mono WAV audio"),
+    sample_rate: int = Form(default=16000, ge=1),
+    language: Optional[str] = Form(default=None),
+    stt: SpeechToTextService = Depends(get_stt_service),
+    executor: InferenceExecutor = Depends(get_inference_executor),
+) -> TranscribeResponse:
+    payload = await file.read()
+    return await _transcribe_binary(stt, executor, payload, sample_rate, language)
+
+
+@router.post(
+    "/transcribe/stream",
+    response_model=TranscribeResponse,
+    summary="Speech-to-text that decodes and transcribes while the upload arrives",
+)
+async def transcribe_stream_endpoint(
+    request: Request,
+    sample_rate: int = Query(default=16000, ge=1, description="Sample rate of raw PCM"),
+    language: Optional[str] = Query(default=None, description="Force language"),
+    stt: SpeechToTextService = Depends(get_stt_service),
+    executor: InferenceExecutor = Depends(get_inference_executor),
+) -> TranscribeResponse:
+    """Transcribe a streamed request body.
+
+    ``audio/l16``, ``audio/pcm`` and ``application/octet-stream`` bodies are
+    raw PCM16 mono at ``sample_rate`` and are resampled in NumPy; any other
+    content type (WAV, WebM, Ogg, MP3, ...) is decoded to 16 kHz by FFmpeg.
+    Whenever ``stt_upload_step_seconds`` of new audio has arrived and the
+    previous pass is done, the streaming transcriber runs another pass, so
+    inference overlaps the upload and only the undecided tail stays in memory.
+    Reading pauses while more than ``stt_stream_window_seconds`` of audio waits
+    for a pass.
+    """
+
+    content_type = request.headers.get("content-type", "").split(";")[0].strip().lower()
+    source = _UploadPcmSource(
+        executor, raw=content_type in RAW_PCM_CONTENT_TYPES, sample_rate=sample_rate
+    )
+    transcriber = StreamingTranscriber(stt, sample_rate=16000, language=language)
+    step_bytes = int(stt.settings.stt_upload_step_seconds * 16000) * 2
+    # Past this much waiting audio the body is not read until the running pass
+    # finishes, so a client uploading faster than inference cannot grow it.
+    max_pending = max(step_bytes, int(stt.settings.stt_stream_window_seconds * 16000) * 2)
+    pending = bytearray()
+    inflight: Optional[asyncio.Future] = None
+    received = False
+
+    try:
+        async for chunk in request.stream():
+            if not chunk:
+                continue
+            received = True
+            pending += await source.feed(chunk)
+            if inflight is not None and (inflight.done() or len(pending) >= max_pending):
+                await inflight
+                inflight = None
+            if inflight is None and len(pending) >= step_bytes:
+                inflight = asyncio.ensure_future(
+                    executor.run("stt", transcriber.push, bytes(pending))
+                )
+                pending.clear()
+        if not received:
+            raise HTTPException(status_code=400, detail="Empty audio payload")
+        pending += await source.finish()
+        if inflight is not None:
+            await inflight
+            inflight = None
+        result = await executor.run("stt", transcriber.finalize, bytes(pending))
+    except RuntimeError as exc:
+        raise HTTPException(status_code=503, detail=str(exc)) from exc
+    finally:
+        if inflight is not None:
+            inflight.cancel()
+        await source.close()
+
+    return _transcribe_response(result)
+
+
+class _UploadPcmSource:
+    """Turns streamed upload chunks into 16 kHz PCM16 mono."""
+
+    def __init__(self, executor: InferenceExecutor, *, raw: bool, sample_rate: int):
+        self._executor = executor
+        self._decoder = None if raw else StreamingPcmDecoder(sr=16000)
+        self._resampler = StreamingResampler(sample_rate, 16000) if raw else None
+        self._carry = b""
+
+    async def feed(self, chunk: bytes) -> bytes:
+        if self._decoder is not None:
+            await self._decoder.feed(chunk)
+            return self._decoder.read_available()
+        assert self._resampler is not None
+        data = self._carry + chunk
+        usable = len(data) - len(data) % 2
+        self._carry = data[usable:]
+        if self._resampler.passthrough:
+            return data[:usable]
+        return await self._executor.run("decode", self._resample, data[:usable])
+
+    async def finish(self) -> bytes:
+        if self._decoder is not None:
+            return await self._decoder.finish()
+        assert self._resampler is not None
+        if self._resampler.passthrough:
+            return b""
+        return await self._executor.run("decode", self._flush_resampler)
+
+    def _resample(self, pcm: bytes) -> bytes:
+        assert self._resampler is not None
+        if not pcm:
+            return pcm
+        return _float32_to_pcm16(self._resampler.push(pcm16_to_float32(pcm)))
+
+    def _flush_resampler(self) -> bytes:
+        assert self._resampler is not None
+        return _float32_to_pcm16(self._resampler.finish())
+
+    async def close(self) -> None:
+        if self._decoder is not None:
+            await self._decoder.close()
+
+
+def _float32_to_pcm16(audio: np.ndarray) -> bytes:
+    return (np.clip(audio, -1.0, 1.0) * 32767.0).astype("<i2").tobytes()
+
+
+async def _transcribe_binary(
+    stt: SpeechToTextService,
+    executor: InferenceExecutor,
+    payload: bytes,
+    sample_rate: int,
+    language: Optional[str],
+) -> TranscribeResponse:
+    if not payload:
+        raise HTTPException(status_code=400, detail="Empty audio payload")
+    try:
+        pcm, wav_rate = split_wav(payload)
+    except ValueError as exc:
+        raise HTTPException(status_code=400, detail=str(exc)) from exc
+    try:
+        result = await executor.run(
+            "stt",
+            stt.transcribe,
+            pcm,
+            sample_rate=wav_rate or sample_rate,
+            language=language,
+        )
+    except RuntimeError as exc:
+        raise HTTPException(status_code=503, detail=str(exc)) from exc
+    except Exception as exc:  # pragma: no cover - runtime guard
+        raise HTTPException(status_code=500, detail="Transcription failed") from exc
+    return _transcribe_response(result)
+
+
+def _transcribe_response(result: Dict[str, Any]) -> TranscribeResponse:
     return TranscribeResponse(
         text=result["text"],
         language=result.get("language"),
@@ -85,8 +280,37 @@ def synthesize_endpoint(
     request: SynthesizeRequest,
     tts: TextToSpeechService = Depends(get_tts_service),
 ) -> SynthesizeResponse:
+    result = _synthesize(tts, request)
+    audio_base64 = base64.b64encode(result.audio).decode("utf-8")
+    return SynthesizeResponse(
+        audio_base64=audio_base64,
+        format=result.format,
+        sample_rate=result.sample_rate,
+        filename=result.filename,
+    )
+
+
+@router.post(
+    "/synthesize/audio",
+    response_class=Response,
+    responses={200: {"content": {"audio/wav": {}, "audio/mpeg": {}}}},
+    summary="Text-to-speech synthesis returning the audio bytes directly",
+)
+def synthesize_audio_endpoint(
+    request: SynthesizeRequest,
+    tts: TextToSpeechService = Depends(get_tts_service),
+) -> Response:
+    result = _synthesize(tts, request)
+    return Response(
+        content=result.audio,
+        media_type=AUDIO_MEDIA_TYPES.get(result.format, "application/octet-stream"),
+        headers={"X-Sample-Rate": str(result.sample_rate)},
+    )
+
+
+def _synthesize(tts: TextToSpeechService, request: SynthesizeRequest) -> TTSResult:
     try:
-        result = tts.synthesize(
+        return tts.synthesize(
             request.text,
             voice=request.voice,
             lang=request.language,
@@ -95,11 +319,3 @@ def synthesize_endpoint(
         raise HTTPException(status_code=503, detail=str(exc)) from exc
     except Exception as exc:  # pragma: no cover - runtime guard
         raise HTTPException(status_code=500, detail="Synthesis failed") from exc
-
-    audio_base64 = base64.b64encode(result.audio).decode("utf-8")
-    return SynthesizeResponse(
-        audio_base64=audio_base64,
-        format=result.format,
-        sample_rate=result.sample_rate,
-        filename=result.filename,
-    )
@@ -1,128 +1,487 @@
 from __future__ import annotations
 
+import asyncio
 import base64
 import json
+import logging
+import struct
+import uuid
+from typing import Any, AsyncIterator, Dict, Iterable, Iterator, List, Optional, Tuple, Union
 
 from fastapi import APIRouter, Depends, WebSocket, WebSocketDisconnect
 
-from routes.utils import webm_to_pcm16
-from services.stt import SpeechToTextService, get_stt_service
-from services.tts import TextToSpeechService, get_tts_service
+from routes.utils import StreamingPcmDecoder, iterate_in_pool
+from services.chat import get_chat_service
+from services.chunking import iter_chunks, iter_sentences
+from services.executor import InferenceExecutor, get_inference_executor
+from services.stt import SpeechToTextService, StreamingTranscriber, get_stt_service
+from services.tts import TextToSpeechService, TTSResult, get_tts_service
+from services.vad import StreamingVAD
+
+logger = logging.getLogger(__name__)
 
 router = APIRouter(prefix="/ws", tags=["voice-ws"])
 
+SttJob = Tuple[str, Optional[StreamingPcmDecoder]]
+
+# Binary TTS frame header (network byte order), followed by the audio bytes:
+# magic b"TS", version, format code, chunk index (uint16), sample rate (uint32).
+TTS_FRAME_HEADER = struct.Struct("!2sBBHI")
+TTS_FRAME_MAGIC = b"TS"
+TTS_FRAME_VERSION = 1
+TTS_FRAME_FORMATS = {"wav": 1, "mp3": 2}
+
+# First bytes of every WebM recording (the EBML header element id).
+EBML_MAGIC = b"\x1a\x45\xdf\xa3"
+
 
 @router.websocket("/voice")
 async def voice_socket(
     websocket: WebSocket,
     stt: SpeechToTextService = Depends(get_stt_service),
     tts: TextToSpeechService = Depends(get_tts_service),
+    executor: InferenceExecutor = Depends(get_inference_executor),
 ) -> None:
     await websocket.accept()
-    buffer = bytearray()
+    session = VoiceSession(websocket, stt, tts, executor)
+    session.start()
 
     try:
-        await websocket.send_json({"type": "ready"})
+        await session.send({"type": "ready"})
         while True:
             message = await websocket.receive()
+            if message.get("type") == "websocket.disconnect":
+                return
             if chunk := message.get("bytes"):
-                await _handle_audio_chunk(websocket, chunk, buffer, stt)
+                await session.on_audio(chunk)
             else:
                 text_data = message.get("text")
                 if text_data is None:
                     continue
-                await _handle_text_command(websocket, text_data, buffer, stt, tts)
+                await session.on_text(text_data)
     except WebSocketDisconnect:
         return
+    finally:
+        await session.close()
 
 
-async def _handle_audio_chunk(
-    websocket: WebSocket,
-    chunk: bytes,
-    buffer: bytearray,
-    stt: SpeechToTextService,
-) -> None:
-    try:
-        pcm = webm_to_pcm16(chunk, sr=16000)
-    except RuntimeError as exc:
-        await websocket.send_json({"type": "error", "reason": str(exc)})
-        return
+class VoiceSession:
+    """Per-connection voice state with ordered STT and TTS work queues.
 
-    buffer.extend(pcm)
-    try:
-        result = stt.transcribe(bytes(buffer), sample_rate=16000)
-    except RuntimeError as exc:
-        await websocket.send_json({"type": "error", "reason": str(exc)})
-        return
+    The receive loop only feeds the FFmpeg decoder and enqueues work, so a slow
+    transcription never blocks reading the socket. Blocking inference runs on
+    the shared :class:`InferenceExecutor` pools.
 
-    await websocket.send_json(
-        {
-            "type": "partial",
-            "text": result.get("text", ""),
-            "language": result.get("language"),
-        }
-    )
+    In turn mode (enabled with a ``turn`` command) every non-empty ``final``
+    is also answered on the server: the transcript goes through the chat
+    service, the reply is spoken as ``tts_chunk``s while it is produced and
+    then sent as ``reply``.
+    Turns run on the TTS queue, so the next utterance is transcribed while
+    the previous one is still being answered.
+    """
 
+    def __init__(
+        self,
+        websocket: WebSocket,
+        stt: SpeechToTextService,
+        tts: TextToSpeechService,
+        executor: InferenceExecutor,
+    ):
+        self.websocket = websocket
+        self.tts = tts
+        self.executor = executor
+        self.transcriber = StreamingTranscriber(stt, sample_rate=16000)
+        self.decoder = StreamingPcmDecoder(sr=16000)
+        self.vad = (
+            StreamingVAD(executor.settings, sample_rate=16000)
+            if executor.settings.vad_enabled
+            else None
+        )
 
-async def _handle_text_command(
-    websocket: WebSocket,
-    payload: str,
-    buffer: bytearray,
-    stt: SpeechToTextService,
-    tts: TextToSpeechService,
-) -> None:
-    try:
-        message = json.loads(payload)
-    except json.JSONDecodeError:
-        await websocket.send_json(
-            {"type": "error", "reason": "Invalid JSON payload received."}
+        queue_size = executor.settings.voice_queue_size
+        self._stt_jobs: asyncio.Queue[SttJob] = asyncio.Queue(maxsize=queue_size)
+        self._tts_jobs: asyncio.Queue[Dict[str, Any]] = asyncio.Queue(
+            maxsize=queue_size
         )
-        return
+        self._audio_pending = False
+        self._webm = False
+        self._turn: Optional[Dict[str, Any]] = None
+        self._send_lock = asyncio.Lock()
+        self._workers: List[asyncio.Task] = []
+
+    def start(self) -> None:
+        self._workers = [
+            asyncio.create_task(self._run(self._stt_jobs, self._handle_stt_job)),
+            asyncio.create_task(self._run(self._tts_jobs, self._handle_tts_job)),
+        ]
+
+    async def close(self) -> None:
+        for worker in self._workers:
+            worker.cancel()
+        await asyncio.gather(*self._workers, return_exceptions=True)
+        await self._discard_stt_jobs()
+        await self.decoder.close()
+
+    async def send(self, payload: Dict[str, Any]) -> None:
+        async with self._send_lock:
+            await self.websocket.send_json(payload)
 
-    command = message.get("type")
-    if command == "flush":
-        if not buffer:
-            await websocket.send_json({"type": "final", "text": "", "language": None})
+    async def send_audio(
+        self, result: TTSResult, *, binary: bool, index: Optional[int] = None, **fields: Any
+    ) -> None:
+        """Send synthesized audio as a binary frame or as a base64 JSON message."""
+
+        if binary:
+            header = TTS_FRAME_HEADER.pack(
+                TTS_FRAME_MAGIC,
+                TTS_FRAME_VERSION,
+                TTS_FRAME_FORMATS.get(result.format, 0),
+                index or 0,
+                result.sample_rate,
+            )
+            async with self._send_lock:
+                await self.websocket.send_bytes(header + result.audio)
+            return
+        payload: Dict[str, Any] = {"type": "tts" if index is None else "tts_chunk"}
+        if index is not None:
+            payload["index"] = index
+        payload.update(fields)
+        payload.update(
+            {
+                "audio_base64": base64.b64encode(result.audio).decode("utf-8"),
+                "format": result.format,
+                "sample_rate": result.sample_rate,
+            }
+        )
+        await self.send(payload)
+
+    async def send_error(self, reason: str) -> None:
+        await self.send({"type": "error", "reason": reason})
+
+    # ------------------------------------------------------------------
+    # Inbound messages
+    # ------------------------------------------------------------------
+    async def on_audio(self, chunk: bytes) -> None:
+        if chunk.startswith(EBML_MAGIC):
+            self._webm = True
+            if self.decoder.running:
+                # A new recording began without a flush: finish the old one.
+                await self._start_flush()
+        elif self._webm and not self.decoder.running:
+            # The tail of a recording that was already flushed; without its
+            # header it would corrupt the next recording's decoder.
             return
         try:
-            result = stt.transcribe(bytes(buffer), sample_rate=16000)
+            await self.decoder.feed(chunk)
         except RuntimeError as exc:
-            await websocket.send_json({"type": "error", "reason": str(exc)})
+            await self.send_error(str(exc))
+            return
+        # One queued partial per decoder is enough: it picks up all PCM
+        # decoded by the time it runs.
+        if not self._audio_pending:
+            self._audio_pending = True
+            await self._stt_jobs.put(("audio", self.decoder))
+
+    async def on_text(self, payload: str) -> None:
+        try:
+            message = json.loads(payload)
+        except json.JSONDecodeError:
+            await self.send_error("Invalid JSON payload received.")
+            return
+
+        command = message.get("type")
+        if command == "flush":
+            await self._start_flush()
+        elif command == "reset":
+            await self._discard_stt_jobs()
+            await self.decoder.close()
+            self._audio_pending = False
+            await self._stt_jobs.put(("reset", None))
+        elif command == "speak":
+            await self._tts_jobs.put(message)
+        elif command == "turn":
+            await self._configure_turn(message)
+        else:
+            await self.send_error(f"Unknown command: {command}")
+
+    async def _start_flush(self) -> None:
+        decoder, self.decoder = self.decoder, StreamingPcmDecoder(sr=16000)
+        self._audio_pending = False
+        await self._stt_jobs.put(("flush", decoder))
+
+    async def _configure_turn(self, message: Dict[str, Any]) -> None:
+        if not message.get("enabled", True):
+            self._turn = None
+            await self.send({"type": "turn", "enabled": False})
+            return
+        session_id = message.get("session_id")
+        if not session_id:
+            await self.send_error("Missing 'session_id' for turn mode.")
+            return
+        self._turn = {
+            "session_id": session_id,
+            "user_id": message.get("user_id"),
+            "voice": message.get("voice"),
+            "language": message.get("language"),
+            "binary": bool(message.get("binary", False)),
+            "speak": bool(message.get("speak", True)),
+        }
+        await self.send({"type": "turn", "enabled": True, "session_id": session_id})
+
+    # ------------------------------------------------------------------
+    # Workers
+    # ------------------------------------------------------------------
+    async def _run(self, queue: asyncio.Queue, handler) -> None:
+        while True:
+            job = await queue.get()
+            try:
+                await handler(job)
+            except RuntimeError as exc:
+                await self._report_job_error(str(exc))
+            except Exception as exc:
+                logger.exception("Voice job failed")
+                await self._report_job_error(f"{type(exc).__name__}: {exc}")
+            finally:
+                queue.task_done()
+
+    async def _report_job_error(self, reason: str) -> None:
+        # A failed job must not take the worker down with it, even when the
+        # error report itself cannot be delivered.
+        try:
+            await self.send_error(reason)
+        except Exception:
+            logger.debug("Could not report voice job error: %s", reason)
+
+    async def _discard_stt_jobs(self) -> None:
+        while not self._stt_jobs.empty():
+            kind, decoder = self._stt_jobs.get_nowait()
+            self._stt_jobs.task_done()
+            if kind == "flush" and decoder is not None:
+                await decoder.close()
+
+    async def _handle_stt_job(self, job: SttJob) -> None:
+        kind, decoder = job
+        if kind == "audio" and decoder is not None:
+            await self._transcribe_partial(decoder)
+        elif kind == "flush" and decoder is not None:
+            await self._flush(decoder)
+        elif kind == "reset":
+            self.transcriber.reset()
+            if self.vad is not None:
+                self.vad.reset()
+            await self.send({"type": "reset"})
+
+    async def _filter_speech(self, pcm: bytes) -> bytes:
+        """Drop silence before it reaches Whisper and report VAD transitions."""
+
+        if self.vad is None or not pcm:
+            return pcm
+        speech, events = self.vad.process(pcm)
+        for event in events:
+            await self.send({"type": "vad", **event})
+        return speech
+
+    async def _transcribe_partial(self, decoder: StreamingPcmDecoder) -> None:
+        if decoder is self.decoder:
+            self._audio_pending = False
+        pcm = await self._filter_speech(decoder.read_available())
+        if not pcm:
             return
-        buffer.clear()
-        await websocket.send_json(
+
+        result = await self.executor.run("stt", self.transcriber.push, pcm)
+        await self.send(
             {
-                "type": "final",
+                "type": "partial",
                 "text": result.get("text", ""),
+                "committed": result.get("committed", ""),
                 "language": result.get("language"),
             }
         )
-    elif command == "reset":
-        buffer.clear()
-        await websocket.send_json({"type": "reset"})
-    elif command == "speak":
-        text = message.get("text")
-        if not text:
-            await websocket.send_json(
-                {"type": "error", "reason": "Missing 'text' for speak command."}
-            )
+
+    async def _flush(self, decoder: StreamingPcmDecoder) -> None:
+        try:
+            pcm = await self._filter_speech(await decoder.finish())
+        except RuntimeError:
+            self.transcriber.reset()
+            raise
+        finally:
+            if self.vad is not None:
+                self.vad.reset()
+        if not pcm and not self.transcriber.has_audio():
+            await self.send({"type": "final", "text": "", "language": None})
             return
-        voice = message.get("voice")
-        language = message.get("language")
         try:
-            result = tts.synthesize(text, voice=voice, lang=language)
-        except RuntimeError as exc:
-            await websocket.send_json({"type": "error", "reason": str(exc)})
+            result = await self.executor.run("stt", self.transcriber.finalize, pcm)
+        except RuntimeError:
+            self.transcriber.reset()
+            raise
+        text = result.get("text", "")
+        await self.send(
+            {
+                "type": "final",
+                "text": text,
+                "language": result.get("language"),
+            }
+        )
+        if self._turn is not None and text.strip():
+            await self._tts_jobs.put(
+                {
+                    "type": "turn",
+                    "text": text.strip(),
+                    "language": result.get("language"),
+                    "config": dict(self._turn),
+                }
+            )
+
+    async def _handle_tts_job(self, message: Dict[str, Any]) -> None:
+        if message.get("type") == "turn":
+            await self._run_turn(message)
+        else:
+            await self._handle_speak(message)
+
+    async def _run_turn(self, job: Dict[str, Any]) -> None:
+        """Answer a transcript, speaking each sentence as soon as it is complete.
+
+        Reply tokens are split into sentences on the chat pool while earlier
+        sentences synthesize, so the first audio does not wait for the whole
+        reply. ``reply`` is sent once the reply has been produced and stored.
+        """
+
+        config = job["config"]
+        session_id, text = config["session_id"], job["text"]
+        chat = get_chat_service()
+        tokens: List[str] = []
+
+        def recorded(items: Iterator[str]) -> Iterator[str]:
+            for token in items:
+                tokens.append(token)
+                yield token
+
+        try:
+            user_message_id = await self.executor.run(
+                "chat", chat.persist_user_message, session_id, text, config["user_id"]
+            )
+            context = await self.executor.run("chat", chat.retrieve_context, session_id, text)
+            replies = recorded(chat.iter_reply(session_id, text, context, mode="voice"))
+            if config["speak"]:
+                segments = _speech_segments(
+                    replies, self.executor.settings.tts_stream_max_chars
+                )
+                await self._speak_segments(
+                    iterate_in_pool(self.executor, segments),
+                    voice=config["voice"],
+                    language=config["language"] or job.get("language"),
+                    binary=config["binary"],
+                )
+            else:
+                await self.executor.run("chat", list, replies)
+            reply = "".join(tokens)
+            message_id = await self.executor.run(
+                "chat", chat.persist_reply, session_id, reply, str(uuid.uuid4())
+            )
+        except Exception as exc:
+            logger.exception("Voice turn failed for session %s", session_id)
+            await self.send_error(f"Chat failed: {exc}")
             return
-        await websocket.send_json(
+
+        await self.send(
             {
-                "type": "tts",
-                "audio_base64": base64.b64encode(result.audio).decode("utf-8"),
-                "format": result.format,
-                "sample_rate": result.sample_rate,
+                "type": "reply",
+                "text": reply,
+                "message_id": message_id,
+                "user_message_id": user_message_id,
+                "context": context,
             }
         )
-    else:
-        await websocket.send_json(
-            {"type": "error", "reason": f"Unknown command: {command}"}
+
+    async def _handle_speak(self, message: Dict[str, Any]) -> None:
+        text = message.get("text")
+        if not text:
+            await self.send_error("Missing 'text' for speak command.")
+            return
+        voice = message.get("voice")
+        language = message.get("language")
+        binary = bool(message.get("binary", False))
+        # Sentence streaming is opt-in; by default the reply is one audio message.
+        if message.get("stream", False):
+            await self._stream_speech(text, voice=voice, language=language, binary=binary)
+            return
+
+        result = await self.executor.run(
+            "tts", self.tts.synthesize, text, voice=voice, lang=language
         )
+        await self.send_audio(result, binary=binary)
+
+    async def _stream_speech(
+        self,
+        text: str,
+        *,
+        voice: Optional[str],
+        language: Optional[str],
+        binary: bool = False,
+    ) -> None:
+        """Synthesize ``text`` sentence by sentence as ordered ``tts_chunk``s."""
+
+        async def segments() -> AsyncIterator[str]:
+            for segment in _speech_segments(text, self.executor.settings.tts_stream_max_chars):
+                yield segment
+
+        await self._speak_segments(segments(), voice=voice, language=language, binary=binary)
+
+    async def _speak_segments(
+        self,
+        segments: AsyncIterator[str],
+        *,
+        voice: Optional[str],
+        language: Optional[str],
+        binary: bool = False,
+    ) -> None:
+        """Synthesize segments as they arrive and send ordered ``tts_chunk``s.
+
+        Up to ``tts_stream_prefetch`` segments synthesize ahead while earlier
+        ones are being sent, so the first audio only waits for the first
+        sentence. A failing segment source ends the speech with its error.
+        """
+
+        slots = asyncio.Semaphore(max(1, self.executor.settings.tts_stream_prefetch))
+        ready: asyncio.Queue = asyncio.Queue()
+
+        async def schedule() -> None:
+            try:
+                async for segment in segments:
+                    await slots.acquire()
+                    task = asyncio.ensure_future(
+                        self.executor.run(
+                            "tts", self.tts.synthesize, segment, voice=voice, lang=language
+                        )
+                    )
+                    ready.put_nowait((segment, task))
+            finally:
+                ready.put_nowait(None)
+
+        scheduler = asyncio.ensure_future(schedule())
+        index = 0
+        try:
+            while (item := await ready.get()) is not None:
+                segment, task = item
+                result = await task
+                slots.release()
+                await self.send_audio(result, binary=binary, index=index, text=segment)
+                index += 1
+            await scheduler
+        finally:
+            scheduler.cancel()
+            while not ready.empty():
+                item = ready.get_nowait()
+                if item is not None:
+                    item[1].cancel()
+        await self.send({"type": "tts_end", "chunks": index})
+
+
+def _speech_segments(source: Union[str, Iterable[str]], max_chars: int) -> Iterator[str]:
+    for sentence in iter_sentences(source):
+        if len(sentence) > max_chars:
+            # Long run-on sentences are cut on word boundaries.
+            yield from iter_chunks(sentence, max_chars)
+        else:
+            yield sentence
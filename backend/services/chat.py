@@ -1,14 +1,18 @@
 from __future__ import annotations
 
 import logging
+import re
 from dataclasses import dataclass
-from typing import Any, Dict, List, Optional
+from typing import Any, Dict, Iterator, List, Optional
 
 from core.config import Settings, get_settings
 from services.memory import MemoryService, get_memory_service
 
 logger = logging.getLogger(__name__)
 
+# A word plus the whitespace after it; the unit reply tokens are streamed in.
+_REPLY_TOKEN = re.compile(r"\S+\s*|\s+")
+
 
 @dataclass
 class ChatResponse:
@@ -37,35 +41,28 @@ class ChatService:
         mode: str = "text",
         user_id: Optional[str] = None,
     ) -> ChatResponse:
-        self.memory.ensure_session(session_id, user_id)
-        user_message_id = self.memory.append_message(
-            session_id=session_id,
-            role="user",
-            text=message,
-        )
-
         intent = self._detect_intent(message)
-        if intent == "remember":
-            payload, tags = self._extract_memory_payload(message)
-            memory_id = self.memory.remember(
-                payload,
-                tags=tags,
+        context = self.retrieve_context(session_id, message)
+
+        # Produce the reply before taking the writer lock. A ``remember`` reply
+        # names the stored item, so its insert has to run inside the block.
+        reply = None if intent == "remember" else self._generate_reply(message, context)
+
+        # All writes of the turn share one transaction and a single commit.
+        with self.memory.unit_of_work():
+            self.memory.ensure_session(session_id, user_id)
+            user_message_id = self.memory.append_message(
                 session_id=session_id,
-                metadata={"source": "user", "mode": mode},
+                role="user",
+                text=message,
             )
-            reply = f"Not ettim ({memory_id[:8]}…). Başka ne ekleyelim?"
-            context: List[Dict[str, Any]] = []
-        else:
-            context = self.memory.search_memory(
-                message, session_id=session_id, limit=5
+            if reply is None:
+                reply = self._remember_reply(session_id, message, mode)
+            assistant_message_id = self.memory.append_message(
+                session_id=session_id,
+                role="assistant",
+                text=reply,
             )
-            reply = self._generate_reply(message, context)
-
-        assistant_message_id = self.memory.append_message(
-            session_id=session_id,
-            role="assistant",
-            text=reply,
-        )
         return ChatResponse(
             reply=reply,
             message_id=assistant_message_id,
@@ -73,9 +70,61 @@ class ChatService:
             user_message_id=user_message_id,
         )
 
+    # ------------------------------------------------------------------
+    # Streaming turn steps
+    # ------------------------------------------------------------------
+    def retrieve_context(self, session_id: str, message: str) -> List[Dict[str, Any]]:
+        if self._detect_intent(message) == "remember":
+            return []
+        return self.memory.search_memory(message, session_id=session_id, limit=5)
+
+    def persist_user_message(
+        self, session_id: str, message: str, user_id: Optional[str] = None
+    ) -> str:
+        with self.memory.unit_of_work():
+            self.memory.ensure_session(session_id, user_id)
+            return self.memory.append_message(
+                session_id=session_id, role="user", text=message
+            )
+
+    def iter_reply(
+        self,
+        session_id: str,
+        message: str,
+        context: List[Dict[str, Any]],
+        *,
+        mode: str = "text",
+    ) -> Iterator[str]:
+        """Yield the reply token by token.
+
+        The session must already exist, since a ``remember`` turn stores the
+        memory item before answering.
+        """
+
+        if self._detect_intent(message) == "remember":
+            reply = self._remember_reply(session_id, message, mode)
+        else:
+            reply = self._generate_reply(message, context)
+        yield from _REPLY_TOKEN.findall(reply)
+
+    def persist_reply(self, session_id: str, reply: str, message_id: str) -> str:
+        return self.memory.append_message(
+            session_id=session_id, role="assistant", text=reply, message_id=message_id
+        )
+
     # ------------------------------------------------------------------
     # Helpers
     # ------------------------------------------------------------------
+    def _remember_reply(self, session_id: str, message: str, mode: str) -> str:
+        payload, tags = self._extract_memory_payload(message)
+        memory_id = self.memory.remember(
+            payload,
+            tags=tags,
+            session_id=session_id,
+            metadata={"source": "user", "mode": mode},
+        )
+        return f"Not ettim ({memory_id[:8]}…). Başka ne ekleyelim?"
+
     def _detect_intent(self, message: str) -> str:
         normalized = message.strip().lower()
         triggers = ("hatırla:", "hatirla:", "remember:")
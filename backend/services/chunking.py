@@ -0,0 +1,112 @@
+from __future__ import annotations
+
+import re
+from collections import deque
+from typing import Deque, Iterable, Iterator, List, TypeVar, Union
+
+T = TypeVar("T")
+
+# A sentence ends at . ! ? or … followed by whitespace, or at a blank line.
+_SENTENCE_BREAK = re.compile(r"(?<=[.!?…])\s+|\n\s*\n")
+
+
+def iter_sentences(source: Union[str, Iterable[str]]) -> Iterator[str]:
+    """Yield sentences from a string or from an iterable of text pieces.
+
+    Pieces (for example lines of a file) are buffered only until the next
+    sentence boundary, so the whole input never has to be held in memory.
+    """
+
+    pieces = [source] if isinstance(source, str) else source
+    buffer = ""
+    for piece in pieces:
+        buffer += piece
+        start = 0
+        for match in _SENTENCE_BREAK.finditer(buffer):
+            sentence = buffer[start : match.start()].strip()
+            if sentence:
+                yield sentence
+            start = match.end()
+        buffer = buffer[start:]
+    tail = buffer.strip()
+    if tail:
+        yield tail
+
+
+def _split_long(sentence: str, size: int, overlap: int) -> Iterator[str]:
+    words = sentence.split()
+    window: List[str] = []
+    length = 0
+    for word in words:
+        if window and length + len(word) + 1 > size:
+            yield " ".join(window)
+            # Carry over trailing words up to ``overlap`` characters.
+            carried: List[str] = []
+            carried_length = 0
+            for previous in reversed(window):
+                if carried_length + len(previous) + 1 > overlap:
+                    break
+                carried.insert(0, previous)
+                carried_length += len(previous) + 1
+            window, length = carried, carried_length
+        window.append(word)
+        length += len(word) + 1
+    if window:
+        yield " ".join(window)
+
+
+def iter_chunks(
+    source: Union[str, Iterable[str]], chunk_size: int, overlap: int = 0
+) -> Iterator[str]:
+    """Group sentences into chunks of at most ``chunk_size`` characters.
+
+    Consecutive chunks share trailing sentences worth up to ``overlap``
+    characters. Sentences longer than ``chunk_size`` are split on word
+    boundaries.
+    """
+
+    chunk_size = max(chunk_size, 1)
+    overlap = max(0, min(overlap, chunk_size // 2))
+    current: Deque[str] = deque()
+    length = 0
+    has_new = False
+
+    for sentence in iter_sentences(source):
+        parts = (
+            _split_long(sentence, chunk_size, overlap)
+            if len(sentence) > chunk_size
+            else (sentence,)
+        )
+        for part in parts:
+            if current and length + len(part) + 1 > chunk_size:
+                yield " ".join(current)
+                has_new = False
+                kept = 0
+                carried: Deque[str] = deque()
+                for previous in reversed(current):
+                    if kept + len(previous) + 1 > overlap:
+                        break
+                    carried.appendleft(previous)
+                    kept += len(previous) + 1
+                current, length = carried, kept
+                while current and length + len(part) + 1 > chunk_size:
+                    length -= len(current.popleft()) + 1
+            current.append(part)
+            length += len(part) + 1
+            has_new = True
+
+    if current and has_new:
+        yield " ".join(current)
+
+
+def batched(items: Iterable[T], size: int) -> Iterator[List[T]]:
+    """Yield lists of up to ``size`` items from any iterable."""
+
+    batch: List[T] = []
+    for item in items:
+        batch.append(item)
+        if len(batch) >= size:
+            yield batch
+            batch = []
+    if batch:
+        yield batch
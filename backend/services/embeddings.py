@@ -0,0 +1,307 @@
+from __future__ import annotations
+
+import hashlib
+import logging
+import re
+import sqlite3
+import threading
+import unicodedata
+from collections import OrderedDict
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+EmbeddingFunction = Callable[[List[str]], Sequence[Sequence[float]]]
+
+_WHITESPACE = re.compile(r"\s+")
+
+
+def normalize_text(text: str) -> str:
+    """Canonical form used for cache keys (NFC, collapsed whitespace)."""
+
+    return _WHITESPACE.sub(" ", unicodedata.normalize("NFC", text)).strip()
+
+
+class _DiskTier:
+    """SQLite key/value table holding float32 vectors as blobs."""
+
+    def __init__(self, path: str):
+        Path(path).parent.mkdir(parents=True, exist_ok=True)
+        self._conn = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.execute(
+            """
+            CREATE TABLE IF NOT EXISTS embeddings (
+                key TEXT PRIMARY KEY,
+                vector BLOB NOT NULL
+            ) WITHOUT ROWID
+            """
+        )
+        self._lock = threading.Lock()
+
+    def get_many(self, keys: List[str]) -> Dict[str, np.ndarray]:
+        found: Dict[str, np.ndarray] = {}
+        with self._lock:
+            # Stay well below SQLite's bound-parameter limit.
+            for start in range(0, len(keys), 500):
+                part = keys[start : start + 500]
+                rows = self._conn.execute(
+                    f"SELECT key, vector FROM embeddings WHERE key IN ({','.join('?' * len(part))})",
+                    part,
+                ).fetchall()
+                for key, blob in rows:
+                    found[key] = np.frombuffer(blob, dtype=np.float32)
+        return found
+
+    def put_many(self, items: Dict[str, np.ndarray]) -> None:
+        with self._lock:
+            self._conn.execute("BEGIN")
+            self._conn.executemany(
+                "INSERT OR REPLACE INTO embeddings (key, vector) VALUES (?, ?)",
+                [(key, vector.tobytes()) for key, vector in items.items()],
+            )
+            self._conn.execute("COMMIT")
+
+    def close(self) -> None:
+        with self._lock:
+            self._conn.close()
+
+
+class EmbeddingCache:
+    """Memoizes an embedding function per (model, normalized text).
+
+    Vectors live in a bounded in-memory LRU; when ``disk_path`` is set, misses
+    fall through to a SQLite tier before the model is called, so embeddings
+    survive restarts. Only texts missing from both tiers are embedded, in a
+    single call to ``embed_fn``.
+    """
+
+    def __init__(
+        self,
+        embed_fn: EmbeddingFunction,
+        model_name: str,
+        *,
+        max_items: int = 4096,
+        disk_path: Optional[str] = None,
+    ):
+        self._embed_fn = embed_fn
+        self.model_name = model_name
+        self.max_items = max(0, max_items)
+        self._memory: "OrderedDict[str, np.ndarray]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._disk = _DiskTier(disk_path) if disk_path else None
+        self.hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+
+    def _key(self, text: str) -> str:
+        digest = hashlib.sha1(
+            f"{self.model_name}\0{normalize_text(text)}".encode("utf-8")
+        )
+        return digest.hexdigest()
+
+    def __call__(self, texts: List[str]) -> List[List[float]]:
+        return [vector.tolist() for vector in self.embed(texts)]
+
+    def embed(self, texts: List[str]) -> List[np.ndarray]:
+        keys = [self._key(text) for text in texts]
+        vectors: Dict[str, np.ndarray] = {}
+        with self._lock:
+            for key in keys:
+                vector = self._memory.get(key)
+                if vector is not None:
+                    self._memory.move_to_end(key)
+                    vectors[key] = vector
+            self.hits += sum(1 for key in keys if key in vectors)
+
+        missing = [key for key in dict.fromkeys(keys) if key not in vectors]
+        if missing and self._disk is not None:
+            from_disk = self._disk.get_many(missing)
+            vectors.update(from_disk)
+            with self._lock:
+                self.disk_hits += sum(1 for key in keys if key in from_disk)
+                self._store_locked(from_disk)
+            missing = [key for key in missing if key not in from_disk]
+
+        if missing:
+            first_text = {}
+            for key, text in zip(keys, texts):
+                first_text.setdefault(key, text)
+            computed = self._embed_fn([first_text[key] for key in missing])
+            fresh = {
+                key: np.asarray(vector, dtype=np.float32)
+                for key, vector in zip(missing, computed)
+            }
+            vectors.update(fresh)
+            with self._lock:
+                self.misses += sum(1 for key in keys if key in fresh)
+                self._store_locked(fresh)
+            if self._disk is not None:
+                try:
+                    self._disk.put_many(fresh)
+                except sqlite3.Error as exc:  # pragma: no cover - disk failure
+                    logger.warning("Failed to persist embeddings: %s", exc)
+
+        return [vectors[key] for key in keys]
+
+    def _store_locked(self, items: Dict[str, np.ndarray]) -> None:
+        if self.max_items == 0:
+            return
+        for key, vector in items.items():
+            self._memory[key] = vector
+            self._memory.move_to_end(key)
+        while len(self._memory) > self.max_items:
+            self._memory.popitem(last=False)
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            lookups = self.hits + self.disk_hits + self.misses
+            return {
+                "model": self.model_name,
+                "size": len(self._memory),
+                "max_items": self.max_items,
+                "disk": self._disk is not None,
+                "hits": self.hits,
+                "disk_hits": self.disk_hits,
+                "misses": self.misses,
+                "hit_rate": (self.hits + self.disk_hits) / lookups if lookups else 0.0,
+            }
+
+    def clear(self) -> None:
+        with self._lock:
+            self._memory.clear()
+
+    def close(self) -> None:
+        if self._disk is not None:
+            self._disk.close()
+
+
+# ----------------------------------------------------------------------
+# Backends
+# ----------------------------------------------------------------------
+class OnnxEmbeddingBackend:
+    """Sentence embeddings from an exported (optionally int8) ONNX model.
+
+    ``model_dir`` holds the ONNX graph plus the ``tokenizer.json`` of the
+    same checkpoint, e.g. an Optimum export of multilingual-e5-small
+    quantized with ``onnxruntime.quantization.quantize_dynamic``. Outputs are
+    mean-pooled over the attention mask and L2-normalized like the
+    SentenceTransformer pipeline for these models.
+    """
+
+    def __init__(
+        self,
+        model_dir: str,
+        *,
+        model_file: str = "model_quantized.onnx",
+        batch_size: int = 64,
+        max_length: int = 512,
+        threads: int = 0,
+    ):
+        try:
+            import onnxruntime as ort  # type: ignore
+            from tokenizers import Tokenizer  # type: ignore
+        except ImportError as exc:  # pragma: no cover - optional dependency
+            raise RuntimeError(
+                "onnxruntime and tokenizers are required for the onnx embedding backend."
+            ) from exc
+
+        root = Path(model_dir)
+        options = ort.SessionOptions()
+        if threads > 0:
+            options.intra_op_num_threads = threads
+        options.graph_optimization_level = ort.GraphOptimizationLevel.ORT_ENABLE_ALL
+        self._session = ort.InferenceSession(
+            str(root / model_file),
+            sess_options=options,
+            providers=["CPUExecutionProvider"],
+        )
+        self._input_names = {item.name for item in self._session.get_inputs()}
+        self._tokenizer = Tokenizer.from_file(str(root / "tokenizer.json"))
+        self._tokenizer.enable_truncation(max_length=max_length)
+        self._tokenizer.enable_padding()
+        self.batch_size = max(1, batch_size)
+
+    # Chroma validates that embedding functions take a parameter named ``input``.
+    def __call__(self, input: List[str]) -> List[List[float]]:  # noqa: A002
+        return [vector.tolist() for vector in self.encode(input)]
+
+    def encode(self, texts: List[str]) -> np.ndarray:
+        if not texts:
+            return np.zeros((0, 0), dtype=np.float32)
+        # Sorting by length keeps padding inside each batch small.
+        order = sorted(range(len(texts)), key=lambda index: len(texts[index]))
+        vectors: List[np.ndarray] = [None] * len(texts)  # type: ignore[list-item]
+        for start in range(0, len(order), self.batch_size):
+            indices = order[start : start + self.batch_size]
+            for index, vector in zip(indices, self._encode_batch([texts[i] for i in indices])):
+                vectors[index] = vector
+        return np.stack(vectors)
+
+    def _encode_batch(self, texts: List[str]) -> np.ndarray:
+        encodings = self._tokenizer.encode_batch(texts)
+        input_ids = np.array([item.ids for item in encodings], dtype=np.int64)
+        attention_mask = np.array([item.attention_mask for item in encodings], dtype=np.int64)
+        feeds = {"input_ids": input_ids, "attention_mask": attention_mask}
+        if "token_type_ids" in self._input_names:
+            feeds["token_type_ids"] = np.array(
+                [item.type_ids for item in encodings], dtype=np.int64
+            )
+        hidden = self._session.run(None, feeds)[0]
+        mask = attention_mask[:, :, None].astype(np.float32)
+        pooled = (hidden * mask).sum(axis=1) / np.clip(mask.sum(axis=1), 1e-9, None)
+        norms = np.linalg.norm(pooled, axis=1, keepdims=True)
+        return (pooled / np.clip(norms, 1e-12, None)).astype(np.float32)
+
+
+EMBEDDING_BACKENDS = ("sentence-transformers", "onnx")
+
+
+def _sentence_transformer(model_name: str):
+    from chromadb.utils import embedding_functions
+
+    return embedding_functions.SentenceTransformerEmbeddingFunction(model_name=model_name)
+
+
+def load_embedding_backend(settings) -> Tuple[EmbeddingFunction, str]:
+    """Build the embedding function chosen by ``embedding_backend``.
+
+    Returns the function together with a model identifier that is used as
+    the embedding cache namespace, so vectors from different backends or
+    checkpoints never mix.
+    """
+
+    if settings.embedding_backend == "onnx":
+        if not settings.embedding_onnx_path:
+            raise RuntimeError("EMBEDDING_ONNX_PATH is required for the onnx embedding backend.")
+        backend = OnnxEmbeddingBackend(
+            settings.embedding_onnx_path,
+            model_file=settings.embedding_onnx_file,
+            batch_size=settings.embedding_batch_size,
+            max_length=settings.embedding_max_length,
+            threads=settings.embedding_onnx_threads,
+        )
+        return backend, f"onnx:{Path(settings.embedding_onnx_path).name}/{settings.embedding_onnx_file}"
+
+    try:
+        return _sentence_transformer(settings.embedding_model), settings.embedding_model
+    except Exception as primary_error:  # pragma: no cover - requires sand-boxed models
+        logger.warning(
+            "Failed to load embedding model %s: %s",
+            settings.embedding_model,
+            primary_error,
+        )
+        if not settings.embedding_fallback_model:
+            raise
+        logger.info(
+            "Falling back to embedding model %s",
+            settings.embedding_fallback_model,
+        )
+        return (
+            _sentence_transformer(settings.embedding_fallback_model),
+            settings.embedding_fallback_model,
+        )
@@ -0,0 +1,59 @@
+from __future__ import annotations
+
+import asyncio
+import logging
+from concurrent.futures import ThreadPoolExecutor
+from functools import lru_cache, partial
+from typing import Any, Callable, Dict, Optional, TypeVar
+
+from core.config import Settings, get_settings
+
+logger = logging.getLogger(__name__)
+
+T = TypeVar("T")
+
+
+class InferenceExecutor:
+    """Bounded worker pools that keep blocking model work off the event loop.
+
+    faster-whisper (CTranslate2), ONNX Runtime and FFmpeg release the GIL while
+    they run, so thread pools give real parallelism without having to pickle
+    the loaded models into worker processes.
+    """
+
+    KINDS = ("decode", "stt", "tts", "chat")
+
+    def __init__(self, settings: Optional[Settings] = None):
+        self.settings = settings or get_settings()
+        sizes = {
+            "decode": self.settings.inference_decode_workers,
+            "stt": self.settings.inference_stt_workers,
+            "tts": self.settings.inference_tts_workers,
+            "chat": self.settings.inference_chat_workers,
+        }
+        self._pools: Dict[str, ThreadPoolExecutor] = {
+            kind: ThreadPoolExecutor(
+                max_workers=max(1, size), thread_name_prefix=f"tohum-{kind}"
+            )
+            for kind, size in sizes.items()
+        }
+
+    async def run(self, kind: str, fn: Callable[..., T], *args: Any, **kwargs: Any) -> T:
+        """Run ``fn`` in the pool for ``kind`` and await its result."""
+
+        try:
+            pool = self._pools[kind]
+        except KeyError as exc:
+            raise ValueError(f"Unknown executor pool: {kind}") from exc
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(pool, partial(fn, *args, **kwargs))
+
+    def shutdown(self) -> None:
+        for kind, pool in self._pools.items():
+            logger.debug("Shutting down %s executor", kind)
+            pool.shutdown(wait=False, cancel_futures=True)
+
+
+@lru_cache()
+def get_inference_executor() -> InferenceExecutor:
+    return InferenceExecutor()
@@ -0,0 +1,134 @@
+from __future__ import annotations
+
+import heapq
+import math
+import re
+import threading
+from collections import Counter
+from dataclasses import dataclass
+from typing import Dict, FrozenSet, Iterable, List, Optional, Tuple
+
+_TOKEN_RE = re.compile(r"\w+", re.UNICODE)
+
+# Dotted/dotless I first, then fold Turkish letters to ASCII so that
+# "hatırla" and "hatirla" (common on keyboards without Turkish layout) match.
+_TURKISH_UPPER = str.maketrans({"I": "ı", "İ": "i"})
+_TURKISH_FOLD = str.maketrans(
+    {"ç": "c", "ğ": "g", "ı": "i", "ö": "o", "ş": "s", "ü": "u", "â": "a", "î": "i", "û": "u"}
+)
+
+
+def tokenize(text: str) -> List[str]:
+    """Lower-case and ASCII-fold Turkish text, then split into word tokens."""
+
+    normalized = text.translate(_TURKISH_UPPER).lower().translate(_TURKISH_FOLD)
+    return _TOKEN_RE.findall(normalized)
+
+
+@dataclass
+class _Document:
+    length: int
+    terms: Tuple[str, ...]
+    session_id: Optional[str]
+    tags: FrozenSet[str]
+
+
+class BM25Index:
+    """In-memory inverted index scored with Okapi BM25.
+
+    Documents are added and removed incrementally; postings map each term to
+    the documents containing it with their term frequency.
+    """
+
+    def __init__(self, k1: float = 1.5, b: float = 0.75):
+        self.k1 = k1
+        self.b = b
+        self._postings: Dict[str, Dict[str, int]] = {}
+        self._documents: Dict[str, _Document] = {}
+        self._total_length = 0
+        self._lock = threading.RLock()
+
+    def __len__(self) -> int:
+        return len(self._documents)
+
+    def add(
+        self,
+        doc_id: str,
+        text: str,
+        *,
+        session_id: Optional[str] = None,
+        tags: Optional[Iterable[str]] = None,
+    ) -> None:
+        counts = Counter(tokenize(text))
+        with self._lock:
+            if doc_id in self._documents:
+                self._remove_locked(doc_id)
+            for term, frequency in counts.items():
+                self._postings.setdefault(term, {})[doc_id] = frequency
+            length = sum(counts.values())
+            self._documents[doc_id] = _Document(
+                length=length,
+                terms=tuple(counts),
+                session_id=session_id,
+                tags=frozenset(tags or ()),
+            )
+            self._total_length += length
+
+    def remove(self, doc_id: str) -> None:
+        with self._lock:
+            self._remove_locked(doc_id)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._postings.clear()
+            self._documents.clear()
+            self._total_length = 0
+
+    def _remove_locked(self, doc_id: str) -> None:
+        document = self._documents.pop(doc_id, None)
+        if document is None:
+            return
+        for term in document.terms:
+            postings = self._postings.get(term)
+            if postings is None:
+                continue
+            postings.pop(doc_id, None)
+            if not postings:
+                del self._postings[term]
+        self._total_length -= document.length
+
+    def search(
+        self,
+        query: str,
+        *,
+        limit: int = 5,
+        session_id: Optional[str] = None,
+        tags: Optional[Iterable[str]] = None,
+    ) -> List[Tuple[str, float]]:
+        """Return up to ``limit`` ``(doc_id, score)`` pairs, best first."""
+
+        terms = set(tokenize(query))
+        required_tags = frozenset(tags or ())
+        with self._lock:
+            count = len(self._documents)
+            if not terms or count == 0:
+                return []
+            avg_length = self._total_length / count
+            scores: Dict[str, float] = {}
+            for term in terms:
+                postings = self._postings.get(term)
+                if not postings:
+                    continue
+                df = len(postings)
+                idf = math.log(1.0 + (count - df + 0.5) / (df + 0.5))
+                for doc_id, frequency in postings.items():
+                    document = self._documents[doc_id]
+                    if session_id and document.session_id != session_id:
+                        continue
+                    if required_tags and not required_tags <= document.tags:
+                        continue
+                    norm = self.k1 * (1.0 - self.b + self.b * document.length / avg_length)
+                    scores[doc_id] = scores.get(doc_id, 0.0) + idf * (
+                        frequency * (self.k1 + 1.0) / (frequency + norm)
+                    )
+        return heapq.nlargest(limit, scores.items(), key=lambda item: item[1])
@@ -0,0 +1,117 @@
+from __future__ import annotations
+
+import logging
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from functools import lru_cache
+from typing import Any, Callable, Dict, Optional
+
+logger = logging.getLogger(__name__)
+
+_DONE_STATES = ("ready", "unavailable")
+
+
+@dataclass
+class _WarmupTask:
+    name: str
+    load: Callable[[], Any]
+    warm_up: Optional[Callable[[], Any]] = None
+    state: str = "pending"
+    started_at: Optional[float] = None
+    finished_at: Optional[float] = None
+    error: Optional[str] = None
+
+    def as_dict(self) -> Dict[str, Any]:
+        seconds = None
+        if self.started_at is not None:
+            seconds = round((self.finished_at or time.perf_counter()) - self.started_at, 3)
+        return {"state": self.state, "seconds": seconds, "error": self.error}
+
+
+class Lifecycle:
+    """Loads heavy models in background threads and reports their progress.
+
+    Each registered task moves through ``pending`` -> ``loading`` ->
+    (``warming`` ->) ``ready`` or ``failed``; a loader returning ``False``
+    marks an optional component as ``unavailable``. Nothing here blocks the event
+    loop, so ``/ready`` can answer while models are still loading.
+    """
+
+    def __init__(self) -> None:
+        self._tasks: "OrderedDict[str, _WarmupTask]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.startup_seconds: Optional[float] = None
+
+    def register(
+        self,
+        name: str,
+        load: Callable[[], Any],
+        *,
+        warm_up: Optional[Callable[[], Any]] = None,
+    ) -> None:
+        with self._lock:
+            self._tasks[name] = _WarmupTask(name=name, load=load, warm_up=warm_up)
+
+    def start(self, *, run_warm_up: bool = False) -> None:
+        with self._lock:
+            pending = [task for task in self._tasks.values() if task.state == "pending"]
+        for task in pending:
+            threading.Thread(
+                target=self._run,
+                args=(task, run_warm_up),
+                name=f"tohum-warmup-{task.name}",
+                daemon=True,
+            ).start()
+
+    def _run(self, task: _WarmupTask, run_warm_up: bool) -> None:
+        task.started_at = time.perf_counter()
+        task.state = "loading"
+        try:
+            if task.load() is False:
+                task.state = "unavailable"
+                return
+            if run_warm_up and task.warm_up is not None:
+                task.state = "warming"
+                task.warm_up()
+        except Exception as exc:  # pragma: no cover - depends on model files
+            logger.exception("Failed to load %s", task.name)
+            task.error = str(exc)
+            task.state = "failed"
+        else:
+            task.state = "ready"
+        finally:
+            task.finished_at = time.perf_counter()
+            self._log_finished(task)
+
+    def _log_finished(self, task: _WarmupTask) -> None:
+        logger.info(
+            "Warm-up of %s finished as %s in %.2fs",
+            task.name,
+            task.state,
+            task.finished_at - task.started_at,
+        )
+
+    def is_ready(self, name: Optional[str] = None) -> bool:
+        """Whether ``name`` (or every task when omitted) has finished loading."""
+
+        with self._lock:
+            tasks = list(self._tasks.values())
+        if name is not None:
+            tasks = [task for task in tasks if task.name == name]
+        return all(task.state in _DONE_STATES for task in tasks)
+
+    def status(self) -> Dict[str, Any]:
+        with self._lock:
+            tasks = {name: task.as_dict() for name, task in self._tasks.items()}
+        return {
+            "ready": all(task["state"] in _DONE_STATES for task in tasks.values()),
+            "startup_seconds": self.startup_seconds,
+            "tasks": tasks,
+        }
+
+
+@lru_cache()
+def get_lifecycle() -> Lifecycle:
+    return Lifecycle()
@@ -2,159 +2,154 @@ from __future__ import annotations
 
 import json
 import logging
-import sqlite3
 import threading
 import uuid
+from collections import OrderedDict
 from contextlib import contextmanager
-from functools import lru_cache
-from typing import Any, Dict, Iterable, List, Optional
+from typing import Any, Dict, Iterable, Iterator, List, Optional
 
 from core.config import Settings, get_settings
-
-try:
-    import chromadb
-    from chromadb.config import Settings as ChromaSettings
-    from chromadb.utils import embedding_functions
-except ImportError as exc:  # pragma: no cover - defensive fallback for optional dep
-    raise RuntimeError(
-        "chromadb package is required for MemoryService but is not installed."
-    ) from exc
+from services.chunking import batched, iter_chunks
+from services.embeddings import EmbeddingCache, load_embedding_backend
+from services.lexical import BM25Index
+from services.migrations import apply_migrations
+from services.search_cache import SearchResultCache
+from services.sqlite import SQLiteConnectionManager
+from services.vector_store import VectorHit, VectorStore, create_vector_store
+from services.write_behind import MessageWriteBehind
 
 logger = logging.getLogger(__name__)
 
+SEARCH_MODES = ("vector", "lexical", "hybrid")
+
+# Vector-store bookkeeping that is not part of a memory item's own metadata.
+_CHUNK_METADATA_KEYS = ("parent_id", "chunk_index")
+
+_INSERT_MEMORY_ITEM = """
+    INSERT INTO memory_items (
+        id, session_id, text, tags, source, trust_score, metadata
+    ) VALUES (?, ?, ?, ?, ?, ?, ?)
+"""
+
+
+class IndexingError(Exception):
+    """Memory items were committed to SQLite but could not be indexed."""
+
+    def __init__(self, memory_ids: List[str], cause: BaseException):
+        super().__init__(f"Failed to index {len(memory_ids)} memory items: {cause}")
+        self.memory_ids = memory_ids
+
 
 class MemoryService:
     """Persistence layer for sessions, messages, and long-term memory."""
 
     def __init__(self, settings: Optional[Settings] = None):
         self.settings = settings or get_settings()
-        self._sqlite_lock = threading.Lock()
+        self._db = SQLiteConnectionManager(self.settings)
+        self._uow = threading.local()
+        self._known_sessions: "OrderedDict[str, Optional[str]]" = OrderedDict()
+        self._known_sessions_lock = threading.Lock()
+        self._message_writer: Optional[MessageWriteBehind] = None
+        if self.settings.message_durability != "sync":
+            self._message_writer = MessageWriteBehind(self._db, self.settings)
+
+        self._lexical = BM25Index(
+            k1=self.settings.rank_bm25_k1, b=self.settings.rank_bm25_b
+        )
+
+        self._search_cache = SearchResultCache(
+            max_items=self.settings.search_cache_size,
+            ttl_seconds=self.settings.search_cache_ttl_seconds,
+        )
 
         self._ensure_sqlite_schema()
-        self._collection = self._init_chroma_collection()
+        self._rebuild_lexical_index()
+        self._vector_store = self._init_vector_store()
 
     # ------------------------------------------------------------------
     # SQLite helpers
     # ------------------------------------------------------------------
-    def _get_connection(self) -> sqlite3.Connection:
-        conn = sqlite3.connect(
-            self.settings.sqlite_path,
-            check_same_thread=False,
-            detect_types=sqlite3.PARSE_DECLTYPES,
-        )
-        conn.row_factory = sqlite3.Row
-        return conn
+    def close(self) -> None:
+        if self._message_writer is not None:
+            self._message_writer.close()
+        self._embedding_cache.close()
+        self._vector_store.close()
+        self._db.close()
+
+    def flush_messages(self, timeout: Optional[float] = None) -> bool:
+        """Wait until every queued message has been committed."""
+
+        if self._message_writer is None:
+            return True
+        return self._message_writer.flush(timeout)
 
     @contextmanager
-    def _cursor(self):
-        with self._sqlite_lock:
-            conn = self._get_connection()
+    def unit_of_work(self) -> Iterator[None]:
+        """Group every write made inside the block into a single commit.
+
+        Session activity timestamps are bumped once per touched session and
+        Chroma upserts run after the SQLite commit succeeds.
+        """
+
+        if getattr(self._uow, "touched", None) is not None:
+            yield
+            return
+        with self._db.write() as cur:
+            self._uow.touched = set()
             try:
-                yield conn.cursor()
-                conn.commit()
+                yield
+                for session_id in self._uow.touched:
+                    self._touch_session(cur, session_id)
             finally:
-                conn.close()
+                self._uow.touched = None
+
+    def _touch_session(self, cur, session_id: str) -> None:
+        cur.execute(
+            """
+            UPDATE sessions
+            SET last_activity_at=CURRENT_TIMESTAMP
+            WHERE id = ?
+            """,
+            (session_id,),
+        )
+
+    def _remember_session(self, session_id: str, user_id: Optional[str]) -> None:
+        with self._known_sessions_lock:
+            self._known_sessions[session_id] = user_id
+            self._known_sessions.move_to_end(session_id)
+            while len(self._known_sessions) > self.settings.session_cache_size:
+                self._known_sessions.popitem(last=False)
 
     def _ensure_sqlite_schema(self) -> None:
-        with self._sqlite_lock:
-            conn = self._get_connection()
-            try:
-                conn.execute(f"PRAGMA journal_mode={self.settings.sqlite_journal_mode}")
-                conn.execute(
-                    """
-                    CREATE TABLE IF NOT EXISTS users (
-                        id TEXT PRIMARY KEY,
-                        display_name TEXT,
-                        created_at DATETIME DEFAULT CURRENT_TIMESTAMP
-                    )
-                    """
-                )
-                conn.execute(
-                    """
-                    CREATE TABLE IF NOT EXISTS sessions (
-                        id TEXT PRIMARY KEY,
-                        user_id TEXT,
-                        started_at DATETIME DEFAULT CURRENT_TIMESTAMP,
-                        last_activity_at DATETIME DEFAULT CURRENT_TIMESTAMP,
-                        FOREIGN KEY(user_id) REFERENCES users(id)
-                    )
-                    """
-                )
-                conn.execute(
-                    """
-                    CREATE TABLE IF NOT EXISTS messages (
-                        id TEXT PRIMARY KEY,
-                        session_id TEXT NOT NULL,
-                        role TEXT NOT NULL,
-                        text TEXT,
-                        audio_url TEXT,
-                        created_at DATETIME DEFAULT CURRENT_TIMESTAMP,
-                        FOREIGN KEY(session_id) REFERENCES sessions(id)
-                    )
-                    """
-                )
-                conn.execute(
-                    """
-                    CREATE TABLE IF NOT EXISTS memory_items (
-                        id TEXT PRIMARY KEY,
-                        session_id TEXT,
-                        text TEXT NOT NULL,
-                        tags TEXT,
-                        source TEXT DEFAULT 'user',
-                        trust_score REAL DEFAULT 1.0,
-                        metadata TEXT,
-                        added_at DATETIME DEFAULT CURRENT_TIMESTAMP,
-                        FOREIGN KEY(session_id) REFERENCES sessions(id)
-                    )
-                    """
-                )
-                conn.commit()
-            finally:
-                conn.close()
+        with self._db.write() as cur:
+            apply_migrations(cur)
 
     # ------------------------------------------------------------------
-    # Chroma helpers
+    # Vector store helpers
     # ------------------------------------------------------------------
-    def _init_chroma_collection(self):
-        chroma_settings = ChromaSettings(
-            chroma_db_impl="duckdb+parquet",
-            persist_directory=self.settings.chroma_path,
+    def _init_vector_store(self) -> VectorStore:
+        self._embedding_fn, self._embedding_model_name = load_embedding_backend(
+            self.settings
         )
-        client = chromadb.Client(chroma_settings)
-        embedding_fn = self._resolve_embedding_function()
-        collection = client.get_or_create_collection(
-            name=self.settings.chroma_collection,
-            embedding_function=embedding_fn,
-            metadata={"description": "Tohum v1 long-term memory"},
+        self._embedding_cache = EmbeddingCache(
+            self._embedding_fn,
+            self._embedding_model_name,
+            max_items=self.settings.embedding_cache_size,
+            disk_path=self.settings.embedding_cache_path,
         )
-        return collection
-
-    def _resolve_embedding_function(self):
-        try:
-            return embedding_functions.SentenceTransformerEmbeddingFunction(
-                model_name=self.settings.embedding_model
-            )
-        except Exception as primary_error:  # pragma: no cover - requires sand-boxed models
-            logger.warning(
-                "Failed to load embedding model %s: %s",
-                self.settings.embedding_model,
-                primary_error,
-            )
-            if not self.settings.embedding_fallback_model:
-                raise
-            logger.info(
-                "Falling back to embedding model %s",
-                self.settings.embedding_fallback_model,
-            )
-            return embedding_functions.SentenceTransformerEmbeddingFunction(
-                model_name=self.settings.embedding_fallback_model
-            )
+        return create_vector_store(self.settings, self._embedding_fn)
 
     # ------------------------------------------------------------------
     # Session and message operations
     # ------------------------------------------------------------------
     def ensure_session(self, session_id: str, user_id: Optional[str] = None) -> None:
-        with self._cursor() as cur:
+        with self._known_sessions_lock:
+            known = session_id in self._known_sessions
+            if known and (not user_id or self._known_sessions[session_id] == user_id):
+                self._known_sessions.move_to_end(session_id)
+                return
+
+        with self._db.write() as cur:
             if user_id:
                 cur.execute(
                     """
@@ -171,6 +166,7 @@ class MemoryService:
                 """,
                 (session_id, user_id),
             )
+        self._db.after_commit(lambda: self._remember_session(session_id, user_id))
 
     def append_message(
         self,
@@ -178,9 +174,23 @@ class MemoryService:
         role: str,
         text: Optional[str],
         audio_url: Optional[str] = None,
+        message_id: Optional[str] = None,
     ) -> str:
-        message_id = str(uuid.uuid4())
-        with self._cursor() as cur:
+        message_id = message_id or str(uuid.uuid4())
+        if self._message_writer is not None:
+            seq = self._message_writer.enqueue(
+                message_id, session_id, role, text, audio_url
+            )
+            if self.settings.message_durability == "group":
+                # Waiting inside an open transaction would hold the writer
+                # lock the flusher needs, so wait once the caller commits. The
+                # caller must still see the failure, hence ``propagate``.
+                self._db.after_commit(
+                    lambda: self._wait_committed(seq, message_id), propagate=True
+                )
+            return message_id
+
+        with self._db.write() as cur:
             cur.execute(
                 """
                 INSERT INTO messages (id, session_id, role, text, audio_url)
@@ -188,30 +198,47 @@ class MemoryService:
                 """,
                 (message_id, session_id, role, text, audio_url),
             )
-            cur.execute(
-                """
-                UPDATE sessions
-                SET last_activity_at=CURRENT_TIMESTAMP
-                WHERE id = ?
-                """,
-                (session_id,),
-            )
+            touched = getattr(self._uow, "touched", None)
+            if touched is None:
+                self._touch_session(cur, session_id)
+            else:
+                touched.add(session_id)
         return message_id
 
+    def _wait_committed(self, seq: int, message_id: str) -> None:
+        assert self._message_writer is not None
+        timeout = self.settings.message_commit_timeout_seconds
+        if not self._message_writer.wait_for(seq, timeout):
+            raise RuntimeError(
+                f"Message {message_id} was not committed within {timeout}s; "
+                "it stays queued for the background writer."
+            )
+
     def list_messages(self, session_id: str, limit: int = 50) -> List[Dict[str, Any]]:
-        with self._cursor() as cur:
+        queued = (
+            self._message_writer.pending_for(session_id)
+            if self._message_writer is not None
+            else []
+        )
+        with self._db.read() as cur:
             cur.execute(
                 """
                 SELECT id, role, text, audio_url, created_at
                 FROM messages
                 WHERE session_id = ?
-                ORDER BY created_at ASC
+                ORDER BY created_at ASC, rowid ASC
                 LIMIT ?
                 """,
                 (session_id, limit),
             )
             rows = cur.fetchall()
-        return [dict(row) for row in rows]
+        messages = [dict(row) for row in rows]
+
+        # Read-your-writes: include queued messages that are not committed yet.
+        if len(messages) < limit and queued:
+            stored = {message["id"] for message in messages}
+            messages.extend(row for row in queued if row["id"] not in stored)
+        return messages[:limit]
 
     # ------------------------------------------------------------------
     # Memory operations
@@ -225,28 +252,87 @@ class MemoryService:
         session_id: Optional[str] = None,
         trust_score: float = 1.0,
     ) -> str:
+        memory_id, row, chroma_metadata = self._prepare_memory(
+            text,
+            tags=tags,
+            metadata=metadata,
+            session_id=session_id,
+            trust_score=trust_score,
+        )
+        with self._db.write() as cur:
+            cur.execute(_INSERT_MEMORY_ITEM, row)
+
+        self._db.after_commit(
+            lambda: self._index_documents([memory_id], [text], [chroma_metadata])
+        )
+        return memory_id
+
+    def remember_many(self, items: Iterable[Dict[str, Any]]) -> List[str]:
+        """Store many memory items with one SQLite transaction.
+
+        Each item accepts the keyword arguments of :meth:`remember` plus
+        ``text``. Documents are embedded in ``embedding_batch_size`` batches
+        and written to the vector store in ``chroma_upsert_batch_size`` batches.
+
+        Indexing runs once the transaction commits; if it fails the rows stay
+        stored and :class:`IndexingError` names the items that are missing
+        from search.
+        """
+
+        ids: List[str] = []
+        rows: List[tuple] = []
+        documents: List[str] = []
+        metadatas: List[Dict[str, Any]] = []
+        for item in items:
+            memory_id, row, chroma_metadata = self._prepare_memory(
+                item["text"],
+                tags=item.get("tags"),
+                metadata=item.get("metadata"),
+                session_id=item.get("session_id"),
+                trust_score=item.get("trust_score", 1.0),
+            )
+            ids.append(memory_id)
+            rows.append(row)
+            documents.append(item["text"])
+            metadatas.append(chroma_metadata)
+        if not ids:
+            return []
+
+        with self._db.write() as cur:
+            cur.executemany(_INSERT_MEMORY_ITEM, rows)
+
+        def index() -> None:
+            try:
+                self._index_documents(ids, documents, metadatas)
+            except Exception as exc:
+                raise IndexingError(ids, exc) from exc
+
+        self._db.after_commit(index, propagate=True)
+        return ids
+
+    def _prepare_memory(
+        self,
+        text: str,
+        *,
+        tags: Optional[Iterable[str]],
+        metadata: Optional[Dict[str, Any]],
+        session_id: Optional[str],
+        trust_score: float,
+    ) -> tuple[str, tuple, Dict[str, Any]]:
         memory_id = str(uuid.uuid4())
         tags_list = list(tags or [])
         metadata = metadata or {}
 
         sqlite_metadata = metadata | {"tags": tags_list}
-        with self._cursor() as cur:
-            cur.execute(
-                """
-                INSERT INTO memory_items (
-                    id, session_id, text, tags, source, trust_score, metadata
-                ) VALUES (?, ?, ?, ?, ?, ?, ?)
-                """,
-                (
-                    memory_id,
-                    session_id,
-                    text,
-                    json.dumps(tags_list, ensure_ascii=False),
-                    metadata.get("source", "user"),
-                    trust_score,
-                    json.dumps(sqlite_metadata, ensure_ascii=False),
-                ),
-            )
+        row = (
+            memory_id,
+            session_id,
+            text,
+            json.dumps(tags_list, ensure_ascii=False),
+            metadata.get("source", "user"),
+            trust_score,
+            json.dumps(sqlite_metadata, ensure_ascii=False),
+        )
 
         chroma_metadata = {
             "tags": tags_list,
@@ -258,13 +344,61 @@ class MemoryService:
         chroma_metadata.update(
             {k: v for k, v in metadata.items() if k not in chroma_metadata}
         )
+        return memory_id, row, chroma_metadata
 
-        self._collection.upsert(
-            ids=[memory_id],
-            documents=[text],
-            metadatas=[chroma_metadata],
-        )
-        return memory_id
+    def _index_documents(
+        self,
+        ids: List[str],
+        documents: List[str],
+        metadatas: List[Dict[str, Any]],
+    ) -> None:
+        for memory_id, text, metadata in zip(ids, documents, metadatas):
+            self._lexical.add(
+                memory_id,
+                text,
+                session_id=metadata.get("session_id"),
+                tags=metadata.get("tags"),
+            )
+
+        embed_batch = max(1, self.settings.embedding_batch_size)
+        upsert_batch = max(embed_batch, self.settings.chroma_upsert_batch_size)
+        for batch in batched(self._iter_chunk_records(ids, documents, metadatas), upsert_batch):
+            chunk_ids, chunk_docs, chunk_metadatas = map(list, zip(*batch))
+            embeddings: List[Any] = []
+            for docs in batched(chunk_docs, embed_batch):
+                embeddings.extend(self._embedding_cache(docs))
+            self._vector_store.upsert(
+                ids=chunk_ids,
+                documents=chunk_docs,
+                embeddings=embeddings,
+                metadatas=chunk_metadatas,
+            )
+        self._search_cache.invalidate([metadata.get("session_id") for metadata in metadatas])
+
+    def _iter_chunk_records(
+        self,
+        ids: List[str],
+        documents: List[str],
+        metadatas: List[Dict[str, Any]],
+    ) -> Iterator[tuple[str, str, Dict[str, Any]]]:
+        """Lazily split documents into chunk records keyed to their parent.
+
+        The first chunk keeps the memory id itself, so short memories are
+        stored exactly as before; further chunks get ``<id>:<n>``.
+        """
+
+        for memory_id, text, metadata in zip(ids, documents, metadatas):
+            chunks = iter_chunks(
+                text,
+                self.settings.memory_chunk_size,
+                self.settings.memory_chunk_overlap,
+            )
+            for index, chunk in enumerate(chunks):
+                chunk_id = memory_id if index == 0 else f"{memory_id}:{index}"
+                yield chunk_id, chunk, metadata | {
+                    "parent_id": memory_id,
+                    "chunk_index": index,
+                }
 
     def list_memory_items(
         self, *, session_id: Optional[str] = None, limit: int = 100
@@ -277,10 +411,10 @@ class MemoryService:
         if session_id:
             query += " WHERE session_id = ?"
             params.append(session_id)
-        query += " ORDER BY added_at DESC LIMIT ?"
+        query += " ORDER BY added_at DESC, rowid DESC LIMIT ?"
         params.append(limit)
 
-        with self._cursor() as cur:
+        with self._db.read() as cur:
             cur.execute(query, params)
             rows = cur.fetchall()
 
@@ -300,38 +434,210 @@ class MemoryService:
         include_scores: bool = True,
         session_id: Optional[str] = None,
         tags: Optional[Iterable[str]] = None,
+        mode: Optional[str] = None,
     ) -> List[Dict[str, Any]]:
+        """Search long-term memory.
+
+        ``mode`` is ``vector`` (Chroma only), ``lexical`` (BM25 only, no query
+        embedding) or ``hybrid`` (both fused with reciprocal rank fusion);
+        it defaults to ``memory_search_mode``.
+        """
+
         n_results = limit or self.settings.chroma_top_k
-        where: Dict[str, Any] = {}
-        if session_id:
-            where["session_id"] = session_id
-        if tags:
-            where["tags"] = {"$contains": list(tags)}
-
-        results = self._collection.query(
-            query_texts=[query],
-            n_results=n_results,
-            where=where or None,
+        tags_list = list(tags or [])
+        mode = mode or self.settings.memory_search_mode
+        if mode not in SEARCH_MODES:
+            raise ValueError(f"Unknown search mode: {mode}")
+
+        cache_key = self._search_cache.make_key(
+            query, session_id=session_id, tags=tags_list, limit=n_results, mode=mode
         )
+        payload = self._search_cache.get(cache_key)
+        if payload is None:
+            generation = self._search_cache.generation(session_id)
+            payload = self._search(query, n_results, session_id, tags_list, mode)
+            self._search_cache.put(cache_key, generation, payload)
 
-        documents = results.get("documents", [[]])[0]
-        ids = results.get("ids", [[]])[0]
-        metadatas = results.get("metadatas", [[]])[0]
-        distances = results.get("distances", [[]])[0]
+        if not include_scores:
+            for item in payload:
+                item.pop("score", None)
+        return payload
+
+    def _search(
+        self,
+        query: str,
+        n_results: int,
+        session_id: Optional[str],
+        tags_list: List[str],
+        mode: str,
+    ) -> List[Dict[str, Any]]:
+        vector_hits: List[Dict[str, Any]] = []
+        if mode != "lexical":
+            vector_hits = self._vector_search(
+                query, n_results=n_results, session_id=session_id, tags=tags_list
+            )
+        lexical_hits: List[tuple[str, float]] = []
+        if mode != "vector":
+            lexical_hits = self._lexical.search(
+                query, limit=n_results, session_id=session_id, tags=tags_list
+            )
+
+        if mode == "vector":
+            payload = vector_hits
+        elif mode == "lexical":
+            items = self._fetch_memory_items([doc_id for doc_id, _ in lexical_hits])
+            payload = [
+                items[doc_id] | {"score": score}
+                for doc_id, score in lexical_hits
+                if doc_id in items
+            ]
+        else:
+            payload = self._fuse(vector_hits, lexical_hits, n_results)
+        return payload
 
+    def _vector_search(
+        self,
+        query: str,
+        *,
+        n_results: int,
+        session_id: Optional[str],
+        tags: List[str],
+    ) -> List[Dict[str, Any]]:
+        # Over-fetch so that several chunks of one memory still leave enough
+        # distinct parents after collapsing.
+        hits = self._vector_store.query(
+            self._embedding_cache.embed([query])[0],
+            n_results=n_results * self.settings.memory_chunk_oversample,
+            session_id=session_id,
+            tags=tags,
+        )
+
+        best: Dict[str, VectorHit] = {}
+        for hit in hits:
+            parent_id = hit.metadata.get("parent_id", hit.id)
+            if parent_id not in best:
+                best[parent_id] = hit
+                if len(best) >= n_results:
+                    break
+
+        # Report the whole memory item, as lexical hits do, rather than the
+        # chunk that happened to match.
+        items = self._fetch_memory_items(list(best))
         payload: List[Dict[str, Any]] = []
-        for idx, doc in enumerate(documents):
-            item = {
-                "id": ids[idx],
-                "text": doc,
-                "metadata": metadatas[idx] if metadatas else {},
+        for parent_id, hit in best.items():
+            item = items.get(parent_id) or {
+                "id": parent_id,
+                "text": hit.document,
+                "metadata": {
+                    key: value
+                    for key, value in hit.metadata.items()
+                    if key not in _CHUNK_METADATA_KEYS
+                },
             }
-            if include_scores:
-                item["score"] = distances[idx] if distances else None
-            payload.append(item)
+            payload.append(item | {"score": hit.distance})
         return payload
 
+    def _fuse(
+        self,
+        vector_hits: List[Dict[str, Any]],
+        lexical_hits: List[tuple[str, float]],
+        n_results: int,
+    ) -> List[Dict[str, Any]]:
+        """Reciprocal rank fusion of vector and BM25 rankings."""
+
+        k = self.settings.rrf_k
+        fused: Dict[str, float] = {}
+        items: Dict[str, Dict[str, Any]] = {}
+        for rank, hit in enumerate(vector_hits):
+            fused[hit["id"]] = fused.get(hit["id"], 0.0) + 1.0 / (k + rank + 1)
+            items[hit["id"]] = hit | {"distance": hit.get("score")}
+        for rank, (doc_id, score) in enumerate(lexical_hits):
+            fused[doc_id] = fused.get(doc_id, 0.0) + 1.0 / (k + rank + 1)
+            items.setdefault(doc_id, {})["bm25"] = score
+
+        missing = [doc_id for doc_id, item in items.items() if "text" not in item]
+        for doc_id, stored in self._fetch_memory_items(missing).items():
+            items[doc_id] = stored | items[doc_id]
+
+        ranked = sorted(fused.items(), key=lambda entry: entry[1], reverse=True)
+        return [
+            items[doc_id] | {"score": score}
+            for doc_id, score in ranked[:n_results]
+            if "text" in items[doc_id]
+        ]
+
+    def _fetch_memory_items(self, ids: List[str]) -> Dict[str, Dict[str, Any]]:
+        if not ids:
+            return {}
+        placeholders = ", ".join("?" for _ in ids)
+        with self._db.read() as cur:
+            cur.execute(
+                f"""
+                SELECT id, session_id, text, tags, source, trust_score, metadata
+                FROM memory_items
+                WHERE id IN ({placeholders})
+                """,
+                ids,
+            )
+            rows = cur.fetchall()
+
+        result: Dict[str, Dict[str, Any]] = {}
+        for row in rows:
+            stored = json.loads(row["metadata"]) if row["metadata"] else {}
+            metadata: Dict[str, Any] = {
+                "tags": json.loads(row["tags"]) if row["tags"] else [],
+                "trust_score": row["trust_score"],
+                "source": row["source"],
+            }
+            if row["session_id"]:
+                metadata["session_id"] = row["session_id"]
+            metadata.update({k: v for k, v in stored.items() if k not in metadata})
+            result[row["id"]] = {
+                "id": row["id"],
+                "text": row["text"],
+                "metadata": metadata,
+            }
+        return result
+
+    def warm_up(self) -> None:
+        """Embed a throwaway text so the model's first real call is fast."""
+
+        self._embedding_fn(["warm-up"])
+
+    def embedding_cache_stats(self) -> Dict[str, Any]:
+        return self._embedding_cache.stats()
+
+    def search_cache_stats(self) -> Dict[str, Any]:
+        return self._search_cache.stats()
+
+    def _rebuild_lexical_index(self) -> None:
+        self._lexical.clear()
+        with self._db.read() as cur:
+            cur.execute("SELECT id, session_id, text, tags FROM memory_items")
+            for row in cur:
+                self._lexical.add(
+                    row["id"],
+                    row["text"],
+                    session_id=row["session_id"],
+                    tags=json.loads(row["tags"]) if row["tags"] else [],
+                )
+        logger.info("Built BM25 index over %s memory items", len(self._lexical))
+
+
+_memory_service: Optional[MemoryService] = None
+_memory_service_lock = threading.Lock()
+
 
-@lru_cache()
 def get_memory_service() -> MemoryService:
-    return MemoryService()
+    # Built under a lock so a request racing the background warm-up waits for
+    # it instead of opening a second SQLite writer and Chroma client.
+    global _memory_service
+    if _memory_service is None:
+        with _memory_service_lock:
+            if _memory_service is None:
+                _memory_service = MemoryService()
+    return _memory_service
+
+
+def memory_service_loaded() -> bool:
+    return _memory_service is not None
@@ -0,0 +1,98 @@
+from __future__ import annotations
+
+import logging
+import sqlite3
+from typing import List, Tuple
+
+logger = logging.getLogger(__name__)
+
+# Each entry upgrades the schema by one ``PRAGMA user_version``. Append new
+# migrations at the end; never edit one that has already shipped.
+MIGRATIONS: List[Tuple[str, ...]] = [
+    # 1: base tables (databases created before versioning already have them)
+    (
+        """
+        CREATE TABLE IF NOT EXISTS users (
+            id TEXT PRIMARY KEY,
+            display_name TEXT,
+            created_at DATETIME DEFAULT CURRENT_TIMESTAMP
+        )
+        """,
+        """
+        CREATE TABLE IF NOT EXISTS sessions (
+            id TEXT PRIMARY KEY,
+            user_id TEXT,
+            started_at DATETIME DEFAULT CURRENT_TIMESTAMP,
+            last_activity_at DATETIME DEFAULT CURRENT_TIMESTAMP,
+            FOREIGN KEY(user_id) REFERENCES users(id)
+        )
+        """,
+        """
+        CREATE TABLE IF NOT EXISTS messages (
+            id TEXT PRIMARY KEY,
+            session_id TEXT NOT NULL,
+            role TEXT NOT NULL,
+            text TEXT,
+            audio_url TEXT,
+            created_at DATETIME DEFAULT CURRENT_TIMESTAMP,
+            FOREIGN KEY(session_id) REFERENCES sessions(id)
+        )
+        """,
+        """
+        CREATE TABLE IF NOT EXISTS memory_items (
+            id TEXT PRIMARY KEY,
+            session_id TEXT,
+            text TEXT NOT NULL,
+            tags TEXT,
+            source TEXT DEFAULT 'user',
+            trust_score REAL DEFAULT 1.0,
+            metadata TEXT,
+            added_at DATETIME DEFAULT CURRENT_TIMESTAMP,
+            FOREIGN KEY(session_id) REFERENCES sessions(id)
+        )
+        """,
+    ),
+    # 2: indexes for session history and memory listing
+    (
+        """
+        CREATE INDEX IF NOT EXISTS idx_messages_session_created
+        ON messages(session_id, created_at)
+        """,
+        """
+        CREATE INDEX IF NOT EXISTS idx_memory_items_session_added
+        ON memory_items(session_id, added_at)
+        """,
+        """
+        CREATE INDEX IF NOT EXISTS idx_memory_items_added
+        ON memory_items(added_at)
+        """,
+    ),
+]
+
+SCHEMA_VERSION = len(MIGRATIONS)
+
+
+def current_version(cur: sqlite3.Cursor) -> int:
+    return cur.execute("PRAGMA user_version").fetchone()[0]
+
+
+def apply_migrations(cur: sqlite3.Cursor) -> int:
+    """Apply pending migrations inside the caller's transaction.
+
+    Returns the resulting schema version.
+    """
+
+    version = current_version(cur)
+    if version > SCHEMA_VERSION:
+        raise RuntimeError(
+            f"Database schema version {version} is newer than supported "
+            f"version {SCHEMA_VERSION}."
+        )
+    for target, statements in enumerate(MIGRATIONS[version:], start=version + 1):
+        logger.info("Applying SQLite migration %s", target)
+        for statement in statements:
+            cur.execute(statement)
+        cur.execute(f"PRAGMA user_version={target}")
+    if SCHEMA_VERSION > version:
+        cur.execute("ANALYZE")
+    return SCHEMA_VERSION
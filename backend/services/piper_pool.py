@@ -0,0 +1,270 @@
+from __future__ import annotations
+
+import io
+import json
+import logging
+import os
+import queue
+import select
+import subprocess
+import sys
+import threading
+import time
+import wave
+from pathlib import Path
+from typing import Any, Dict, Optional
+
+logger = logging.getLogger(__name__)
+
+_BACKEND_DIR = Path(__file__).resolve().parent.parent
+
+
+class WorkerError(RuntimeError):
+    """The worker process died, hung or broke the protocol."""
+
+
+class _PiperWorker:
+    """One ``services.piper_worker`` subprocess and its framed pipe protocol."""
+
+    def __init__(self, model_path: str, index: int, startup_timeout: float):
+        self.index = index
+        self.proc = subprocess.Popen(
+            [sys.executable, "-m", "services.piper_worker", model_path],
+            cwd=str(_BACKEND_DIR),
+            stdin=subprocess.PIPE,
+            stdout=subprocess.PIPE,
+        )
+        self._buffer = bytearray()
+        self.last_used = time.monotonic()
+        header = self._read_header(time.monotonic() + startup_timeout)
+        if not header.get("ready"):
+            raise WorkerError(f"Unexpected worker handshake: {header}")
+        self.sample_rate = int(header["sample_rate"])
+
+    @property
+    def alive(self) -> bool:
+        return self.proc.poll() is None
+
+    def request(self, payload: Dict[str, Any], timeout: float) -> tuple[Dict[str, Any], bytes]:
+        deadline = time.monotonic() + timeout
+        try:
+            assert self.proc.stdin is not None
+            self.proc.stdin.write(json.dumps(payload).encode("utf-8") + b"\n")
+            self.proc.stdin.flush()
+        except (BrokenPipeError, OSError) as exc:
+            raise WorkerError(f"Piper worker {self.index} is gone: {exc}") from exc
+        header = self._read_header(deadline)
+        body = self._read_exact(int(header.get("bytes", 0)), deadline)
+        self.last_used = time.monotonic()
+        return header, body
+
+    def _fill(self, deadline: float) -> None:
+        assert self.proc.stdout is not None
+        fd = self.proc.stdout.fileno()
+        remaining = deadline - time.monotonic()
+        if remaining <= 0:
+            raise WorkerError(f"Piper worker {self.index} timed out")
+        ready, _, _ = select.select([fd], [], [], remaining)
+        if not ready:
+            raise WorkerError(f"Piper worker {self.index} timed out")
+        chunk = os.read(fd, 1 << 16)
+        if not chunk:
+            raise WorkerError(f"Piper worker {self.index} exited")
+        self._buffer += chunk
+
+    def _read_header(self, deadline: float) -> Dict[str, Any]:
+        while b"\n" not in self._buffer:
+            self._fill(deadline)
+        line, _, rest = bytes(self._buffer).partition(b"\n")
+        self._buffer = bytearray(rest)
+        try:
+            return json.loads(line)
+        except ValueError as exc:
+            raise WorkerError(f"Malformed header from worker {self.index}") from exc
+
+    def _read_exact(self, size: int, deadline: float) -> bytes:
+        while len(self._buffer) < size:
+            self._fill(deadline)
+        data = bytes(self._buffer[:size])
+        del self._buffer[:size]
+        return data
+
+    def close(self) -> None:
+        if self.proc.stdin is not None:
+            try:
+                self.proc.stdin.close()
+            except OSError:
+                pass
+        try:
+            self.proc.wait(timeout=2)
+        except subprocess.TimeoutExpired:
+            self.proc.kill()
+            self.proc.wait()
+
+
+class PiperWorkerPool:
+    """Fixed-size pool of Piper processes that keep the voice model loaded.
+
+    Text goes to a worker over stdin and raw PCM comes back over stdout, and
+    the WAV container is built in memory. A worker that crashes, hangs or
+    garbles a reply is killed and replaced on the next checkout. A background
+    thread pings idle workers every ``health_interval`` seconds so dead ones
+    are replaced before a request hits them.
+    """
+
+    def __init__(
+        self,
+        model_path: str,
+        *,
+        size: int = 2,
+        request_timeout: float = 30.0,
+        startup_timeout: float = 60.0,
+        health_interval: float = 30.0,
+    ):
+        self.model_path = model_path
+        self.size = max(1, size)
+        self.request_timeout = request_timeout
+        self.startup_timeout = startup_timeout
+        self.health_interval = health_interval
+        self._idle: "queue.Queue[Optional[_PiperWorker]]" = queue.Queue()
+        self._lock = threading.Lock()
+        self._started = False
+        self._closed = False
+        self._stop = threading.Event()
+        self.restarts = 0
+        self.failures = 0
+
+    def start(self) -> None:
+        """Spawn the workers; a no-op once started."""
+
+        with self._lock:
+            if self._started:
+                return
+            self._started = True
+            for index in range(self.size):
+                # Slots are filled lazily when a worker cannot be started now.
+                self._idle.put(self._spawn_or_none(index))
+        if self.health_interval > 0:
+            threading.Thread(
+                target=self._health_loop, name="tohum-piper-health", daemon=True
+            ).start()
+
+    def _spawn_or_none(self, index: int) -> Optional[_PiperWorker]:
+        try:
+            return _PiperWorker(self.model_path, index, self.startup_timeout)
+        except Exception as exc:
+            logger.error("Failed to start piper worker %s: %s", index, exc)
+            return None
+
+    def synthesize(self, text: str, *, speaker: Optional[str] = None) -> tuple[bytes, int]:
+        """Return ``(wav_bytes, sample_rate)`` for ``text``."""
+
+        self.start()
+        worker = self._checkout()
+        try:
+            header, pcm = worker.request(
+                {"text": text, "speaker": speaker}, self.request_timeout
+            )
+        except WorkerError:
+            self.failures += 1
+            worker.proc.kill()
+            worker.close()
+            self._idle.put(None)
+            raise
+        self._idle.put(worker)
+        if not header.get("ok"):
+            raise RuntimeError(f"Piper synthesis failed: {header.get('error')}")
+        return _pcm_to_wav(pcm, worker.sample_rate), worker.sample_rate
+
+    def _checkout(self) -> _PiperWorker:
+        if self._closed:
+            raise WorkerError("Piper worker pool is closed.")
+        try:
+            # Every worker is busy; answer "unavailable" rather than queueing
+            # requests without bound. Not a WorkerError: spawning the CLI
+            # fallback would only add load to a saturated host.
+            worker = self._idle.get(timeout=self.request_timeout)
+        except queue.Empty:
+            raise RuntimeError(
+                f"All {self.size} piper workers stayed busy for {self.request_timeout}s."
+            ) from None
+        if worker is not None and worker.alive:
+            return worker
+        index = worker.index if worker is not None else 0
+        if worker is not None:
+            worker.close()
+        replacement = self._spawn_or_none(index)
+        if replacement is None:
+            self._idle.put(None)
+            raise WorkerError("No piper worker available.")
+        with self._lock:
+            self.restarts += 1
+        return replacement
+
+    def health_check(self) -> int:
+        """Ping idle workers, replacing unresponsive ones; returns how many.
+
+        Workers are checked one at a time, so a slow respawn only holds its
+        own slot while the others keep serving requests.
+        """
+
+        replaced = 0
+        for slot in range(self._idle.qsize()):
+            try:
+                worker = self._idle.get_nowait()
+            except queue.Empty:
+                break
+            if worker is not None and worker.alive:
+                try:
+                    worker.request({"ping": True}, timeout=5.0)
+                except WorkerError:
+                    worker.proc.kill()
+                    worker.close()
+                    worker = None
+            if worker is None:
+                worker = self._spawn_or_none(slot)
+                replaced += 1
+            self._idle.put(worker)
+        if replaced:
+            with self._lock:
+                self.restarts += replaced
+        return replaced
+
+    def _health_loop(self) -> None:
+        while not self._stop.wait(self.health_interval):
+            try:
+                replaced = self.health_check()
+                if replaced:
+                    logger.warning("Replaced %s piper workers", replaced)
+            except Exception:  # pragma: no cover - runtime guard
+                logger.exception("Piper health check failed")
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "size": self.size,
+            "started": self._started,
+            "idle": self._idle.qsize(),
+            "restarts": self.restarts,
+            "failures": self.failures,
+        }
+
+    def close(self) -> None:
+        self._closed = True
+        self._stop.set()
+        while True:
+            try:
+                worker = self._idle.get_nowait()
+            except queue.Empty:
+                break
+            if worker is not None:
+                worker.close()
+
+
+def _pcm_to_wav(pcm: bytes, sample_rate: int) -> bytes:
+    buffer = io.BytesIO()
+    with wave.open(buffer, "wb") as wav:
+        wav.setnchannels(1)
+        wav.setsampwidth(2)
+        wav.setframerate(sample_rate)
+        wav.writeframes(pcm)
+    return buffer.getvalue()
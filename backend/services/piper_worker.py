@@ -0,0 +1,87 @@
+"""Long-lived Piper synthesis worker.
+
+Run as ``python -m services.piper_worker MODEL_PATH``. The voice is loaded
+once; requests then arrive on stdin as one JSON object per line and every
+response is a JSON header line on stdout, followed by ``bytes`` bytes of raw
+16-bit mono PCM when the header says so::
+
+    -> {"text": "Merhaba", "speaker": "0"}
+    <- {"ok": true, "sample_rate": 22050, "bytes": 48200}
+       <48200 bytes of PCM>
+    -> {"ping": true}
+    <- {"ok": true, "bytes": 0}
+
+A ``{"ready": true, "sample_rate": ...}`` line is written once the model is
+loaded.
+"""
+
+from __future__ import annotations
+
+import json
+import sys
+from typing import Any, Dict, Optional
+
+
+def _load_voice(model_path: str):
+    from piper.voice import PiperVoice  # type: ignore
+
+    return PiperVoice.load(model_path)
+
+
+def _speaker_id(voice, speaker: Optional[str]) -> Optional[int]:
+    if speaker in (None, ""):
+        return None
+    if str(speaker).isdigit():
+        return int(speaker)
+    return getattr(voice.config, "speaker_id_map", {}).get(speaker)
+
+
+def _synthesize(voice, text: str, speaker_id: Optional[int]) -> bytes:
+    if hasattr(voice, "synthesize_stream_raw"):  # piper-tts < 1.3
+        return b"".join(voice.synthesize_stream_raw(text, speaker_id=speaker_id))
+
+    from piper import SynthesisConfig  # type: ignore
+
+    config = SynthesisConfig(speaker_id=speaker_id)
+    return b"".join(chunk.audio_int16_bytes for chunk in voice.synthesize(text, config))
+
+
+def _reply(out, header: Dict[str, Any], payload: bytes = b"") -> None:
+    out.write(json.dumps(header).encode("utf-8") + b"\n")
+    if payload:
+        out.write(payload)
+    out.flush()
+
+
+def main(argv: list[str]) -> int:
+    if len(argv) != 2:
+        sys.stderr.write("usage: python -m services.piper_worker MODEL_PATH\n")
+        return 2
+
+    out = sys.stdout.buffer
+    # Stray prints from libraries must not corrupt the framed protocol.
+    sys.stdout = sys.stderr
+    voice = _load_voice(argv[1])
+    sample_rate = int(voice.config.sample_rate)
+    _reply(out, {"ready": True, "sample_rate": sample_rate})
+
+    for line in sys.stdin.buffer:
+        if not line.strip():
+            continue
+        try:
+            request = json.loads(line)
+            if request.get("ping"):
+                _reply(out, {"ok": True, "bytes": 0})
+                continue
+            pcm = _synthesize(
+                voice, request["text"], _speaker_id(voice, request.get("speaker"))
+            )
+        except Exception as exc:  # reported to the pool, worker stays up
+            _reply(out, {"ok": False, "error": str(exc), "bytes": 0})
+            continue
+        _reply(out, {"ok": True, "sample_rate": sample_rate, "bytes": len(pcm)}, pcm)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main(sys.argv))
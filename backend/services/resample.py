@@ -0,0 +1,110 @@
+from __future__ import annotations
+
+from functools import lru_cache
+from math import gcd
+from typing import Tuple
+
+import numpy as np
+
+# Filter half-length in input/output samples at the lower of the two rates;
+# 10 with a Kaiser(5) window mirrors scipy.signal.resample_poly's defaults.
+_HALF_TAPS = 10
+_KAISER_BETA = 5.0
+_BLOCK = 65536
+
+
+@lru_cache(maxsize=32)
+def _polyphase_filter(up: int, down: int) -> Tuple[np.ndarray, int]:
+    """Return the ``(up, taps)`` polyphase bank and the filter half length."""
+
+    ratio = max(up, down)
+    half = _HALF_TAPS * ratio
+    n = np.arange(-half, half + 1, dtype=np.float64)
+    cutoff = 1.0 / ratio
+    h = cutoff * np.sinc(cutoff * n) * np.kaiser(2 * half + 1, _KAISER_BETA) * up
+    taps = -(-h.size // up)
+    padded = np.zeros(taps * up, dtype=np.float64)
+    padded[: h.size] = h
+    # bank[p, k] = h[p + k * up]
+    return padded.reshape(taps, up).T.astype(np.float32), half
+
+
+class StreamingResampler:
+    """Rational-ratio polyphase resampler that accepts audio in pieces.
+
+    Equivalent to zero-stuffing by ``up``, low-pass filtering and keeping
+    every ``down``-th sample, but each output sample only touches the
+    ``taps`` filter coefficients of its phase. Outputs are emitted as soon as
+    every input they depend on has arrived; :meth:`finish` flushes the rest.
+    """
+
+    def __init__(self, src_rate: int, dst_rate: int = 16000):
+        if src_rate <= 0 or dst_rate <= 0:
+            raise ValueError(f"Sample rates must be positive, got {src_rate} -> {dst_rate}")
+        factor = gcd(src_rate, dst_rate)
+        self.up = dst_rate // factor
+        self.down = src_rate // factor
+        self._bank, self._half = _polyphase_filter(self.up, self.down)
+        self._taps = self._bank.shape[1]
+        # Input history: ``_buffer[0]`` is absolute input sample ``_start``.
+        self._buffer = np.zeros(0, dtype=np.float32)
+        self._start = 0
+        self._received = 0
+        self._emitted = 0
+
+    @property
+    def passthrough(self) -> bool:
+        return self.up == self.down
+
+    def push(self, audio: np.ndarray) -> np.ndarray:
+        audio = np.asarray(audio, dtype=np.float32)
+        if self.passthrough:
+            return audio
+        self._buffer = np.concatenate([self._buffer, audio])
+        self._received += audio.size
+        # Output n needs inputs up to (n * down + half) // up.
+        ready = (self._received * self.up - self._half - 1) // self.down + 1
+        return self._emit(max(ready, self._emitted))
+
+    def finish(self) -> np.ndarray:
+        if self.passthrough:
+            return np.zeros(0, dtype=np.float32)
+        total = -(-self._received * self.up // self.down)
+        return self._emit(total)
+
+    def _emit(self, stop: int) -> np.ndarray:
+        if stop <= self._emitted:
+            return np.zeros(0, dtype=np.float32)
+        out = np.empty(stop - self._emitted, dtype=np.float32)
+        for block_start in range(self._emitted, stop, _BLOCK):
+            n = np.arange(block_start, min(block_start + _BLOCK, stop), dtype=np.int64)
+            position = n * self.down + self._half
+            base = position // self.up
+            phase = position % self.up
+            index = base[:, None] - np.arange(self._taps)[None, :] - self._start
+            # Inputs before the signal start or past its end count as zeros.
+            valid = (index >= 0) & (index < self._buffer.size)
+            samples = np.zeros(index.shape, dtype=np.float32)
+            samples[valid] = self._buffer[index[valid]]
+            offset = block_start - self._emitted
+            out[offset : offset + n.size] = np.einsum("ij,ij->i", samples, self._bank[phase])
+        self._emitted = stop
+        self._trim()
+        return out
+
+    def _trim(self) -> None:
+        # The next output reaches back at most ``taps`` inputs from its base.
+        oldest = (self._emitted * self.down + self._half) // self.up - self._taps + 1
+        drop = min(max(oldest - self._start, 0), self._buffer.size)
+        if drop:
+            self._buffer = self._buffer[drop:]
+            self._start += drop
+
+
+def resample(audio: np.ndarray, src_rate: int, dst_rate: int = 16000) -> np.ndarray:
+    """Resample a whole float32 signal from ``src_rate`` to ``dst_rate``."""
+
+    resampler = StreamingResampler(src_rate, dst_rate)
+    if resampler.passthrough:
+        return np.asarray(audio, dtype=np.float32)
+    return np.concatenate([resampler.push(audio), resampler.finish()])
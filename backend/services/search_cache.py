@@ -0,0 +1,119 @@
+from __future__ import annotations
+
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Any, Dict, Hashable, List, Optional, Tuple
+
+
+@dataclass
+class _Entry:
+    generation: int
+    expires_at: float
+    payload: List[Dict[str, Any]]
+
+
+class SearchResultCache:
+    """LRU of memory search results invalidated by generation counters.
+
+    Every write bumps the generation of its session and the global one.
+    Entries record the generation they were computed under (the session's
+    for session-scoped searches, the global one otherwise), and a lookup
+    whose generation moved on is a miss. Stale entries are never scanned;
+    they fall out through LRU order or TTL.
+    """
+
+    def __init__(self, max_items: int = 1024, ttl_seconds: float = 300.0):
+        self.max_items = max(0, max_items)
+        self.ttl_seconds = ttl_seconds
+        self._entries: "OrderedDict[Hashable, _Entry]" = OrderedDict()
+        self._generations: Dict[str, int] = {}
+        self._global_generation = 0
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.stale = 0
+
+    @staticmethod
+    def make_key(
+        query: str,
+        *,
+        session_id: Optional[str],
+        tags: List[str],
+        limit: int,
+        mode: str,
+    ) -> Tuple[Any, ...]:
+        return (query, session_id, tuple(sorted(tags)), limit, mode)
+
+    def generation(self, session_id: Optional[str]) -> int:
+        with self._lock:
+            return self._generation_locked(session_id)
+
+    def _generation_locked(self, session_id: Optional[str]) -> int:
+        if session_id is None:
+            return self._global_generation
+        return self._generations.get(session_id, 0)
+
+    def get(self, key: Tuple[Any, ...]) -> Optional[List[Dict[str, Any]]]:
+        session_id = key[1]
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self.misses += 1
+                return None
+            if (
+                entry.generation != self._generation_locked(session_id)
+                or entry.expires_at < time.monotonic()
+            ):
+                del self._entries[key]
+                self.stale += 1
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return [dict(item) for item in entry.payload]
+
+    def put(
+        self, key: Tuple[Any, ...], generation: int, payload: List[Dict[str, Any]]
+    ) -> None:
+        if self.max_items == 0:
+            return
+        with self._lock:
+            if generation != self._generation_locked(key[1]):
+                # A write landed while the search ran; the result may be stale.
+                return
+            self._entries[key] = _Entry(
+                generation=generation,
+                expires_at=time.monotonic() + self.ttl_seconds,
+                payload=[dict(item) for item in payload],
+            )
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_items:
+                self._entries.popitem(last=False)
+
+    def invalidate(self, session_ids: List[Optional[str]]) -> None:
+        with self._lock:
+            self._global_generation += 1
+            for session_id in set(session_ids):
+                if session_id is not None:
+                    self._generations[session_id] = (
+                        self._generations.get(session_id, 0) + 1
+                    )
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "size": len(self._entries),
+                "max_items": self.max_items,
+                "ttl_seconds": self.ttl_seconds,
+                "hits": self.hits,
+                "misses": self.misses,
+                "stale": self.stale,
+                "hit_rate": self.hits / lookups if lookups else 0.0,
+            }
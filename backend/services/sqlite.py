@@ -0,0 +1,162 @@
+from __future__ import annotations
+
+import logging
+import sqlite3
+import threading
+import weakref
+from contextlib import contextmanager
+from typing import Callable, Iterator, List, Optional, Tuple
+
+from core.config import Settings, get_settings
+
+logger = logging.getLogger(__name__)
+
+
+class _ReaderHandle:
+    """Owns one thread's reader connection and closes it with the thread."""
+
+    def __init__(self, conn: sqlite3.Connection):
+        self.conn: Optional[sqlite3.Connection] = conn
+
+    def close(self) -> None:
+        if self.conn is not None:
+            self.conn.close()
+            self.conn = None
+
+    def __del__(self) -> None:  # pragma: no cover - depends on GC timing
+        try:
+            self.close()
+        except Exception:
+            pass
+
+
+class SQLiteConnectionManager:
+    """Persistent SQLite connections tuned once at connect time.
+
+    Every thread gets its own read-only connection, so reads run in parallel
+    under WAL. All writes share a single writer connection and are serialized
+    through ``write()``, which wraps them in one ``BEGIN IMMEDIATE`` transaction.
+    Nested ``write()`` blocks on the same thread join the outer transaction, so
+    a whole unit of work commits (and fsyncs) once.
+    """
+
+    def __init__(self, settings: Optional[Settings] = None):
+        self.settings = settings or get_settings()
+        self._local = threading.local()
+        self._readers: "weakref.WeakSet[_ReaderHandle]" = weakref.WeakSet()
+        self._readers_lock = threading.Lock()
+        self._writer_lock = threading.RLock()
+        self._writer = self._connect()
+        self._writer.execute(f"PRAGMA journal_mode={self.settings.sqlite_journal_mode}")
+
+    def _connect(self, *, readonly: bool = False) -> sqlite3.Connection:
+        conn = sqlite3.connect(
+            self.settings.sqlite_path,
+            check_same_thread=False,
+            detect_types=sqlite3.PARSE_DECLTYPES,
+            isolation_level=None,
+        )
+        conn.row_factory = sqlite3.Row
+        conn.execute(f"PRAGMA busy_timeout={int(self.settings.sqlite_busy_timeout_ms)}")
+        conn.execute(f"PRAGMA synchronous={self.settings.sqlite_synchronous}")
+        conn.execute(f"PRAGMA cache_size=-{int(self.settings.sqlite_cache_size_kib)}")
+        conn.execute(f"PRAGMA mmap_size={int(self.settings.sqlite_mmap_size)}")
+        conn.execute(f"PRAGMA temp_store={self.settings.sqlite_temp_store}")
+        if readonly:
+            conn.execute("PRAGMA query_only=ON")
+        return conn
+
+    def _reader(self) -> sqlite3.Connection:
+        handle: Optional[_ReaderHandle] = getattr(self._local, "reader", None)
+        if handle is None or handle.conn is None:
+            handle = _ReaderHandle(self._connect(readonly=True))
+            self._local.reader = handle
+            with self._readers_lock:
+                self._readers.add(handle)
+        assert handle.conn is not None
+        return handle.conn
+
+    @contextmanager
+    def read(self) -> Iterator[sqlite3.Cursor]:
+        """Yield a cursor on this thread's reader connection."""
+
+        cursor = self._reader().cursor()
+        try:
+            yield cursor
+        finally:
+            cursor.close()
+
+    @property
+    def in_transaction(self) -> bool:
+        return getattr(self._local, "depth", 0) > 0
+
+    @contextmanager
+    def write(self) -> Iterator[sqlite3.Cursor]:
+        """Yield a writer cursor inside a single committed transaction."""
+
+        with self._writer_lock:
+            cursor = self._writer.cursor()
+            if self.in_transaction:
+                self._local.depth += 1
+                try:
+                    yield cursor
+                finally:
+                    self._local.depth -= 1
+                    cursor.close()
+                return
+
+            self._local.depth = 1
+            self._local.after_commit = []
+            try:
+                cursor.execute("BEGIN IMMEDIATE")
+                yield cursor
+            except BaseException:
+                if self._writer.in_transaction:
+                    cursor.execute("ROLLBACK")
+                raise
+            else:
+                cursor.execute("COMMIT")
+            finally:
+                self._local.depth = 0
+                callbacks: List[Tuple[Callable[[], None], bool]] = self._local.after_commit
+                self._local.after_commit = []
+                cursor.close()
+
+        # Only reached when the transaction committed. The data is durable by
+        # now, so a failing callback is logged rather than failing the caller,
+        # and it does not stop the callbacks queued after it. Callbacks that
+        # asked to propagate re-raise the first such error once all have run.
+        error: Optional[BaseException] = None
+        for callback, propagate in callbacks:
+            try:
+                callback()
+            except Exception as exc:
+                if propagate:
+                    error = error or exc
+                else:
+                    logger.exception("after_commit callback failed")
+        if error is not None:
+            raise error
+
+    def after_commit(
+        self, callback: Callable[[], None], *, propagate: bool = False
+    ) -> None:
+        """Run ``callback`` once the current transaction commits (or now).
+
+        With ``propagate`` a failing callback raises out of the outermost
+        ``write()`` block instead of only being logged.
+        """
+
+        if self.in_transaction:
+            self._local.after_commit.append((callback, propagate))
+        else:
+            callback()
+
+    def close(self) -> None:
+        with self._readers_lock:
+            handles = list(self._readers)
+            self._readers.clear()
+        for handle in handles:
+            handle.close()
+        with self._writer_lock:
+            self._writer.close()
@@ -1,6 +1,7 @@
 from __future__ import annotations
 
 import logging
+import threading
 from dataclasses import dataclass
 from functools import lru_cache
 from typing import Any, Dict, List, Optional
@@ -8,11 +9,9 @@ from typing import Any, Dict, List, Optional
 import numpy as np
 
 from core.config import Settings, get_settings
-
-try:
-    from faster_whisper import WhisperModel  # type: ignore
-except ImportError:  # pragma: no cover - optional dependency
-    WhisperModel = None  # type: ignore[assignment]
+from services.resample import resample
+from services.stt_batch import WhisperBatchScheduler
+from services.vad import EnergyVAD
 
 logger = logging.getLogger(__name__)
 
@@ -31,10 +30,30 @@ class SpeechToTextService:
     def __init__(self, settings: Optional[Settings] = None):
         self.settings = settings or get_settings()
         self._model = None
-        self._load_model()
+        self._scheduler: Optional[WhisperBatchScheduler] = None
+        self._vad = EnergyVAD(self.settings) if self.settings.vad_enabled else None
+        self._load_lock = threading.Lock()
+        self._load_attempted = False
+
+    def load(self) -> bool:
+        """Load the Whisper model once; later calls return immediately.
+
+        faster-whisper is imported here rather than at module import so that
+        the API process starts without paying for CTranslate2.
+        """
+
+        if self._load_attempted:
+            return self._model is not None
+        with self._load_lock:
+            if not self._load_attempted:
+                self._load_model()
+                self._load_attempted = True
+        return self._model is not None
 
     def _load_model(self) -> None:
-        if WhisperModel is None:
+        try:
+            from faster_whisper import WhisperModel  # type: ignore
+        except ImportError:  # pragma: no cover - optional dependency
             logger.warning("faster-whisper is not installed; STT disabled.")
             return
 
@@ -52,10 +71,29 @@ class SpeechToTextService:
         except Exception as exc:  # pragma: no cover - requires runtime model files
             logger.error("Failed to load Whisper model: %s", exc)
             self._model = None
+            return
+
+        if self.settings.stt_batch_enabled:
+            self._scheduler = WhisperBatchScheduler(
+                self._model, self.settings, fallback=self._transcribe_direct
+            )
 
     def is_available(self) -> bool:
+        """Whether the model is loaded; never triggers a load."""
+
         return self._model is not None
 
+    def warm_up(self) -> None:
+        """Run one short inference so the first request skips lazy init."""
+
+        if not self.load():
+            return
+        noise = np.random.default_rng(0).normal(0.0, 0.01, 16000).astype(np.float32)
+        self._transcribe_direct(noise)
+
+    def batching_stats(self) -> Optional[Dict[str, float]]:
+        return self._scheduler.stats() if self._scheduler else None
+
     def transcribe(
         self,
         audio_bytes: bytes,
@@ -63,14 +101,63 @@ class SpeechToTextService:
         sample_rate: int = 16000,
         language: Optional[str] = None,
     ) -> Dict[str, Any]:
-        if not self._model:
+        audio = pcm16_to_float32(audio_bytes)
+        if sample_rate != 16000:
+            audio = resample(audio, sample_rate, 16000)
+        return self.transcribe_array(audio, language=language)
+
+    def transcribe_array(
+        self,
+        audio: np.ndarray,
+        *,
+        language: Optional[str] = None,
+        initial_prompt: Optional[str] = None,
+    ) -> Dict[str, Any]:
+        if not self.load():
             raise RuntimeError("Speech model not available. Install faster-whisper.")
 
-        audio = np.frombuffer(audio_bytes, dtype=np.int16).astype(np.float32) / 32768.0
+        duration = audio.size / 16000
+        offset = 0.0
+        if self._vad is not None:
+            bounds = self._vad.speech_bounds(audio)
+            if bounds is None:
+                return {
+                    "text": "",
+                    "language": language,
+                    "duration": duration,
+                    "segments": [],
+                }
+            start, end = bounds
+            audio = audio[start:end]
+            offset = start / 16000
+
+        if self._scheduler is not None:
+            result = self._scheduler.submit(
+                audio, language=language, initial_prompt=initial_prompt
+            ).result()
+        else:
+            result = self._transcribe_direct(
+                audio, language=language, initial_prompt=initial_prompt
+            )
+
+        for segment in result["segments"]:
+            segment["start"] += offset
+            segment["end"] += offset
+        result["duration"] = duration
+        return result
+
+    def _transcribe_direct(
+        self,
+        audio: np.ndarray,
+        *,
+        language: Optional[str] = None,
+        initial_prompt: Optional[str] = None,
+    ) -> Dict[str, Any]:
         segments_iterator, info = self._model.transcribe(
             audio,
             beam_size=1,
             language=language,
+            initial_prompt=initial_prompt,
         )
 
         transcript_segments: List[TranscriptionSegment] = []
@@ -93,6 +180,169 @@ class SpeechToTextService:
         }
 
 
+class StreamingTranscriber:
+    """Incremental transcription of a live utterance.
+
+    Only the uncommitted tail of the audio is decoded on every push. Segments
+    that end well before the tail and agree with the previous pass are
+    committed and their audio is dropped, so the cost per chunk stays bounded
+    by ``stt_stream_window_seconds`` instead of the utterance length.
+    """
+
+    def __init__(
+        self,
+        stt: SpeechToTextService,
+        *,
+        sample_rate: int = 16000,
+        language: Optional[str] = None,
+    ):
+        self._stt = stt
+        self.settings = stt.settings
+        self.sample_rate = sample_rate
+        self.language = language
+        self.reset()
+
+    def reset(self) -> None:
+        self._tail = np.zeros(0, dtype=np.float32)
+        self._offset = 0.0
+        self._committed: List[TranscriptionSegment] = []
+        self._previous: List[TranscriptionSegment] = []
+        self._pending: List[TranscriptionSegment] = []
+        self._detected_language: Optional[str] = self.language
+        self._last_language: Optional[str] = None
+
+    def has_audio(self) -> bool:
+        return bool(self._committed) or self._tail.size > 0
+
+    def push(self, pcm: bytes) -> Dict[str, Any]:
+        """Append PCM16 audio and return the current partial transcript."""
+
+        if pcm:
+            self._tail = np.concatenate([self._tail, pcm16_to_float32(pcm)])
+        if self._tail.size == 0:
+            return self._snapshot()
+
+        segments = self._decode_tail()
+        self._commit_stable(segments)
+        return self._snapshot()
+
+    def finalize(self, pcm: bytes = b"") -> Dict[str, Any]:
+        """Decode the remaining tail, commit everything and start over."""
+
+        if pcm:
+            self._tail = np.concatenate([self._tail, pcm16_to_float32(pcm)])
+        if self._tail.size:
+            self._pending = self._decode_tail()
+            self._commit(len(self._pending))
+        result = self._snapshot()
+        result["duration"] = self._offset + self._tail_duration()
+        self.reset()
+        return result
+
+    # ------------------------------------------------------------------
+    # Helpers
+    # ------------------------------------------------------------------
+    def _tail_duration(self) -> float:
+        return self._tail.size / self.sample_rate
+
+    def _decode_tail(self) -> List[TranscriptionSegment]:
+        prompt = " ".join(seg.text for seg in self._committed)[-200:] or None
+        result = self._stt.transcribe_array(
+            self._tail,
+            language=self._detected_language,
+            initial_prompt=prompt,
+        )
+        self._last_language = result.get("language")
+        return [
+            TranscriptionSegment(**segment)
+            for segment in result.get("segments", [])
+            if segment.get("text")
+        ]
+
+    def _commit_stable(self, segments: List[TranscriptionSegment]) -> None:
+        self._pending = segments
+        horizon = self._tail_duration() - self.settings.stt_stream_commit_margin_seconds
+
+        stable = 0
+        for idx, segment in enumerate(segments[:-1]):
+            previous = self._previous[idx] if idx < len(self._previous) else None
+            if (
+                segment.end > horizon
+                or previous is None
+                or previous.text.strip().lower() != segment.text.strip().lower()
+            ):
+                break
+            stable = idx + 1
+
+        # Keep the decode window bounded even when nothing has settled yet.
+        if self._tail_duration() > self.settings.stt_stream_window_seconds:
+            stable = max(stable, len(segments) - 1) or len(segments)
+
+        if stable:
+            self._commit(stable)
+        else:
+            self._previous = segments
+            self._trim_silence()
+
+    def _commit(self, count: int) -> None:
+        committed = self._pending[:count]
+        if not committed:
+            self._previous = []
+            self._pending = []
+            return
+
+        cut = min(committed[-1].end, self._tail_duration())
+        for segment in committed:
+            self._committed.append(
+                TranscriptionSegment(
+                    start=segment.start + self._offset,
+                    end=segment.end + self._offset,
+                    text=segment.text,
+                    confidence=segment.confidence,
+                )
+            )
+        if not self._detected_language:
+            self._detected_language = self._last_language
+
+        self._tail = self._tail[int(cut * self.sample_rate) :]
+        self._offset += cut
+        self._pending = [
+            TranscriptionSegment(
+                start=max(seg.start - cut, 0.0),
+                end=max(seg.end - cut, 0.0),
+                text=seg.text,
+                confidence=seg.confidence,
+            )
+            for seg in self._pending[count:]
+        ]
+        self._previous = self._pending
+
+    def _trim_silence(self) -> None:
+        # Without any segments the tail is noise or silence; keep only the
+        # most recent window so it cannot grow without bound.
+        if self._pending:
+            return
+        limit = int(self.settings.stt_stream_window_seconds * self.sample_rate)
+        if self._tail.size > limit:
+            dropped = self._tail.size - limit
+            self._tail = self._tail[dropped:]
+            self._offset += dropped / self.sample_rate
+
+    def _snapshot(self) -> Dict[str, Any]:
+        committed_text = " ".join(seg.text for seg in self._committed).strip()
+        tail_text = " ".join(seg.text for seg in self._pending).strip()
+        return {
+            "text": " ".join(part for part in (committed_text, tail_text) if part),
+            "committed": committed_text,
+            "language": self._detected_language or self._last_language,
+            "segments": [seg.__dict__ for seg in self._committed],
+        }
+
+
+def pcm16_to_float32(audio_bytes: bytes) -> np.ndarray:
+    return np.frombuffer(audio_bytes, dtype=np.int16).astype(np.float32) / 32768.0
+
+
 @lru_cache()
 def get_stt_service() -> SpeechToTextService:
     return SpeechToTextService()
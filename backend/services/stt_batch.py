@@ -0,0 +1,273 @@
+from __future__ import annotations
+
+import logging
+import queue
+import threading
+import time
+from concurrent.futures import Future
+from dataclasses import dataclass, field
+from typing import Any, Callable, Dict, List, Optional
+
+import numpy as np
+
+from core.config import Settings
+
+logger = logging.getLogger(__name__)
+
+SAMPLE_RATE = 16000
+WINDOW_SECONDS = 30.0
+TIME_PRECISION = 0.02
+
+DirectTranscriber = Callable[..., Dict[str, Any]]
+
+
+@dataclass
+class _Job:
+    audio: np.ndarray
+    language: Optional[str]
+    initial_prompt: Optional[str]
+    future: Future = field(default_factory=Future)
+    enqueued_at: float = field(default_factory=time.perf_counter)
+
+
+class WhisperBatchScheduler:
+    """Micro-batches Whisper jobs from concurrent callers into one inference.
+
+    Jobs submitted within ``stt_batch_max_wait_ms`` of each other (up to
+    ``stt_batch_max_size``) are encoded and decoded together through the
+    CTranslate2 model behind faster-whisper. Audio longer than one 30 s window,
+    or a batch that fails, falls back to the regular per-job transcription.
+    """
+
+    def __init__(self, model: Any, settings: Settings, fallback: DirectTranscriber):
+        self._model = model
+        self._fallback = fallback
+        self.max_batch_size = max(1, settings.stt_batch_max_size)
+        self.max_wait = max(0.0, settings.stt_batch_max_wait_ms) / 1000.0
+
+        self._queue: "queue.Queue[Optional[_Job]]" = queue.Queue()
+        self._stats_lock = threading.Lock()
+        self._stats: Dict[str, float] = {
+            "batches": 0,
+            "jobs": 0,
+            "fallbacks": 0,
+            "last_batch_size": 0,
+            "last_queue_ms": 0.0,
+            "last_inference_ms": 0.0,
+        }
+        self._thread = threading.Thread(
+            target=self._loop, name="tohum-stt-batch", daemon=True
+        )
+        self._thread.start()
+
+    def submit(
+        self,
+        audio: np.ndarray,
+        *,
+        language: Optional[str] = None,
+        initial_prompt: Optional[str] = None,
+    ) -> "Future[Dict[str, Any]]":
+        job = _Job(audio=audio, language=language, initial_prompt=initial_prompt)
+        self._queue.put(job)
+        return job.future
+
+    def stats(self) -> Dict[str, float]:
+        with self._stats_lock:
+            stats = dict(self._stats)
+        stats["avg_batch_size"] = (
+            round(stats["jobs"] / stats["batches"], 2) if stats["batches"] else 0.0
+        )
+        stats["pending"] = self._queue.qsize()
+        return stats
+
+    def shutdown(self) -> None:
+        self._queue.put(None)
+
+    # ------------------------------------------------------------------
+    # Scheduling loop
+    # ------------------------------------------------------------------
+    def _loop(self) -> None:
+        stopping = False
+        while not stopping:
+            job = self._queue.get()
+            if job is None:
+                return
+            batch = [job]
+            deadline = time.perf_counter() + self.max_wait
+            while len(batch) < self.max_batch_size:
+                remaining = deadline - time.perf_counter()
+                if remaining <= 0:
+                    break
+                try:
+                    nxt = self._queue.get(timeout=remaining)
+                except queue.Empty:
+                    break
+                if nxt is None:
+                    stopping = True
+                    break
+                batch.append(nxt)
+            self._dispatch(batch)
+
+    def _dispatch(self, batch: List[_Job]) -> None:
+        started = time.perf_counter()
+        window = int(WINDOW_SECONDS * SAMPLE_RATE)
+        batchable = [job for job in batch if job.audio.size <= window]
+        oversized = [job for job in batch if job.audio.size > window]
+
+        results: Dict[int, Dict[str, Any]] = {}
+        if batchable:
+            try:
+                for job, result in zip(batchable, self._run_batch(batchable)):
+                    results[id(job)] = result
+            except Exception as exc:  # pragma: no cover - requires runtime model
+                logger.warning("Batched Whisper inference failed: %s", exc)
+                oversized = batch
+
+        for job in oversized:
+            try:
+                results[id(job)] = self._fallback(
+                    job.audio, language=job.language, initial_prompt=job.initial_prompt
+                )
+            except Exception as exc:
+                job.future.set_exception(exc)
+            with self._stats_lock:
+                self._stats["fallbacks"] += 1
+
+        finished = time.perf_counter()
+        inference_ms = (finished - started) * 1000.0
+        for job in batch:
+            result = results.get(id(job))
+            if result is None:
+                continue
+            queue_ms = (started - job.enqueued_at) * 1000.0
+            result["latency"] = {
+                "queue_ms": round(queue_ms, 2),
+                "inference_ms": round(inference_ms, 2),
+                "total_ms": round(queue_ms + inference_ms, 2),
+                "batch_size": len(batch),
+            }
+            job.future.set_result(result)
+
+        with self._stats_lock:
+            self._stats["batches"] += 1
+            self._stats["jobs"] += len(batch)
+            self._stats["last_batch_size"] = len(batch)
+            self._stats["last_queue_ms"] = round(
+                max((started - job.enqueued_at) * 1000.0 for job in batch), 2
+            )
+            self._stats["last_inference_ms"] = round(inference_ms, 2)
+
+    # ------------------------------------------------------------------
+    # Batched inference
+    # ------------------------------------------------------------------
+    def _run_batch(self, jobs: List[_Job]) -> List[Dict[str, Any]]:
+        import ctranslate2
+        from faster_whisper.tokenizer import Tokenizer
+
+        model = self._model
+        extractor = model.feature_extractor
+        frames = extractor.nb_max_frames
+        features = []
+        for job in jobs:
+            mel = extractor(job.audio)[:, :frames]
+            if mel.shape[-1] < frames:
+                mel = np.pad(mel, [(0, 0), (0, frames - mel.shape[-1])])
+            features.append(mel)
+        storage = ctranslate2.StorageView.from_array(
+            np.ascontiguousarray(np.stack(features).astype(np.float32))
+        )
+        encoder_output = model.model.encode(storage, to_cpu=False)
+
+        languages = [job.language for job in jobs]
+        if any(language is None for language in languages):
+            if model.model.is_multilingual:
+                detected = model.model.detect_language(encoder_output)
+                languages = [
+                    language or detected[idx][0][0][2:-2]
+                    for idx, language in enumerate(languages)
+                ]
+            else:
+                languages = [language or "en" for language in languages]
+
+        max_length = getattr(model, "max_length", 448)
+        tokenizers = []
+        prompts = []
+        for job, language in zip(jobs, languages):
+            tokenizer = Tokenizer(
+                model.hf_tokenizer,
+                model.model.is_multilingual,
+                task="transcribe",
+                language=language,
+            )
+            prompt: List[int] = []
+            if job.initial_prompt:
+                previous = tokenizer.encode(" " + job.initial_prompt.strip())
+                prompt.append(tokenizer.sot_prev)
+                prompt.extend(previous[-(max_length // 2 - 1) :])
+            prompt.extend(tokenizer.sot_sequence)
+            tokenizers.append(tokenizer)
+            prompts.append(prompt)
+
+        outputs = model.model.generate(
+            encoder_output,
+            prompts,
+            beam_size=1,
+            max_length=max_length,
+            return_scores=True,
+            suppress_blank=True,
+            suppress_tokens=[-1],
+            max_initial_timestamp_index=int(round(1.0 / TIME_PRECISION)),
+        )
+
+        results = []
+        for job, language, tokenizer, output in zip(jobs, languages, tokenizers, outputs):
+            tokens = output.sequences_ids[0]
+            confidence = output.scores[0] * len(tokens) / (len(tokens) + 1)
+            duration = job.audio.size / SAMPLE_RATE
+            segments = self._split_segments(tokens, tokenizer, duration, confidence)
+            results.append(
+                {
+                    "text": " ".join(seg["text"] for seg in segments).strip(),
+                    "language": language,
+                    "duration": duration,
+                    "segments": segments,
+                }
+            )
+        return results
+
+    @staticmethod
+    def _split_segments(
+        tokens: List[int], tokenizer: Any, duration: float, confidence: float
+    ) -> List[Dict[str, Any]]:
+        segments: List[Dict[str, Any]] = []
+        start: Optional[float] = None
+        last = 0.0
+        text_tokens: List[int] = []
+
+        def close(end: float) -> None:
+            text = tokenizer.decode(text_tokens).strip()
+            if text:
+                segments.append(
+                    {
+                        "start": last if start is None else start,
+                        "end": min(end, duration),
+                        "text": text,
+                        "confidence": confidence,
+                    }
+                )
+
+        for token in tokens:
+            if token >= tokenizer.timestamp_begin:
+                position = (token - tokenizer.timestamp_begin) * TIME_PRECISION
+                if start is not None and text_tokens:
+                    close(position)
+                    text_tokens = []
+                    start = None
+                else:
+                    start = position
+                last = position
+            elif token < tokenizer.eot:
+                text_tokens.append(token)
+        if text_tokens:
+            close(duration)
+        return segments
@@ -1,17 +1,20 @@
 from __future__ import annotations
 
+import importlib.util
 import io
 import logging
 import shlex
 import shutil
 import subprocess
-import uuid
+import tempfile
 from dataclasses import dataclass
 from pathlib import Path
 from functools import lru_cache
-from typing import Optional
+from typing import Any, Dict, Optional
 
 from core.config import Settings, get_settings
+from services.piper_pool import PiperWorkerPool, WorkerError
+from services.tts_cache import TTSCache
 
 try:
     from gtts import gTTS  # type: ignore
@@ -36,6 +39,34 @@ class TextToSpeechService:
         self.settings = settings or get_settings()
         self._audio_dir = Path(self.settings.audio_tmp_dir)
         self._audio_dir.mkdir(parents=True, exist_ok=True)
+        self._cache: Optional[TTSCache] = None
+        if self.settings.tts_cache_max_bytes > 0:
+            self._cache = TTSCache(
+                str(self._audio_dir / "cache"),
+                max_bytes=self.settings.tts_cache_max_bytes,
+                ttl_seconds=self.settings.audio_ttl_hours * 3600,
+                sweep_interval=self.settings.tts_cache_sweep_seconds,
+            )
+        self._piper_pool: Optional[PiperWorkerPool] = None
+        if self.settings.piper_model_path and self.settings.piper_workers > 0:
+            if importlib.util.find_spec("piper") is None:
+                # Workers would die on import; synthesize through the CLI instead.
+                logger.info("piper-tts is not installed; using the piper CLI.")
+            else:
+                self._piper_pool = PiperWorkerPool(
+                    self.settings.piper_model_path,
+                    size=self.settings.piper_workers,
+                    request_timeout=self.settings.piper_request_timeout_seconds,
+                    health_interval=self.settings.piper_health_interval_seconds,
+                )
+
+    def start_workers(self) -> bool:
+        """Start the piper worker pool ahead of the first request."""
+
+        if self._piper_pool is None or self.settings.tts_profile != "offline":
+            return False
+        self._piper_pool.start()
+        return True
 
     def is_online_profile(self) -> bool:
         return self.settings.tts_profile == "online"
@@ -48,76 +79,114 @@ class TextToSpeechService:
         lang: Optional[str] = None,
         filename: Optional[str] = None,
     ) -> TTSResult:
-        if self.settings.tts_profile == "offline":
-            return self._synthesize_with_piper(
-                text,
-                voice=voice,
-                filename=filename,
+        """Synthesize ``text``, serving repeated requests from the cache.
+
+        With ``filename`` the audio is also written to that name under
+        ``audio_tmp_dir``; otherwise ``TTSResult.filename`` points at the
+        cached file (or is ``None`` when caching is disabled).
+        """
+
+        backend = self._resolve_backend()
+        if backend == "piper":
+            voice = voice or self.settings.piper_speaker
+            lang = None
+            model = self.settings.piper_model_path
+        else:
+            lang = lang or self.settings.gtts_language
+            model = None
+
+        key = None
+        if self._cache is not None:
+            key = TTSCache.make_key(
+                profile=backend, voice=voice, lang=lang, text=text, model=model
             )
-        return self._synthesize_with_gtts(
-            text,
-            voice=voice,
-            lang=lang or self.settings.gtts_language,
-            filename=filename,
-        )
+            cached = self._cache.get(key)
+            if cached is not None:
+                audio, entry = cached
+                result = TTSResult(
+                    audio=audio,
+                    format=entry.format,
+                    sample_rate=entry.sample_rate,
+                    filename=str(entry.path),
+                )
+                return self._write_named(result, filename)
 
-    # ------------------------------------------------------------------
-    # Offline: Piper CLI
-    # ------------------------------------------------------------------
-    def _synthesize_with_piper(
-        self,
-        text: str,
-        *,
-        voice: Optional[str],
-        filename: Optional[str],
-    ) -> TTSResult:
+        if backend == "piper":
+            result = self._synthesize_with_piper(text, voice=voice)
+        else:
+            result = self._synthesize_with_gtts(text, voice=voice, lang=lang)
+
+        if self._cache is not None and key is not None:
+            path = self._cache.put(
+                key, result.audio, format=result.format, sample_rate=result.sample_rate
+            )
+            result.filename = str(path)
+        return self._write_named(result, filename)
+
+    def _resolve_backend(self) -> str:
+        if self.settings.tts_profile != "offline":
+            return "gtts"
         if not self.settings.piper_model_path:
             logger.warning(
                 "PIPER_MODEL_PATH is not set; falling back to gTTS online synthesis."
             )
-            return self._synthesize_with_gtts(
-                text,
-                voice=voice,
-                lang=self.settings.gtts_language,
-                filename=filename,
-            )
+            return "gtts"
+        if self._piper_pool is None and not shutil.which("piper"):
+            logger.warning("piper binary not found; falling back to gTTS.")
+            return "gtts"
+        return "piper"
+
+    def _write_named(self, result: TTSResult, filename: Optional[str]) -> TTSResult:
+        if filename:
+            output_path = self._resolve_output_path(filename)
+            output_path.write_bytes(result.audio)
+            result.filename = str(output_path)
+        return result
+
+    def cache_stats(self) -> Optional[Dict[str, Any]]:
+        return self._cache.stats() if self._cache else None
+
+    def piper_pool_stats(self) -> Optional[Dict[str, Any]]:
+        return self._piper_pool.stats() if self._piper_pool else None
+
+    # ------------------------------------------------------------------
+    # Offline: Piper worker pool, with the CLI as fallback
+    # ------------------------------------------------------------------
+    def _synthesize_with_piper(self, text: str, *, voice: Optional[str]) -> TTSResult:
+        if self._piper_pool is not None:
+            try:
+                audio, sample_rate = self._piper_pool.synthesize(text, speaker=voice)
+                return TTSResult(audio=audio, format="wav", sample_rate=sample_rate)
+            except WorkerError as exc:
+                logger.warning("Piper worker pool unavailable (%s); using the CLI.", exc)
 
         binary = shutil.which("piper")
         if not binary:
-            logger.warning("piper binary not found; falling back to gTTS.")
-            return self._synthesize_with_gtts(
-                text,
-                voice=voice,
-                lang=self.settings.gtts_language,
-                filename=filename,
-            )
+            raise RuntimeError("Piper synthesis failed: no worker or piper binary available.")
+        with tempfile.TemporaryDirectory(dir=self._audio_dir) as workdir:
+            output_path = Path(workdir) / "out.wav"
+            command = f'{binary} --model "{self.settings.piper_model_path}" --output_file "{output_path}"'
+            if voice:
+                command += f' --speaker "{voice}"'
 
-        output_path = self._resolve_output_path(filename or f"{uuid.uuid4()}.wav")
-        command = f'{binary} --model "{self.settings.piper_model_path}" --output_file "{output_path}"'
-        if voice or self.settings.piper_speaker:
-            speaker = voice or self.settings.piper_speaker
-            if speaker:
-                command += f' --speaker "{speaker}"'
-
-        logger.debug("Running piper command: %s", command)
-        proc = subprocess.run(
-            shlex.split(command),
-            input=text.encode("utf-8"),
-            capture_output=True,
-        )
-        if proc.returncode != 0:
-            logger.error(
-                "Piper synthesis failed: %s",
-                proc.stderr.decode("utf-8", errors="ignore"),
+            logger.debug("Running piper command: %s", command)
+            proc = subprocess.run(
+                shlex.split(command),
+                input=text.encode("utf-8"),
+                capture_output=True,
             )
-            raise RuntimeError("Piper synthesis failed.")
+            if proc.returncode != 0:
+                logger.error(
+                    "Piper synthesis failed: %s",
+                    proc.stderr.decode("utf-8", errors="ignore"),
+                )
+                raise RuntimeError("Piper synthesis failed.")
 
-        audio_bytes = output_path.read_bytes()
+            audio_bytes = output_path.read_bytes()
         return TTSResult(
             audio=audio_bytes,
             format="wav",
             sample_rate=22050,
-            filename=str(output_path),
         )
 
     # ------------------------------------------------------------------
@@ -129,7 +198,6 @@ class TextToSpeechService:
         *,
         voice: Optional[str],
         lang: str,
-        filename: Optional[str],
     ) -> TTSResult:
         if gTTS is None:
             raise RuntimeError("gTTS is not installed. Install gTTS to use online TTS.")
@@ -137,16 +205,11 @@ class TextToSpeechService:
         buffer = io.BytesIO()
         tts = gTTS(text=text, lang=lang, tld=self._resolve_tld_for_voice(voice))
         tts.write_to_fp(buffer)
-        buffer.seek(0)
-
-        output_path = self._resolve_output_path(filename or f"{uuid.uuid4()}.mp3")
-        output_path.write_bytes(buffer.getvalue())
 
         return TTSResult(
             audio=buffer.getvalue(),
             format="mp3",
             sample_rate=22050,
-            filename=str(output_path),
         )
 
     def _resolve_output_path(self, filename: str) -> Path:
@@ -166,10 +229,19 @@ class TextToSpeechService:
         return mapping.get(voice.lower(), "com")
 
     def cleanup_expired(self, ttl_hours: Optional[int] = None) -> int:
+        """Drop audio older than the TTL.
+
+        Cache entries are swept from the in-memory index (the background
+        sweeper does this too). Named outputs and legacy files live directly
+        in the audio directory and are expired by mtime.
+        """
+
         ttl = ttl_hours or self.settings.audio_ttl_hours
         removed = 0
         if ttl <= 0:
             return removed
+        if self._cache is not None:
+            removed += self._cache.sweep(ttl * 3600)
 
         cutoff = self._now_timestamp() - (ttl * 3600)
         for path in self._audio_dir.glob("*"):
@@ -186,6 +258,12 @@ class TextToSpeechService:
 
         return time.time()
 
+    def close(self) -> None:
+        if self._cache is not None:
+            self._cache.close()
+        if self._piper_pool is not None:
+            self._piper_pool.close()
+
 
 @lru_cache()
 def get_tts_service() -> TextToSpeechService:
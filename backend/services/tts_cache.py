@@ -0,0 +1,209 @@
+from __future__ import annotations
+
+import hashlib
+import logging
+import os
+import re
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any, Dict, Optional
+
+logger = logging.getLogger(__name__)
+
+# <sha256>-<sample_rate>.<format>
+_ENTRY_NAME = re.compile(r"^([0-9a-f]{64})-(\d+)\.(\w+)$")
+
+
+@dataclass
+class CachedAudio:
+    path: Path
+    size: int
+    format: str
+    sample_rate: int
+    last_access: float
+
+
+class TTSCache:
+    """Content-addressed store of synthesized audio.
+
+    Files are named after a SHA-256 of everything that affects the audio, so
+    identical requests share one file. An in-memory index ordered by last
+    access serves lookups and drives eviction: ``put`` trims the least
+    recently used files past ``max_bytes``, and a background sweeper drops
+    entries idle for longer than ``ttl_seconds``. The directory is only
+    listed once, when the index is rebuilt at startup.
+    """
+
+    def __init__(
+        self,
+        directory: str,
+        *,
+        max_bytes: int,
+        ttl_seconds: float,
+        sweep_interval: float = 300.0,
+    ):
+        self.directory = Path(directory)
+        self.directory.mkdir(parents=True, exist_ok=True)
+        self.max_bytes = max_bytes
+        self.ttl_seconds = ttl_seconds
+        self._index: "OrderedDict[str, CachedAudio]" = OrderedDict()
+        self._total_bytes = 0
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._load_index()
+
+        self._stop = threading.Event()
+        self._sweeper: Optional[threading.Thread] = None
+        if ttl_seconds > 0 and sweep_interval > 0:
+            self._sweeper = threading.Thread(
+                target=self._sweep_loop,
+                args=(sweep_interval,),
+                name="tohum-tts-cache-sweeper",
+                daemon=True,
+            )
+            self._sweeper.start()
+
+    @staticmethod
+    def make_key(
+        *,
+        profile: str,
+        voice: Optional[str],
+        lang: Optional[str],
+        text: str,
+        model: Optional[str],
+    ) -> str:
+        parts = (profile, voice or "", lang or "", model or "", text)
+        return hashlib.sha256("\0".join(parts).encode("utf-8")).hexdigest()
+
+    def _load_index(self) -> None:
+        entries = []
+        with os.scandir(self.directory) as listing:
+            for item in listing:
+                match = _ENTRY_NAME.match(item.name)
+                if not match or not item.is_file():
+                    continue
+                stat = item.stat()
+                entries.append(
+                    (
+                        match.group(1),
+                        CachedAudio(
+                            path=Path(item.path),
+                            size=stat.st_size,
+                            format=match.group(3),
+                            sample_rate=int(match.group(2)),
+                            last_access=stat.st_mtime,
+                        ),
+                    )
+                )
+        for key, entry in sorted(entries, key=lambda pair: pair[1].last_access):
+            self._index[key] = entry
+            self._total_bytes += entry.size
+
+    def get(self, key: str) -> Optional[tuple[bytes, CachedAudio]]:
+        with self._lock:
+            entry = self._index.get(key)
+            if entry is None:
+                self.misses += 1
+                return None
+            entry.last_access = time.time()
+            self._index.move_to_end(key)
+        try:
+            audio = entry.path.read_bytes()
+            # Keep mtime in step with access so a restart rebuilds the same order.
+            os.utime(entry.path)
+        except FileNotFoundError:
+            with self._lock:
+                if self._index.get(key) is entry:
+                    del self._index[key]
+                    self._total_bytes -= entry.size
+                self.misses += 1
+            return None
+        with self._lock:
+            self.hits += 1
+        return audio, entry
+
+    def put(self, key: str, audio: bytes, *, format: str, sample_rate: int) -> Path:
+        path = self.directory / f"{key}-{sample_rate}.{format}"
+        tmp = path.with_name(f".{path.name}.{threading.get_ident()}.tmp")
+        tmp.write_bytes(audio)
+        os.replace(tmp, path)
+        with self._lock:
+            victims = []
+            previous = self._index.pop(key, None)
+            if previous is not None:
+                self._total_bytes -= previous.size
+                if previous.path != path:
+                    victims.append(previous)
+            self._index[key] = CachedAudio(
+                path=path,
+                size=len(audio),
+                format=format,
+                sample_rate=sample_rate,
+                last_access=time.time(),
+            )
+            self._total_bytes += len(audio)
+            while self._total_bytes > self.max_bytes and len(self._index) > 1:
+                victims.append(self._pop_oldest_locked())
+        self._unlink(victims)
+        return path
+
+    def _pop_oldest_locked(self) -> CachedAudio:
+        _, entry = self._index.popitem(last=False)
+        self._total_bytes -= entry.size
+        self.evictions += 1
+        return entry
+
+    def sweep(self, ttl_seconds: Optional[float] = None) -> int:
+        """Remove entries idle for longer than the TTL; returns the count."""
+
+        ttl = self.ttl_seconds if ttl_seconds is None else ttl_seconds
+        if ttl <= 0:
+            return 0
+        cutoff = time.time() - ttl
+        victims = []
+        with self._lock:
+            # Index order is last-access order, so expired entries are a prefix.
+            while self._index:
+                entry = next(iter(self._index.values()))
+                if entry.last_access >= cutoff:
+                    break
+                victims.append(self._pop_oldest_locked())
+        self._unlink(victims)
+        return len(victims)
+
+    def _unlink(self, entries) -> None:
+        for entry in entries:
+            try:
+                entry.path.unlink()
+            except FileNotFoundError:  # pragma: no cover - race condition guard
+                continue
+
+    def _sweep_loop(self, interval: float) -> None:
+        while not self._stop.wait(interval):
+            try:
+                removed = self.sweep()
+                if removed:
+                    logger.debug("TTS cache sweeper removed %s files", removed)
+            except Exception:  # pragma: no cover - runtime guard
+                logger.exception("TTS cache sweep failed")
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "entries": len(self._index),
+                "bytes": self._total_bytes,
+                "max_bytes": self.max_bytes,
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "hit_rate": self.hits / lookups if lookups else 0.0,
+            }
+
+    def close(self) -> None:
+        self._stop.set()
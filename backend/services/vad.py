@@ -0,0 +1,119 @@
+from __future__ import annotations
+
+from collections import deque
+from typing import Any, Deque, Dict, List, Optional, Tuple
+
+import numpy as np
+
+from core.config import Settings, get_settings
+
+
+class EnergyVAD:
+    """Cheap voice activity detector based on frame energy and zero crossings.
+
+    A frame counts as speech when its energy is above
+    ``vad_energy_threshold_db`` (dBFS) and its zero-crossing rate is below
+    ``vad_zcr_threshold``, which rejects broadband hiss. Speech is extended by
+    ``vad_hangover_ms`` so short pauses between words are kept.
+    """
+
+    def __init__(self, settings: Optional[Settings] = None, sample_rate: int = 16000):
+        self.settings = settings or get_settings()
+        self.sample_rate = sample_rate
+        self.frame_size = max(1, int(sample_rate * self.settings.vad_frame_ms / 1000))
+        self.hangover_frames = self._frames_for(self.settings.vad_hangover_ms)
+        self.padding_frames = self._frames_for(self.settings.vad_padding_ms)
+
+    def _frames_for(self, milliseconds: int) -> int:
+        return int(round(milliseconds / self.settings.vad_frame_ms))
+
+    def classify(self, audio: np.ndarray) -> np.ndarray:
+        """Return a raw speech flag per full frame of float32 ``audio``."""
+
+        count = audio.size // self.frame_size
+        if count == 0:
+            return np.zeros(0, dtype=bool)
+        frames = audio[: count * self.frame_size].reshape(count, self.frame_size)
+        energy_db = 10.0 * np.log10(np.mean(frames * frames, axis=1) + 1e-10)
+        signs = np.signbit(frames)
+        zcr = np.count_nonzero(signs[:, 1:] != signs[:, :-1], axis=1) / self.frame_size
+        return (energy_db > self.settings.vad_energy_threshold_db) & (
+            zcr < self.settings.vad_zcr_threshold
+        )
+
+    def speech_bounds(self, audio: np.ndarray) -> Optional[Tuple[int, int]]:
+        """Return sample bounds covering all speech, or ``None`` for silence."""
+
+        flags = self.classify(audio)
+        voiced = np.flatnonzero(flags)
+        if voiced.size == 0:
+            return None
+        first = max(int(voiced[0]) - self.padding_frames, 0)
+        last = int(voiced[-1]) + 1 + self.hangover_frames + self.padding_frames
+        return first * self.frame_size, min(last * self.frame_size, audio.size)
+
+
+class StreamingVAD:
+    """Stateful wrapper of :class:`EnergyVAD` for live PCM16 streams.
+
+    ``process`` returns only the audio that should reach the recognizer
+    (speech, hangover and a short pre-roll) together with speech start/end
+    events. Partial frames are carried over to the next call.
+    """
+
+    def __init__(self, settings: Optional[Settings] = None, sample_rate: int = 16000):
+        self._vad = EnergyVAD(settings, sample_rate=sample_rate)
+        self.sample_rate = sample_rate
+        self.reset()
+
+    @property
+    def in_speech(self) -> bool:
+        return self._in_speech
+
+    def reset(self) -> None:
+        self._remainder = np.zeros(0, dtype=np.int16)
+        self._preroll: Deque[np.ndarray] = deque(maxlen=max(self._vad.padding_frames, 1))
+        self._hangover = 0
+        self._in_speech = False
+        self._frames_seen = 0
+
+    def process(self, pcm: bytes) -> Tuple[bytes, List[Dict[str, Any]]]:
+        samples = np.frombuffer(pcm, dtype=np.int16)
+        if self._remainder.size:
+            samples = np.concatenate([self._remainder, samples])
+
+        frame_size = self._vad.frame_size
+        count = samples.size // frame_size
+        self._remainder = samples[count * frame_size :].copy()
+        if count == 0:
+            return b"", []
+
+        frames = samples[: count * frame_size].reshape(count, frame_size)
+        flags = self._vad.classify(frames.reshape(-1).astype(np.float32) / 32768.0)
+
+        kept: List[np.ndarray] = []
+        events: List[Dict[str, Any]] = []
+        for index, (frame, voiced) in enumerate(zip(frames, flags)):
+            offset = (self._frames_seen + index) * frame_size / self.sample_rate
+            if voiced:
+                if not self._in_speech:
+                    self._in_speech = True
+                    events.append({"speech": True, "offset": round(offset, 3)})
+                    kept.extend(self._preroll)
+                    self._preroll.clear()
+                self._hangover = self._vad.hangover_frames
+                kept.append(frame)
+            elif self._in_speech and self._hangover > 0:
+                self._hangover -= 1
+                kept.append(frame)
+            else:
+                if self._in_speech:
+                    self._in_speech = False
+                    events.append({"speech": False, "offset": round(offset, 3)})
+                if self._vad.padding_frames:
+                    self._preroll.append(frame)
+        self._frames_seen += count
+
+        if not kept:
+            return b"", events
+        return np.concatenate(kept).tobytes(), events
@@ -0,0 +1,597 @@
+from __future__ import annotations
+
+import json
+import logging
+import os
+import threading
+from abc import ABC, abstractmethod
+from contextlib import contextmanager
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Sequence
+
+import numpy as np
+
+from core.config import Settings
+
+try:
+    import fcntl
+except ImportError:  # pragma: no cover - non-POSIX platforms
+    fcntl = None  # type: ignore[assignment]
+
+logger = logging.getLogger(__name__)
+
+VECTOR_STORES = ("chroma", "flat")
+
+
+@dataclass
+class VectorHit:
+    id: str
+    document: str
+    metadata: Dict[str, Any]
+    distance: float
+
+
+class VectorStore(ABC):
+    """Minimal interface MemoryService needs from a vector index."""
+
+    @abstractmethod
+    def upsert(
+        self,
+        ids: List[str],
+        documents: List[str],
+        embeddings: Sequence[Sequence[float]],
+        metadatas: List[Dict[str, Any]],
+    ) -> None:
+        """Insert or replace the given records."""
+
+    @abstractmethod
+    def query(
+        self,
+        embedding: Sequence[float],
+        *,
+        n_results: int,
+        session_id: Optional[str] = None,
+        tags: Optional[Iterable[str]] = None,
+    ) -> List[VectorHit]:
+        """Return up to ``n_results`` hits, nearest first."""
+
+    def close(self) -> None:
+        pass
+
+
+# ----------------------------------------------------------------------
+# Chroma
+# ----------------------------------------------------------------------
+class ChromaVectorStore(VectorStore):
+    """Adapter over a Chroma collection."""
+
+    def __init__(self, settings: Settings, embedding_fn):
+        # chromadb pulls in onnxruntime, sentence-transformers and friends, so
+        # it is imported when the store is built rather than with the module.
+        try:
+            import chromadb
+            from chromadb.config import Settings as ChromaSettings
+        except ImportError as exc:  # pragma: no cover - defensive fallback for optional dep
+            raise RuntimeError(
+                "chromadb package is required for MemoryService but is not installed."
+            ) from exc
+
+        chroma_settings = ChromaSettings(
+            chroma_db_impl="duckdb+parquet",
+            persist_directory=settings.chroma_path,
+        )
+        client = chromadb.Client(chroma_settings)
+        self._collection = client.get_or_create_collection(
+            name=settings.chroma_collection,
+            embedding_function=embedding_fn,
+            metadata={"description": "Tohum v1 long-term memory"},
+        )
+
+    def upsert(self, ids, documents, embeddings, metadatas) -> None:
+        self._collection.upsert(
+            ids=ids,
+            documents=documents,
+            embeddings=[list(map(float, vector)) for vector in embeddings],
+            metadatas=metadatas,
+        )
+
+    def query(self, embedding, *, n_results, session_id=None, tags=None) -> List[VectorHit]:
+        where: Dict[str, Any] = {}
+        if session_id:
+            where["session_id"] = session_id
+        tags_list = list(tags or [])
+        if tags_list:
+            where["tags"] = {"$contains": tags_list}
+
+        results = self._collection.query(
+            query_embeddings=[list(map(float, embedding))],
+            n_results=n_results,
+            where=where or None,
+        )
+        documents = results.get("documents", [[]])[0]
+        ids = results.get("ids", [[]])[0]
+        metadatas = results.get("metadatas", [[]])[0]
+        distances = results.get("distances", [[]])[0]
+        return [
+            VectorHit(
+                id=ids[idx],
+                document=doc,
+                metadata=(metadatas[idx] if metadatas else None) or {},
+                distance=distances[idx] if distances else None,
+            )
+            for idx, doc in enumerate(documents)
+        ]
+
+
+# ----------------------------------------------------------------------
+# Flat memory-mapped index
+# ----------------------------------------------------------------------
+class _RowList:
+    """Growable ascending int64 array (row numbers or file offsets)."""
+
+    __slots__ = ("_rows", "_size")
+
+    def __init__(self) -> None:
+        self._rows = np.zeros(8, dtype=np.int64)
+        self._size = 0
+
+    def __len__(self) -> int:
+        return self._size
+
+    def __getitem__(self, index: int) -> int:
+        return int(self._rows[index])
+
+    def append(self, row: int) -> None:
+        if self._size == self._rows.size:
+            self._rows = np.resize(self._rows, self._rows.size * 2)
+        self._rows[self._size] = row
+        self._size += 1
+
+    def view(self) -> np.ndarray:
+        return self._rows[: self._size]
+
+
+class FlatVectorStore(VectorStore):
+    """Exact cosine search over an append-only, memory-mapped matrix.
+
+    On disk, generation ``g`` consists of ``vectors.<g>.bin`` (row-major
+    float32/float16, L2-normalized) and ``records.<g>.jsonl`` (one line per
+    row with id, document and metadata). ``manifest.json`` names the live
+    generation and is replaced atomically, which makes compaction safe.
+
+    Appends write the vector rows first and the sidecar lines second, and a
+    row only counts once its sidecar line is complete. Upserting an existing
+    id appends a new row and masks the old one; ``compact()`` drops masked
+    rows once they exceed ``compact_ratio`` of the file.
+
+    Several processes may share one directory. Writers hold an exclusive
+    ``flock`` on the ``lock`` file and readers a shared one, and each
+    operation first catches up with rows other processes appended (or with
+    a new generation after their compaction). Torn tails left by a crashed
+    writer are truncated by the next writer before it appends. Only ids,
+    sidecar offsets and the filter index live in RAM; the vectors come from
+    the shared page cache and documents are read back for the hits only.
+
+    Session and tag filters resolve through an in-memory posting index. When
+    the candidates are at most ``prefilter_max_selectivity`` of the live rows
+    only they are scored; broader filters scan everything under a mask.
+    """
+
+    COMPACT_MIN_DEAD_ROWS = 1024
+
+    def __init__(
+        self,
+        path: str,
+        *,
+        dtype: str = "float32",
+        compact_ratio: float = 0.25,
+        fsync: bool = True,
+        prefilter_max_selectivity: float = 0.2,
+    ):
+        self.root = Path(path)
+        self.root.mkdir(parents=True, exist_ok=True)
+        self.compact_ratio = compact_ratio
+        self.fsync = fsync
+        self.prefilter_max_selectivity = prefilter_max_selectivity
+        self._lock = threading.RLock()
+        self._lock_fd = os.open(self.root / "lock", os.O_RDWR | os.O_CREAT, 0o644)
+        self._records_fd: Optional[int] = None
+
+        self._default_dtype = np.dtype(dtype)
+        self._reset()
+        with self._file_lock(exclusive=True):
+            self._sync(repair=True)
+            self._remove_stale_generations()
+
+    def _reset(self) -> None:
+        self._manifest_stamp: Optional[tuple] = None
+        self._generation = 0
+        self._dtype = self._default_dtype
+        self._dim: Optional[int] = None
+        self._rows = 0
+        self._offsets = _RowList()
+        self._row_of: Dict[str, int] = {}
+        self._alive = np.zeros(0, dtype=bool)
+        # Filter index: rows per session_id and per tag, ascending. Masked
+        # rows stay listed until compaction and are dropped at query time.
+        self._by_session: Dict[str, _RowList] = {}
+        self._by_tag: Dict[str, _RowList] = {}
+        self._matrix: Optional[np.ndarray] = None
+        self._records_size = 0
+        self._close_records()
+
+    # ------------------------------------------------------------------
+    # Files
+    # ------------------------------------------------------------------
+    @property
+    def _manifest_path(self) -> Path:
+        return self.root / "manifest.json"
+
+    def _vectors_path(self, generation: int) -> Path:
+        return self.root / f"vectors.{generation}.bin"
+
+    def _records_path(self, generation: int) -> Path:
+        return self.root / f"records.{generation}.jsonl"
+
+    @property
+    def _row_bytes(self) -> int:
+        assert self._dim is not None
+        return self._dim * self._dtype.itemsize
+
+    @contextmanager
+    def _file_lock(self, *, exclusive: bool) -> Iterator[None]:
+        if fcntl is None:  # pragma: no cover - non-POSIX: single process only
+            yield
+            return
+        fcntl.flock(self._lock_fd, fcntl.LOCK_EX if exclusive else fcntl.LOCK_SH)
+        try:
+            yield
+        finally:
+            fcntl.flock(self._lock_fd, fcntl.LOCK_UN)
+
+    def _read_manifest_stamp(self) -> Optional[tuple]:
+        try:
+            stat = self._manifest_path.stat()
+        except FileNotFoundError:
+            return None
+        # os.replace gives the manifest a new inode on every write.
+        return (stat.st_ino, stat.st_mtime_ns, stat.st_size)
+
+    def _write_manifest(self) -> None:
+        tmp = self._manifest_path.with_suffix(f".{os.getpid()}.tmp")
+        tmp.write_text(
+            json.dumps(
+                {"generation": self._generation, "dim": self._dim, "dtype": self._dtype.name}
+            ),
+            encoding="utf-8",
+        )
+        self._sync_file(tmp)
+        os.replace(tmp, self._manifest_path)
+        self._sync_dir()
+        self._manifest_stamp = self._read_manifest_stamp()
+
+    def _sync_file(self, path: Path) -> None:
+        if not self.fsync:
+            return
+        fd = os.open(path, os.O_RDONLY)
+        try:
+            os.fsync(fd)
+        finally:
+            os.close(fd)
+
+    def _sync_dir(self) -> None:
+        if not self.fsync or os.name != "posix":
+            return
+        fd = os.open(self.root, os.O_RDONLY)
+        try:
+            os.fsync(fd)
+        finally:
+            os.close(fd)
+
+    def _sync(self, *, repair: bool) -> None:
+        """Catch up with the files on disk; call with the file lock held.
+
+        With ``repair`` (exclusive lock only) torn tails are truncated, so
+        the next append starts exactly after the last consistent row.
+        """
+
+        stamp = self._read_manifest_stamp()
+        if stamp != self._manifest_stamp:
+            self._reset()
+            if stamp is not None:
+                manifest = json.loads(self._manifest_path.read_text(encoding="utf-8"))
+                self._generation = manifest["generation"]
+                self._dim = manifest.get("dim")
+                self._dtype = np.dtype(manifest.get("dtype", self._dtype.name))
+            self._manifest_stamp = stamp
+
+        records_path = self._records_path(self._generation)
+        vectors_path = self._vectors_path(self._generation)
+        vector_rows = 0
+        if self._dim and vectors_path.exists():
+            vector_rows = vectors_path.stat().st_size // self._row_bytes
+
+        if records_path.exists() and records_path.stat().st_size > self._records_size:
+            with records_path.open("rb") as handle:
+                handle.seek(self._records_size)
+                for line in handle:
+                    if not line.endswith(b"\n") or self._rows >= vector_rows:
+                        break
+                    try:
+                        record = json.loads(line)
+                    except ValueError:
+                        break
+                    self._append_record(record["id"], record["metadata"], self._records_size)
+                    self._records_size += len(line)
+
+        if not repair:
+            return
+        # Drop anything a crashed writer left half-written.
+        if records_path.exists() and records_path.stat().st_size != self._records_size:
+            logger.warning("Truncating torn tail of %s", records_path)
+            os.truncate(records_path, self._records_size)
+        if self._dim and vectors_path.exists():
+            expected = self._rows * self._row_bytes
+            if vectors_path.stat().st_size != expected:
+                logger.warning("Truncating torn tail of %s", vectors_path)
+                os.truncate(vectors_path, expected)
+
+    def _remove_stale_generations(self) -> None:
+        live = {self._vectors_path(self._generation).name, self._records_path(self._generation).name}
+        for pattern in ("vectors.*.bin", "records.*.jsonl"):
+            for path in self.root.glob(pattern):
+                if path.name not in live:
+                    path.unlink(missing_ok=True)
+
+    def _append_record(self, doc_id: str, metadata: Dict[str, Any], offset: int) -> None:
+        row = self._rows
+        previous = self._row_of.get(doc_id)
+        self._rows += 1
+        self._offsets.append(offset)
+        self._row_of[doc_id] = row
+        if row >= self._alive.size:
+            grown = np.zeros(max(1024, self._alive.size * 2), dtype=bool)
+            grown[: self._alive.size] = self._alive
+            self._alive = grown
+        self._alive[row] = True
+        if previous is not None:
+            self._alive[previous] = False
+        session_id = metadata.get("session_id")
+        if session_id:
+            self._by_session.setdefault(session_id, _RowList()).append(row)
+        for tag in set(metadata.get("tags") or ()):
+            self._by_tag.setdefault(tag, _RowList()).append(row)
+
+    def _read_line(self, row: int) -> bytes:
+        if self._records_fd is None:
+            self._records_fd = os.open(self._records_path(self._generation), os.O_RDONLY)
+        start = self._offsets[row]
+        end = self._offsets[row + 1] if row + 1 < self._rows else self._records_size
+        return os.pread(self._records_fd, end - start, start)
+
+    def _close_records(self) -> None:
+        if getattr(self, "_records_fd", None) is not None:
+            os.close(self._records_fd)
+            self._records_fd = None
+
+    def _mapped(self) -> np.ndarray:
+        rows = self._rows
+        if self._matrix is None or self._matrix.shape[0] != rows:
+            if rows == 0:
+                self._matrix = np.zeros((0, self._dim or 0), dtype=self._dtype)
+            else:
+                self._matrix = np.memmap(
+                    self._vectors_path(self._generation),
+                    dtype=self._dtype,
+                    mode="r",
+                    shape=(rows, self._dim),
+                )
+        return self._matrix
+
+    # ------------------------------------------------------------------
+    # VectorStore
+    # ------------------------------------------------------------------
+    def __len__(self) -> int:
+        return len(self._row_of)
+
+    def upsert(self, ids, documents, embeddings, metadatas) -> None:
+        if not ids:
+            return
+        vectors = _normalize(np.asarray(embeddings, dtype=np.float32))
+        lines = [
+            (
+                json.dumps(
+                    {"id": doc_id, "document": document, "metadata": metadata},
+                    ensure_ascii=False,
+                )
+                + "\n"
+            ).encode("utf-8")
+            for doc_id, document, metadata in zip(ids, documents, metadatas)
+        ]
+        with self._lock, self._file_lock(exclusive=True):
+            # Another process may have appended or compacted since our last look.
+            self._sync(repair=True)
+            if self._dim is None:
+                self._dim = int(vectors.shape[1])
+                self._write_manifest()
+            elif vectors.shape[1] != self._dim:
+                raise ValueError(
+                    f"Embedding dimension {vectors.shape[1]} does not match index dimension {self._dim}"
+                )
+
+            vectors_path = self._vectors_path(self._generation)
+            records_path = self._records_path(self._generation)
+            vectors_size = self._rows * self._row_bytes
+            records_size = self._records_size
+            try:
+                self._append_bytes(vectors_path, vectors.astype(self._dtype).tobytes())
+                self._append_bytes(records_path, b"".join(lines))
+            except BaseException:
+                # Roll back a partial append so later rows stay aligned.
+                for path, size in ((vectors_path, vectors_size), (records_path, records_size)):
+                    if path.exists():
+                        os.truncate(path, size)
+                raise
+
+            for doc_id, metadata, line in zip(ids, metadatas, lines):
+                self._append_record(doc_id, metadata, self._records_size)
+                self._records_size += len(line)
+
+            dead = self._rows - len(self._row_of)
+            if dead >= max(self.COMPACT_MIN_DEAD_ROWS, self.compact_ratio * self._rows):
+                self._compact_locked()
+
+    def _append_bytes(self, path: Path, data: bytes) -> None:
+        with path.open("ab") as handle:
+            handle.write(data)
+            handle.flush()
+            if self.fsync:
+                os.fsync(handle.fileno())
+
+    def query(self, embedding, *, n_results, session_id=None, tags=None) -> List[VectorHit]:
+        query = _normalize(np.asarray([embedding], dtype=np.float32))[0]
+        with self._lock, self._file_lock(exclusive=False):
+            self._sync(repair=False)
+            if not self._row_of or n_results <= 0:
+                return []
+            matrix = self._mapped()
+            alive = self._alive[: matrix.shape[0]]
+            candidates = self._candidate_rows(session_id, tags)
+            if candidates is None:
+                similarities = _similarities(matrix, query)
+                similarities[~alive] = -np.inf
+                rows = _top_k(similarities, n_results)
+                return [self._hit(row, similarities[row]) for row in rows]
+
+            candidates = candidates[alive[candidates]]
+            if candidates.size <= self.prefilter_max_selectivity * len(self._row_of):
+                # Selective filter: score only the candidate rows.
+                similarities = _similarities(matrix[candidates], query)
+                order = _top_k(similarities, n_results)
+                return [self._hit(candidates[i], similarities[i]) for i in order]
+
+            # Broad filter: a full sequential scan with a mask is cheaper than
+            # gathering most of the matrix row by row.
+            similarities = _similarities(matrix, query)
+            mask = np.zeros(matrix.shape[0], dtype=bool)
+            mask[candidates] = True
+            similarities[~mask] = -np.inf
+            rows = _top_k(similarities, n_results)
+            return [self._hit(row, similarities[row]) for row in rows]
+
+    def _candidate_rows(
+        self, session_id: Optional[str], tags: Optional[Iterable[str]]
+    ) -> Optional[np.ndarray]:
+        """Sorted rows matching every filter, or ``None`` when unfiltered."""
+
+        postings: List[np.ndarray] = []
+        if session_id:
+            postings.append(self._postings(self._by_session, session_id))
+        for tag in set(tags or ()):
+            postings.append(self._postings(self._by_tag, tag))
+        if not postings:
+            return None
+        postings.sort(key=len)
+        rows = postings[0]
+        for other in postings[1:]:
+            if rows.size == 0:
+                break
+            rows = np.intersect1d(rows, other, assume_unique=True)
+        return rows
+
+    @staticmethod
+    def _postings(index: Dict[str, "_RowList"], key: str) -> np.ndarray:
+        row_list = index.get(key)
+        return row_list.view() if row_list is not None else np.zeros(0, dtype=np.int64)
+
+    def _hit(self, row: int, similarity: float) -> VectorHit:
+        record = json.loads(self._read_line(int(row)))
+        return VectorHit(
+            id=record["id"],
+            document=record["document"],
+            metadata=record["metadata"],
+            distance=float(1.0 - similarity),
+        )
+
+    def compact(self) -> None:
+        """Rewrite live rows into a new generation and drop the old files."""
+
+        with self._lock, self._file_lock(exclusive=True):
+            self._sync(repair=True)
+            self._compact_locked()
+
+    def _compact_locked(self) -> None:
+        old_generation = self._generation
+        new_generation = old_generation + 1
+        live_rows = np.flatnonzero(self._alive[: self._rows])
+        matrix = self._mapped()
+
+        vectors_path = self._vectors_path(new_generation)
+        with vectors_path.open("wb") as handle:
+            for start in range(0, live_rows.size, 65536):
+                handle.write(np.ascontiguousarray(matrix[live_rows[start : start + 65536]]).tobytes())
+            handle.flush()
+            if self.fsync:
+                os.fsync(handle.fileno())
+        # Sidecar lines are copied verbatim; nothing is re-serialized.
+        records_path = self._records_path(new_generation)
+        with records_path.open("wb") as handle:
+            for row in live_rows:
+                handle.write(self._read_line(int(row)))
+            handle.flush()
+            if self.fsync:
+                os.fsync(handle.fileno())
+
+        dim, dtype = self._dim, self._dtype
+        self._reset()
+        self._generation, self._dim, self._dtype = new_generation, dim, dtype
+        self._write_manifest()
+        self._sync(repair=False)
+        self._remove_stale_generations()
+        logger.info(
+            "Compacted vector store to %s rows (generation %s)", self._rows, new_generation
+        )
+
+    def close(self) -> None:
+        with self._lock:
+            self._matrix = None
+            self._close_records()
+            if self._lock_fd is not None:
+                os.close(self._lock_fd)
+                self._lock_fd = None
+
+
+def _normalize(vectors: np.ndarray) -> np.ndarray:
+    norms = np.linalg.norm(vectors, axis=1, keepdims=True)
+    return vectors / np.clip(norms, 1e-12, None)
+
+
+def _similarities(matrix: np.ndarray, query: np.ndarray, block: int = 65536) -> np.ndarray:
+    # Blocks bound the float32 temporaries when the matrix is stored as float16.
+    out = np.empty(matrix.shape[0], dtype=np.float32)
+    for start in range(0, matrix.shape[0], block):
+        chunk = matrix[start : start + block]
+        out[start : start + block] = chunk.astype(np.float32, copy=False) @ query
+    return out
+
+
+def _top_k(scores: np.ndarray, k: int) -> np.ndarray:
+    k = min(k, scores.size)
+    if k <= 0:
+        return np.zeros(0, dtype=np.int64)
+    candidates = np.argpartition(-scores, k - 1)[:k]
+    candidates = candidates[np.argsort(-scores[candidates], kind="stable")]
+    return candidates[np.isfinite(scores[candidates])]
+
+
+def create_vector_store(settings: Settings, embedding_fn) -> VectorStore:
+    if settings.vector_store == "flat":
+        return FlatVectorStore(
+            settings.vector_store_path,
+            dtype=settings.vector_store_dtype,
+            compact_ratio=settings.vector_store_compact_ratio,
+            fsync=settings.vector_store_fsync,
+            prefilter_max_selectivity=settings.vector_prefilter_max_selectivity,
+        )
+    return ChromaVectorStore(settings, embedding_fn)
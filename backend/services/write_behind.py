@@ -0,0 +1,199 @@
+from __future__ import annotations
+
+import logging
+import threading
+from dataclasses import dataclass
+from datetime import datetime, timezone
+from typing import Any, Dict, List, Optional
+
+from core.config import Settings
+from services.sqlite import SQLiteConnectionManager
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class PendingMessage:
+    seq: int
+    id: str
+    session_id: str
+    role: str
+    text: Optional[str]
+    audio_url: Optional[str]
+    created_at: str
+
+    def as_row(self) -> Dict[str, Any]:
+        return {
+            "id": self.id,
+            "role": self.role,
+            "text": self.text,
+            "audio_url": self.audio_url,
+            "created_at": self.created_at,
+        }
+
+
+class MessageWriteBehind:
+    """Group-commit queue that persists chat messages in the background.
+
+    Inserts are buffered in memory and a writer thread flushes them with one
+    ``executemany`` transaction every ``message_flush_interval_ms`` or as soon
+    as ``message_flush_max_rows`` rows are waiting. Pending rows stay visible
+    through :meth:`pending_for` until they are committed.
+    """
+
+    def __init__(self, db: SQLiteConnectionManager, settings: Settings):
+        self._db = db
+        self.flush_interval = max(settings.message_flush_interval_ms, 1) / 1000.0
+        self.max_rows = max(settings.message_flush_max_rows, 1)
+
+        self._cond = threading.Condition()
+        self._pending: List[PendingMessage] = []
+        self._inflight: List[PendingMessage] = []
+        self._next_seq = 0
+        self._flushed_seq = 0
+        self._flush_requested = False
+        self._closed = False
+        self._failures = 0
+        self.last_error: Optional[BaseException] = None
+        self._thread = threading.Thread(
+            target=self._run, name="tohum-message-writer", daemon=True
+        )
+        self._thread.start()
+
+    def enqueue(
+        self,
+        message_id: str,
+        session_id: str,
+        role: str,
+        text: Optional[str],
+        audio_url: Optional[str] = None,
+    ) -> int:
+        created_at = datetime.now(timezone.utc).strftime("%Y-%m-%d %H:%M:%S")
+        with self._cond:
+            if self._closed:
+                raise RuntimeError("Message writer is closed.")
+            self._next_seq += 1
+            self._pending.append(
+                PendingMessage(
+                    seq=self._next_seq,
+                    id=message_id,
+                    session_id=session_id,
+                    role=role,
+                    text=text,
+                    audio_url=audio_url,
+                    created_at=created_at,
+                )
+            )
+            if len(self._pending) == 1 or len(self._pending) >= self.max_rows:
+                self._cond.notify_all()
+            return self._next_seq
+
+    def wait_for(self, seq: int, timeout: Optional[float] = None) -> bool:
+        """Block until the message with ``seq`` has been committed.
+
+        Returns ``False`` on timeout. A flush that fails while waiting raises
+        ``RuntimeError`` straight away; the rows stay queued for retry.
+        """
+
+        with self._cond:
+            failures = self._failures
+            self._cond.wait_for(
+                lambda: self._flushed_seq >= seq or self._failures != failures,
+                timeout,
+            )
+            if self._flushed_seq >= seq:
+                return True
+            if self._failures != failures:
+                raise RuntimeError(
+                    f"Message writer failed: {self.last_error}"
+                ) from self.last_error
+            return False
+
+    def pending_for(self, session_id: str) -> List[Dict[str, Any]]:
+        with self._cond:
+            queued = self._inflight + self._pending
+            return [item.as_row() for item in queued if item.session_id == session_id]
+
+    def flush(self, timeout: Optional[float] = None) -> bool:
+        with self._cond:
+            target = self._next_seq
+            self._flush_requested = True
+            self._cond.notify_all()
+        return self.wait_for(target, timeout)
+
+    def close(self, timeout: Optional[float] = 10.0) -> None:
+        with self._cond:
+            self._closed = True
+            self._cond.notify_all()
+        self._thread.join(timeout)
+
+    # ------------------------------------------------------------------
+    # Writer thread
+    # ------------------------------------------------------------------
+    def _run(self) -> None:
+        while True:
+            with self._cond:
+                self._cond.wait_for(lambda: self._pending or self._closed)
+                if not self._pending and self._closed:
+                    return
+                self._cond.wait_for(
+                    lambda: self._closed
+                    or self._flush_requested
+                    or len(self._pending) >= self.max_rows,
+                    self.flush_interval,
+                )
+                batch = self._pending[: self.max_rows]
+                del self._pending[: len(batch)]
+                self._inflight = batch
+                if not self._pending:
+                    self._flush_requested = False
+
+            try:
+                self._write(batch)
+            except Exception as exc:  # pragma: no cover - disk/runtime failure
+                logger.exception("Failed to flush %s queued messages", len(batch))
+                with self._cond:
+                    self._pending[:0] = batch
+                    self._inflight = []
+                    self._failures += 1
+                    self.last_error = exc
+                    self._cond.notify_all()
+                    if self._closed:
+                        return
+                    self._cond.wait(self.flush_interval)
+                continue
+
+            with self._cond:
+                self._inflight = []
+                self._flushed_seq = batch[-1].seq
+                self.last_error = None
+                self._cond.notify_all()
+
+    def _write(self, batch: List[PendingMessage]) -> None:
+        with self._db.write() as cur:
+            cur.executemany(
+                """
+                INSERT OR IGNORE INTO messages (
+                    id, session_id, role, text, audio_url, created_at
+                ) VALUES (?, ?, ?, ?, ?, ?)
+                """,
+                [
+                    (
+                        item.id,
+                        item.session_id,
+                        item.role,
+                        item.text,
+                        item.audio_url,
+                        item.created_at,
+                    )
+                    for item in batch
+                ],
+            )
+            cur.executemany(
+                """
+                UPDATE sessions
+                SET last_activity_at=CURRENT_TIMESTAMP
+                WHERE id = ?
+                """,
+                [(session_id,) for session_id in {item.session_id for item in batch}],
+            )
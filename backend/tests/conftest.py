@@ -0,0 +1,59 @@
+import sys
+import zlib
+from pathlib import Path
+from typing import List
+
+import pytest
+
+# Tests import modules the way the app does, with backend/ on the path.
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+import services.memory as memory_module  # noqa: E402
+from core.config import Settings  # noqa: E402
+from services.memory import MemoryService  # noqa: E402
+
+
+def bag_of_words(texts: List[str]) -> List[List[float]]:
+    """Deterministic stand-in for the embedding model."""
+
+    vectors = []
+    for text in texts:
+        vector = [0.0] * 64
+        for word in text.lower().split():
+            vector[zlib.crc32(word.encode("utf-8")) % 64] += 1.0
+        vectors.append(vector)
+    return vectors
+
+
+@pytest.fixture()
+def make_memory(tmp_path, monkeypatch):
+    """Build MemoryServices on a temporary database and flat vector store."""
+
+    monkeypatch.setattr(
+        memory_module, "load_embedding_backend", lambda settings: (bag_of_words, "bow")
+    )
+    services: List[MemoryService] = []
+
+    def factory(**overrides) -> MemoryService:
+        options = {
+            "sqlite_path": str(tmp_path / "tohum.db"),
+            "vector_store": "flat",
+            "vector_store_path": str(tmp_path / "vectors"),
+            "vector_store_fsync": False,
+        }
+        options.update(overrides)
+        service = MemoryService(Settings(**options))
+        services.append(service)
+        return service
+
+    yield factory
+    for service in services:
+        try:
+            service.close()
+        except Exception:  # already closed by the code under test
+            pass
+
+
+@pytest.fixture()
+def memory(make_memory) -> MemoryService:
+    return make_memory()
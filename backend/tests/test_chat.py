@@ -0,0 +1,48 @@
+from __future__ import annotations
+
+import sqlite3
+
+import pytest
+
+from services.chat import ChatService
+
+
+def test_reply_is_generated_outside_the_transaction(memory, monkeypatch):
+    chat = ChatService(memory_service=memory)
+    generate_reply = chat._generate_reply
+    seen = []
+
+    def checked_generate_reply(*args, **kwargs):
+        seen.append(memory._db.in_transaction)
+        return generate_reply(*args, **kwargs)
+
+    monkeypatch.setattr(chat, "_generate_reply", checked_generate_reply)
+    response = chat.handle_message("s1", "merhaba")
+
+    assert seen == [False]
+    assert [m["id"] for m in memory.list_messages("s1")] == [
+        response.user_message_id,
+        response.message_id,
+    ]
+
+
+def test_remember_turn_stores_the_item_with_the_messages(memory):
+    chat = ChatService(memory_service=memory)
+    response = chat.handle_message("s1", "hatırla: kedinin adı Pamuk [ev]")
+
+    (item,) = memory.list_memory_items(session_id="s1")
+    assert item["text"] == "kedinin adı Pamuk" and item["tags"] == ["ev"]
+    assert item["id"][:8] in response.reply
+    assert len(memory.list_messages("s1")) == 2
+
+
+def test_group_durability_surfaces_writer_failure(make_memory, monkeypatch):
+    memory = make_memory(message_durability="group", message_flush_interval_ms=1)
+    chat = ChatService(memory_service=memory)
+
+    def failing_write(batch):
+        raise sqlite3.OperationalError("disk I/O error")
+
+    monkeypatch.setattr(memory._message_writer, "_write", failing_write)
+    with pytest.raises(RuntimeError, match="Message writer failed"):
+        chat.handle_message("s1", "merhaba")
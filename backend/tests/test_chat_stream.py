@@ -0,0 +1,70 @@
+from __future__ import annotations
+
+import json
+import sqlite3
+import time
+
+import pytest
+from fastapi.testclient import TestClient
+
+from services.chat import ChatService, get_chat_service
+from services.executor import InferenceExecutor, get_inference_executor
+
+
+class _StubTTS:
+    def close(self) -> None:
+        pass
+
+
+@pytest.fixture()
+def app(memory, monkeypatch):
+    import main
+
+    chat = ChatService(memory_service=memory)
+    executor = InferenceExecutor(memory.settings)
+    monkeypatch.setattr(main.settings, "warmup_models", False)
+    # The real shutdown hook runs against this test's services.
+    monkeypatch.setattr(main, "get_inference_executor", lambda: executor)
+    monkeypatch.setattr(main, "get_tts_service", lambda: _StubTTS())
+    monkeypatch.setattr(main, "get_memory_service", lambda: memory)
+    monkeypatch.setattr(main, "memory_service_loaded", lambda: True)
+    main.app.dependency_overrides[get_chat_service] = lambda: chat
+    main.app.dependency_overrides[get_inference_executor] = lambda: executor
+    yield main.app, chat
+    main.app.dependency_overrides.clear()
+    executor.shutdown()
+
+
+def _events(body: str):
+    for block in body.strip().split("\n\n"):
+        event, data = block.split("\n", 1)
+        yield event.removeprefix("event: "), json.loads(data.removeprefix("data: "))
+
+
+def test_streamed_reply_is_persisted_by_main_shutdown(app, monkeypatch):
+    application, chat = app
+    persist_reply = chat.persist_reply
+
+    def slow_persist_reply(*args, **kwargs):
+        time.sleep(0.3)
+        return persist_reply(*args, **kwargs)
+
+    monkeypatch.setattr(chat, "persist_reply", slow_persist_reply)
+
+    with TestClient(application) as client:
+        response = client.post(
+            "/api/chat/stream", json={"session_id": "s1", "message": "merhaba dünya"}
+        )
+        events = list(_events(response.text))
+    # Leaving the client ran main.shutdown_executors, which closed the DB.
+
+    kinds = [kind for kind, _ in events]
+    assert kinds[0] == "context" and kinds[-1] == "done"
+    done = events[-1][1]
+    assert "".join(data["text"] for kind, data in events if kind == "token") == done["reply"]
+
+    with sqlite3.connect(chat.memory.settings.sqlite_path) as conn:
+        rows = conn.execute(
+            "SELECT id, role FROM messages WHERE session_id = ? ORDER BY rowid", ("s1",)
+        ).fetchall()
+    assert rows == [(done["user_message_id"], "user"), (done["message_id"], "assistant")]
@@ -0,0 +1,145 @@
+from __future__ import annotations
+
+import os
+from pathlib import Path
+
+import numpy as np
+import pytest
+
+from core.config import Settings
+
+# int8 dynamic quantization of e5-small keeps embeddings this close to fp32.
+MIN_COSINE = 0.97
+
+SENTENCES = [
+    "Yarın sabah dokuzda dişçi randevum var.",
+    "Kedim Tekir akşamları kitap okurken kucağımda uyur.",
+    "Remind me to water the tomatoes in the garden.",
+    "Geçen hafta aldığım kitabın adı neydi?",
+    "kısa",
+]
+
+
+@pytest.fixture(scope="module")
+def backends():
+    pytest.importorskip("onnxruntime")
+    pytest.importorskip("tokenizers")
+    sentence_transformers = pytest.importorskip("sentence_transformers")
+
+    settings = Settings()
+    onnx_dir = os.environ.get("EMBEDDING_ONNX_PATH") or settings.embedding_onnx_path
+    if not onnx_dir or not (Path(onnx_dir) / settings.embedding_onnx_file).exists():
+        pytest.skip("EMBEDDING_ONNX_PATH does not point at an exported ONNX model")
+
+    from services.embeddings import OnnxEmbeddingBackend
+
+    try:
+        reference = sentence_transformers.SentenceTransformer(settings.embedding_model)
+    except Exception as exc:  # offline or model not cached
+        pytest.skip(f"SentenceTransformer model unavailable: {exc}")
+    onnx = OnnxEmbeddingBackend(
+        onnx_dir,
+        model_file=settings.embedding_onnx_file,
+        max_length=settings.embedding_max_length,
+    )
+    return onnx, reference
+
+
+def test_onnx_embeddings_match_sentence_transformers(backends):
+    onnx, reference = backends
+
+    quantized = onnx.encode(SENTENCES)
+    expected = reference.encode(SENTENCES, normalize_embeddings=True)
+
+    assert quantized.shape == expected.shape
+    cosine = np.sum(quantized * expected, axis=1)
+    assert cosine.min() >= MIN_COSINE, dict(zip(SENTENCES, cosine.round(4)))
+
+
+# ----------------------------------------------------------------------
+# Pooling and normalisation against a stub tokenizer and session
+# ----------------------------------------------------------------------
+PAD_ID = 0
+HIDDEN = 8
+
+
+class _Encoding:
+    def __init__(self, ids, width):
+        padding = width - len(ids)
+        self.ids = ids + [PAD_ID] * padding
+        self.attention_mask = [1] * len(ids) + [0] * padding
+        self.type_ids = [0] * width
+
+
+class _StubTokenizer:
+    """Whitespace tokenizer that pads each batch like ``enable_padding``."""
+
+    def __init__(self):
+        self.vocab = {}
+
+    def token_ids(self, text):
+        return [self.vocab.setdefault(word, len(self.vocab) + 1) for word in text.split()]
+
+    def encode_batch(self, texts):
+        ids = [self.token_ids(text) for text in texts]
+        width = max(len(item) for item in ids)
+        return [_Encoding(item, width) for item in ids]
+
+
+class _StubSession:
+    """Looks every token up in a fixed table; padding rows are huge on purpose."""
+
+    def __init__(self, input_names):
+        rng = np.random.default_rng(0)
+        self.table = rng.normal(size=(64, HIDDEN)).astype(np.float32)
+        self.table[PAD_ID] = 1e3
+        self.input_names = input_names
+        self.feeds = []
+
+    def run(self, output_names, feeds):
+        self.feeds.append(feeds)
+        return [self.table[feeds["input_ids"]]]
+
+
+def _stub_backend(batch_size=2, input_names=("input_ids", "attention_mask")):
+    from services.embeddings import OnnxEmbeddingBackend
+
+    backend = OnnxEmbeddingBackend.__new__(OnnxEmbeddingBackend)
+    backend._tokenizer = _StubTokenizer()
+    backend._session = _StubSession(set(input_names))
+    backend._input_names = set(input_names)
+    backend.batch_size = batch_size
+    return backend
+
+
+def _expected(backend, text):
+    vector = backend._session.table[backend._tokenizer.token_ids(text)].mean(axis=0)
+    return vector / np.linalg.norm(vector)
+
+
+def test_mean_pooling_ignores_padding_and_normalizes():
+    backend = _stub_backend()
+    texts = ["bir iki üç dört beş", "bir", "iki üç", "kısa cümle burada"]
+
+    vectors = backend.encode(texts)
+
+    assert vectors.shape == (len(texts), HIDDEN)
+    assert vectors.dtype == np.float32
+    np.testing.assert_allclose(np.linalg.norm(vectors, axis=1), 1.0, rtol=1e-6)
+    # Rows come back in input order even though batches are length-sorted.
+    for text, vector in zip(texts, vectors):
+        np.testing.assert_allclose(vector, _expected(backend, text), rtol=1e-5, atol=1e-6)
+
+
+def test_token_type_ids_are_fed_only_when_the_graph_takes_them():
+    plain = _stub_backend()
+    plain.encode(["bir iki"])
+    assert set(plain._session.feeds[0]) == {"input_ids", "attention_mask"}
+
+    bert = _stub_backend(input_names=("input_ids", "attention_mask", "token_type_ids"))
+    bert.encode(["bir iki"])
+    assert set(bert._session.feeds[0]) == {"input_ids", "attention_mask", "token_type_ids"}
+
+
+def test_encode_empty_input():
+    assert _stub_backend().encode([]).shape == (0, 0)
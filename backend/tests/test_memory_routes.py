@@ -0,0 +1,45 @@
+from __future__ import annotations
+
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from routes import memory as memory_routes
+from services.memory import get_memory_service
+
+
+@pytest.fixture()
+def client(memory):
+    app = FastAPI()
+    app.include_router(memory_routes.router)
+    app.dependency_overrides[get_memory_service] = lambda: memory
+    return TestClient(app)
+
+
+def _batch(*texts: str):
+    return {"items": [{"text": text, "session_id": "s1"} for text in texts]}
+
+
+def test_remember_batch_indexes_items(client, memory):
+    response = client.post("/memory/remember/batch", json=_batch("elma", "armut"))
+
+    assert response.status_code == 201
+    body = response.json()
+    assert body["not_indexed"] == []
+    hits = memory.search_memory("elma", limit=5)
+    assert hits and hits[0]["id"] == body["memory_ids"][0]
+
+
+def test_remember_batch_reports_items_that_were_not_indexed(client, memory, monkeypatch):
+    def failing_upsert(**kwargs):
+        raise OSError("vector store is read-only")
+
+    monkeypatch.setattr(memory._vector_store, "upsert", failing_upsert)
+    response = client.post("/memory/remember/batch", json=_batch("elma", "armut"))
+
+    assert response.status_code == 207
+    body = response.json()
+    assert len(body["memory_ids"]) == 2
+    assert body["not_indexed"] == body["memory_ids"]
+    # The rows themselves were committed.
+    assert len(memory.list_memory_items(session_id="s1")) == 2
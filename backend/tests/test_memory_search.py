@@ -0,0 +1,26 @@
+from __future__ import annotations
+
+import pytest
+
+
+@pytest.fixture()
+def memory(make_memory):
+    return make_memory(memory_chunk_size=60, memory_chunk_overlap=0)
+
+
+@pytest.mark.parametrize("mode", ["vector", "hybrid"])
+def test_chunk_hits_resolve_to_parent_item(memory, mode):
+    text = (
+        "Sabah kahvaltıda peynir ve zeytin yerim. "
+        "Öğleden sonra bahçede domates suluyorum. "
+        "Akşamları kedim Tekir ile kitap okurum."
+    )
+    memory_id = memory.remember(text, tags=["ev"], session_id="s1")
+
+    results = memory.search_memory("kedim Tekir kitap", session_id="s1", mode=mode)
+
+    assert results[0]["id"] == memory_id
+    assert results[0]["text"] == text
+    assert results[0]["metadata"]["tags"] == ["ev"]
+    assert "parent_id" not in results[0]["metadata"]
+    assert "chunk_index" not in results[0]["metadata"]
@@ -0,0 +1,66 @@
+from __future__ import annotations
+
+import sqlite3
+from typing import List
+
+import pytest
+
+from services.migrations import SCHEMA_VERSION, apply_migrations, current_version
+
+
+@pytest.fixture()
+def cursor(tmp_path):
+    conn = sqlite3.connect(tmp_path / "tohum.db")
+    cur = conn.cursor()
+    apply_migrations(cur)
+    conn.commit()
+    yield cur
+    conn.close()
+
+
+def _traced(memory, call) -> List[str]:
+    """Run ``call`` and return the SELECTs it sent on this thread's reader."""
+
+    statements: List[str] = []
+    reader = memory._db._reader()
+    reader.set_trace_callback(statements.append)
+    try:
+        call()
+    finally:
+        reader.set_trace_callback(None)
+    selects = [sql for sql in statements if sql.lstrip().upper().startswith("SELECT")]
+    assert selects, "no SELECT was traced"
+    return selects
+
+
+def _plan(memory, query: str) -> str:
+    with memory._db.read() as cur:
+        rows = cur.execute(f"EXPLAIN QUERY PLAN {query}").fetchall()
+    return "\n".join(row[-1] for row in rows)
+
+
+def test_migrations_set_schema_version(cursor):
+    assert current_version(cursor) == SCHEMA_VERSION
+    # Re-running is a no-op on an up-to-date database.
+    assert apply_migrations(cursor) == SCHEMA_VERSION
+
+
+def test_session_history_uses_index(memory):
+    (query,) = _traced(memory, lambda: memory.list_messages("s1", limit=50))
+    plan = _plan(memory, query)
+    assert "idx_messages_session_created" in plan
+    assert "TEMP B-TREE" not in plan
+
+
+def test_session_memory_listing_uses_index(memory):
+    (query,) = _traced(memory, lambda: memory.list_memory_items(session_id="s1", limit=50))
+    plan = _plan(memory, query)
+    assert "idx_memory_items_session_added" in plan
+    assert "TEMP B-TREE" not in plan
+
+
+def test_memory_listing_uses_index(memory):
+    (query,) = _traced(memory, lambda: memory.list_memory_items(limit=50))
+    plan = _plan(memory, query)
+    assert "idx_memory_items_added" in plan
+    assert "TEMP B-TREE" not in plan
@@ -0,0 +1,82 @@
+from __future__ import annotations
+
+import io
+import textwrap
+import wave
+
+import pytest
+
+from core.config import Settings
+from services import tts as tts_module
+from services.piper_pool import PiperWorkerPool, WorkerError
+
+_FAKE_VOICE = textwrap.dedent(
+    """
+    import os
+    import types
+
+
+    class PiperVoice:
+        config = types.SimpleNamespace(sample_rate=16000, speaker_id_map={})
+
+        @classmethod
+        def load(cls, path):
+            return cls()
+
+        def synthesize_stream_raw(self, text, speaker_id=None):
+            if text == "crash":
+                os._exit(1)
+            yield b"\\x01\\x00" * len(text)
+    """
+)
+
+
+@pytest.fixture()
+def fake_piper(tmp_path, monkeypatch):
+    package = tmp_path / "piper"
+    package.mkdir()
+    (package / "__init__.py").write_text("")
+    (package / "voice.py").write_text(_FAKE_VOICE)
+    monkeypatch.setenv("PYTHONPATH", str(tmp_path))
+    return tmp_path
+
+
+def test_health_check_replaces_dead_worker(fake_piper):
+    pool = PiperWorkerPool("voice.onnx", size=2, health_interval=0)
+    try:
+        pool.start()
+        with pytest.raises(RuntimeError):
+            pool.synthesize("crash")
+        assert pool.health_check() == 1
+        assert pool.stats()["idle"] == 2
+
+        audio, sample_rate = pool.synthesize("merhaba")
+        with wave.open(io.BytesIO(audio)) as wav:
+            assert (sample_rate, wav.getnframes()) == (16000, len("merhaba"))
+    finally:
+        pool.close()
+
+
+def test_pool_disabled_without_piper_tts(tmp_path, monkeypatch):
+    monkeypatch.setattr(tts_module.importlib.util, "find_spec", lambda name: None)
+    service = tts_module.TextToSpeechService(
+        Settings(piper_model_path="voice.onnx", audio_tmp_dir=str(tmp_path))
+    )
+    try:
+        assert service.piper_pool_stats() is None
+    finally:
+        service.close()
+
+
+def test_checkout_gives_up_when_every_worker_is_busy(fake_piper):
+    pool = PiperWorkerPool("voice.onnx", size=1, request_timeout=0.2, health_interval=0)
+    try:
+        pool.start()
+        busy = pool._checkout()
+        with pytest.raises(RuntimeError, match="busy") as excinfo:
+            pool.synthesize("merhaba")
+        assert not isinstance(excinfo.value, WorkerError)
+        pool._idle.put(busy)
+        assert pool.synthesize("merhaba")[1] == 16000
+    finally:
+        pool.close()
@@ -0,0 +1,32 @@
+from __future__ import annotations
+
+import numpy as np
+import pytest
+
+from services.resample import StreamingResampler, resample
+
+
+def _tone(rate: int, seconds: float = 0.5) -> np.ndarray:
+    t = np.arange(int(rate * seconds)) / rate
+    return (0.5 * np.sin(2 * np.pi * 440 * t)).astype(np.float32)
+
+
+def test_resample_matches_reference_tone():
+    out = resample(_tone(44100), 44100, 16000)
+    assert out.size == 8000
+    # Ignore the filter's edge effects at both ends.
+    assert np.max(np.abs(out[200:-200] - _tone(16000)[200:-200])) < 1e-2
+
+
+def test_streaming_equals_whole_signal():
+    audio = _tone(22050)
+    resampler = StreamingResampler(22050, 16000)
+    pieces = [resampler.push(audio[i : i + 997]) for i in range(0, audio.size, 997)]
+    streamed = np.concatenate(pieces + [resampler.finish()])
+    np.testing.assert_allclose(streamed, resample(audio, 22050, 16000), atol=1e-6)
+
+
+@pytest.mark.parametrize("rate", [0, -8000])
+def test_rejects_non_positive_rates(rate):
+    with pytest.raises(ValueError):
+        StreamingResampler(rate, 16000)
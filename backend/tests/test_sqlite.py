@@ -0,0 +1,48 @@
+from __future__ import annotations
+
+import pytest
+
+from core.config import Settings
+from services.sqlite import SQLiteConnectionManager
+
+
+@pytest.fixture()
+def db(tmp_path):
+    manager = SQLiteConnectionManager(Settings(sqlite_path=str(tmp_path / "tohum.db")))
+    with manager.write() as cur:
+        cur.execute("CREATE TABLE items (id INTEGER PRIMARY KEY)")
+    yield manager
+    manager.close()
+
+
+def test_failing_after_commit_callback_is_isolated(db):
+    ran = []
+
+    def boom() -> None:
+        raise RuntimeError("index failed")
+
+    with db.write() as cur:
+        cur.execute("INSERT INTO items (id) VALUES (1)")
+        db.after_commit(boom)
+        db.after_commit(lambda: ran.append("next"))
+
+    assert ran == ["next"]
+    with db.read() as cur:
+        assert cur.execute("SELECT COUNT(*) FROM items").fetchone()[0] == 1
+
+
+def test_propagating_after_commit_callback_raises_after_the_rest(db):
+    ran = []
+
+    def boom() -> None:
+        raise RuntimeError("not durable")
+
+    with pytest.raises(RuntimeError, match="not durable"):
+        with db.write() as cur:
+            cur.execute("INSERT INTO items (id) VALUES (1)")
+            db.after_commit(boom, propagate=True)
+            db.after_commit(lambda: ran.append("next"))
+
+    assert ran == ["next"]
+    with db.read() as cur:
+        assert cur.execute("SELECT COUNT(*) FROM items").fetchone()[0] == 1
@@ -0,0 +1,75 @@
+from __future__ import annotations
+
+import json
+import os
+import subprocess
+import sys
+from pathlib import Path
+
+BACKEND_DIR = Path(__file__).resolve().parent.parent
+
+# Runs in a fresh interpreter so the import cost of ``main`` is measured too.
+_SCRIPT = """
+import json, time
+
+import main
+
+
+class _SlowModel:
+    def __init__(self, seconds):
+        self.seconds = seconds
+
+    def load(self):
+        time.sleep(self.seconds)
+        return True
+
+    def warm_up(self):
+        time.sleep(self.seconds)
+
+    start_workers = load
+
+    def close(self):
+        pass
+
+
+memory, stt, tts = _SlowModel(2.0), _SlowModel(2.0), _SlowModel(2.0)
+main.get_memory_service = lambda: memory.load() and memory
+main.get_stt_service = lambda: stt
+main.get_tts_service = lambda: tts
+
+started = time.perf_counter()
+main.start_lifecycle()
+handler_seconds = time.perf_counter() - started
+lifecycle = main.get_lifecycle()
+print(json.dumps({
+    "budget": main.settings.startup_budget_seconds,
+    "startup_seconds": lifecycle.startup_seconds,
+    "handler_seconds": handler_seconds,
+    "ready": lifecycle.is_ready(),
+}))
+"""
+
+
+def test_startup_stays_within_budget(tmp_path):
+    env = dict(
+        os.environ,
+        SQLITE_PATH=str(tmp_path / "tohum.db"),
+        AUDIO_TMP_DIR=str(tmp_path / "audio"),
+        WARMUP_MODELS="true",
+    )
+    completed = subprocess.run(
+        [sys.executable, "-c", _SCRIPT],
+        cwd=BACKEND_DIR,
+        env=env,
+        capture_output=True,
+        text=True,
+        timeout=60,
+    )
+    assert completed.returncode == 0, completed.stderr
+    report = json.loads(completed.stdout.strip().splitlines()[-1])
+
+    # Heavy models load in the background, so neither the import nor the
+    # startup hook waits for them.
+    assert report["ready"] is False
+    assert report["handler_seconds"] < 1.0
+    assert report["startup_seconds"] + report["handler_seconds"] <= report["budget"]
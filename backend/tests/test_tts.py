@@ -0,0 +1,27 @@
+from __future__ import annotations
+
+import os
+import time
+
+from core.config import Settings
+from services.tts import TextToSpeechService
+
+
+def test_cleanup_expires_files_outside_the_cache(tmp_path):
+    service = TextToSpeechService(
+        Settings(audio_tmp_dir=str(tmp_path), audio_ttl_hours=1, piper_model_path=None)
+    )
+    try:
+        stale = tmp_path / "reply-old.wav"
+        fresh = tmp_path / "reply-new.wav"
+        stale.write_bytes(b"RIFF")
+        fresh.write_bytes(b"RIFF")
+        two_hours_ago = time.time() - 2 * 3600
+        os.utime(stale, (two_hours_ago, two_hours_ago))
+
+        assert service.cleanup_expired() == 1
+        assert not stale.exists()
+        assert fresh.exists()
+        assert (tmp_path / "cache").is_dir()
+    finally:
+        service.close()
@@ -0,0 +1,105 @@
+from __future__ import annotations
+
+import multiprocessing
+
+import numpy as np
+import pytest
+
+from services.vector_store import FlatVectorStore
+
+DIM = 8
+
+
+def _vector(seed: int) -> np.ndarray:
+    return np.random.default_rng(seed).normal(size=DIM).astype(np.float32)
+
+
+def _writer(path: str, prefix: int, count: int) -> None:
+    store = FlatVectorStore(path, fsync=False)
+    for start in range(0, count, 5):
+        seeds = [prefix * 10_000 + i for i in range(start, min(start + 5, count))]
+        store.upsert(
+            [f"doc-{seed}" for seed in seeds],
+            [f"text {seed}" for seed in seeds],
+            [_vector(seed) for seed in seeds],
+            [{"session_id": f"s{prefix}", "tags": []} for _ in seeds],
+        )
+    store.close()
+
+
+def test_upsert_query_and_reopen(tmp_path):
+    store = FlatVectorStore(str(tmp_path), fsync=False)
+    store.upsert(
+        ["a", "b", "c"],
+        ["alpha", "beta", "gamma"],
+        [_vector(1), _vector(2), _vector(3)],
+        [{"session_id": "s1", "tags": ["x"]}, {"session_id": "s2"}, {"tags": ["x"]}],
+    )
+    store.upsert(["b"], ["beta v2"], [_vector(4)], [{"session_id": "s1"}])
+
+    hits = store.query(_vector(4), n_results=1)
+    assert (hits[0].id, hits[0].document) == ("b", "beta v2")
+    assert [hit.id for hit in store.query(_vector(1), n_results=5, session_id="s1")] == ["a", "b"]
+    assert {hit.id for hit in store.query(_vector(1), n_results=5, tags=["x"])} == {"a", "c"}
+    store.close()
+
+    reopened = FlatVectorStore(str(tmp_path), fsync=False)
+    assert len(reopened) == 3
+    assert reopened.query(_vector(2), n_results=3)[0].id != "b"
+    reopened.close()
+
+
+def test_torn_tail_is_truncated(tmp_path):
+    store = FlatVectorStore(str(tmp_path), fsync=False)
+    store.upsert(["a"], ["alpha"], [_vector(1)], [{}])
+    store.close()
+    with open(tmp_path / "records.0.jsonl", "ab") as handle:
+        handle.write(b'{"id": "b", "docu')
+    with open(tmp_path / "vectors.0.bin", "ab") as handle:
+        handle.write(b"\0" * 7)
+
+    reopened = FlatVectorStore(str(tmp_path), fsync=False)
+    reopened.upsert(["c"], ["gamma"], [_vector(3)], [{}])
+    assert [hit.id for hit in reopened.query(_vector(3), n_results=2)] == ["c", "a"]
+    reopened.close()
+
+
+@pytest.mark.skipif(
+    "fork" not in multiprocessing.get_all_start_methods(), reason="needs fork"
+)
+def test_concurrent_writers_keep_rows_aligned(tmp_path):
+    reader = FlatVectorStore(str(tmp_path), fsync=False)
+    context = multiprocessing.get_context("fork")
+    workers = [
+        context.Process(target=_writer, args=(str(tmp_path), prefix, 200))
+        for prefix in (1, 2, 3)
+    ]
+    for worker in workers:
+        worker.start()
+    for worker in workers:
+        worker.join(60)
+        assert worker.exitcode == 0
+
+    # The reader opened before any writes and catches up on query.
+    for prefix in (1, 2, 3):
+        for seed in (prefix * 10_000, prefix * 10_000 + 199):
+            hit = reader.query(_vector(seed), n_results=1)[0]
+            assert hit.id == f"doc-{seed}"
+            assert hit.distance == pytest.approx(0.0, abs=1e-5)
+    assert len(reader) == 600
+    reader.close()
+
+
+def test_reader_follows_compaction_by_another_writer(tmp_path):
+    reader = FlatVectorStore(str(tmp_path), fsync=False)
+    writer = FlatVectorStore(str(tmp_path), fsync=False)
+    writer.upsert(["a", "b"], ["alpha", "beta"], [_vector(1), _vector(2)], [{}, {}])
+    assert reader.query(_vector(2), n_results=1)[0].id == "b"
+
+    writer.upsert(["a"], ["alpha v2"], [_vector(5)], [{}])
+    writer.compact()
+    hits = reader.query(_vector(5), n_results=2)
+    assert [(hit.id, hit.document) for hit in hits][0] == ("a", "alpha v2")
+    assert len(reader) == 2
+    writer.close()
+    reader.close()
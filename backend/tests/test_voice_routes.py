@@ -0,0 +1,105 @@
+from __future__ import annotations
+
+import asyncio
+import time
+from typing import Any, Dict, List
+
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from core.config import Settings
+from routes import voice as voice_routes
+from services.executor import InferenceExecutor, get_inference_executor
+from services.stt import get_stt_service
+
+
+class _FakeStt:
+    settings = Settings()
+
+    def transcribe(self, pcm, *, sample_rate, language=None):
+        raise AssertionError("a malformed payload must not reach the model")
+
+
+@pytest.fixture()
+def client():
+    executor = InferenceExecutor(Settings(vad_enabled=False))
+    app = FastAPI()
+    app.include_router(voice_routes.router)
+    app.dependency_overrides[get_stt_service] = lambda: _FakeStt()
+    app.dependency_overrides[get_inference_executor] = lambda: executor
+    yield TestClient(app)
+    executor.shutdown()
+
+
+@pytest.mark.parametrize(
+    "payload",
+    [
+        b"RIFF\x00\x00\x00\x00WAVEjunk",  # no fmt chunk
+        b"RIFF\x24\x00\x00\x00WAVEfmt ",  # truncated header
+    ],
+)
+def test_malformed_wav_is_a_client_error(client, payload):
+    response = client.post(
+        "/voice/transcribe/raw",
+        content=payload,
+        headers={"content-type": "audio/wav"},
+    )
+    assert response.status_code == 400
+    assert "WAV" in response.json()["detail"]
+
+
+class _SlowTranscriber:
+    pushes: List[int] = []
+
+    def __init__(self, stt, *, sample_rate, language=None):
+        self.received = 0
+
+    def push(self, pcm: bytes) -> None:
+        time.sleep(0.05)
+        self.pushes.append(len(pcm))
+        self.received += len(pcm)
+
+    def finalize(self, pcm: bytes) -> Dict[str, Any]:
+        self.pushes.append(len(pcm))
+        self.received += len(pcm)
+        return {"text": str(self.received)}
+
+
+class _StreamedRequest:
+    headers = {"content-type": "audio/l16"}
+
+    def __init__(self, chunks: List[bytes]):
+        self._chunks = chunks
+
+    async def stream(self):
+        for chunk in self._chunks:
+            yield chunk
+
+
+def test_streamed_upload_waits_for_the_running_pass(monkeypatch):
+    monkeypatch.setattr(voice_routes, "StreamingTranscriber", _SlowTranscriber)
+    monkeypatch.setattr(_SlowTranscriber, "pushes", [])
+    settings = Settings(
+        vad_enabled=False, stt_upload_step_seconds=0.1, stt_stream_window_seconds=0.2
+    )
+    stt = _FakeStt()
+    stt.settings = settings
+    executor = InferenceExecutor(settings)
+    chunk = b"\x00\x01" * 800  # 50 ms of 16 kHz PCM16
+    try:
+        response = asyncio.run(
+            voice_routes.transcribe_stream_endpoint(
+                _StreamedRequest([chunk] * 60),
+                sample_rate=16000,
+                language=None,
+                stt=stt,
+                executor=executor,
+            )
+        )
+    finally:
+        executor.shutdown()
+
+    assert response.text == str(60 * len(chunk))
+    max_pending = int(0.2 * 16000) * 2
+    assert max(_SlowTranscriber.pushes) < max_pending + len(chunk)
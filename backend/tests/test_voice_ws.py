@@ -0,0 +1,157 @@
+from __future__ import annotations
+
+import asyncio
+import threading
+from typing import List
+
+import pytest
+
+import routes.voice_ws as voice_ws
+from core.config import Settings
+from services.chat import ChatService
+from services.executor import InferenceExecutor
+from services.tts import TTSResult
+
+WEBM_HEADER = voice_ws.EBML_MAGIC + b"header"
+
+
+class _FakeDecoder:
+    """Records the chunks fed to it instead of running FFmpeg."""
+
+    def __init__(self, sr: int = 16000):
+        self.chunks: List[bytes] = []
+
+    @property
+    def running(self) -> bool:
+        return bool(self.chunks)
+
+    async def feed(self, chunk: bytes) -> None:
+        self.chunks.append(chunk)
+
+    async def close(self) -> None:
+        pass
+
+
+class _FakeStt:
+    settings = Settings()
+
+
+@pytest.fixture()
+def make_session(monkeypatch):
+    monkeypatch.setattr(voice_ws, "StreamingPcmDecoder", _FakeDecoder)
+    executor = InferenceExecutor(Settings(vad_enabled=False))
+    yield lambda: voice_ws.VoiceSession(None, _FakeStt(), None, executor)
+    executor.shutdown()
+
+
+def _flushed(session) -> List[List[bytes]]:
+    recordings = []
+    while not session._stt_jobs.empty():
+        kind, decoder = session._stt_jobs.get_nowait()
+        if kind == "flush":
+            recordings.append(decoder.chunks)
+    return recordings
+
+
+def test_late_tail_after_flush_is_dropped(make_session):
+    async def scenario():
+        session = make_session()
+        await session.on_audio(WEBM_HEADER)
+        await session.on_audio(b"cluster-1")
+        await session.on_text('{"type": "flush"}')
+        await session.on_audio(b"late-tail")
+        await session.on_audio(WEBM_HEADER)
+        await session.on_audio(b"cluster-2")
+        return session
+
+    session = asyncio.run(scenario())
+    assert _flushed(session) == [[WEBM_HEADER, b"cluster-1"]]
+    assert session.decoder.chunks == [WEBM_HEADER, b"cluster-2"]
+
+
+def test_new_header_finishes_the_previous_recording(make_session):
+    async def scenario():
+        session = make_session()
+        await session.on_audio(WEBM_HEADER)
+        await session.on_audio(b"cluster-1")
+        await session.on_audio(WEBM_HEADER)
+        return session
+
+    session = asyncio.run(scenario())
+    assert _flushed(session) == [[WEBM_HEADER, b"cluster-1"]]
+    assert session.decoder.chunks == [WEBM_HEADER]
+
+
+class _FakeTts:
+    def synthesize(self, text, *, voice=None, lang=None):
+        return TTSResult(audio=f"audio:{text}".encode(), format="wav", sample_rate=16000)
+
+
+@pytest.mark.parametrize("message, streamed", [({}, False), ({"stream": True}, True)])
+def test_speak_streams_only_when_asked(monkeypatch, message, streamed):
+    executor = InferenceExecutor(Settings(vad_enabled=False))
+    session = voice_ws.VoiceSession(None, _FakeStt(), _FakeTts(), executor)
+    sent = []
+
+    async def fake_stream_speech(text, **kwargs):
+        sent.append(("stream", text))
+
+    async def fake_send_audio(result, **kwargs):
+        sent.append(("audio", result))
+
+    monkeypatch.setattr(session, "_stream_speech", fake_stream_speech)
+    monkeypatch.setattr(session, "send_audio", fake_send_audio)
+    try:
+        asyncio.run(session._handle_speak({"text": "Merhaba.", **message}))
+    finally:
+        executor.shutdown()
+    expected = ("stream", "Merhaba.") if streamed else ("audio", _FakeTts().synthesize("Merhaba."))
+    assert sent == [expected]
+
+
+class _RecordingSocket:
+    def __init__(self):
+        self.sent: List[dict] = []
+        self.first_audio = threading.Event()
+
+    async def send_json(self, payload):
+        self.sent.append(payload)
+        if payload["type"] == "tts_chunk":
+            self.first_audio.set()
+
+
+def test_turn_speaks_the_first_sentence_while_the_reply_is_produced(memory, monkeypatch):
+    chat = ChatService(memory_service=memory)
+    socket = _RecordingSocket()
+
+    def iter_reply(session_id, message, context, *, mode="text"):
+        yield "Merhaba. "
+        # Only reachable without a deadlock if the first sentence was spoken.
+        assert socket.first_audio.wait(timeout=5.0)
+        yield "Nasılsın?"
+
+    monkeypatch.setattr(chat, "iter_reply", iter_reply)
+    monkeypatch.setattr(voice_ws, "get_chat_service", lambda: chat)
+    executor = InferenceExecutor(Settings(vad_enabled=False))
+    session = voice_ws.VoiceSession(socket, _FakeStt(), _FakeTts(), executor)
+    config = {
+        "session_id": "s1",
+        "user_id": None,
+        "voice": None,
+        "language": None,
+        "binary": False,
+        "speak": True,
+    }
+    try:
+        asyncio.run(session._run_turn({"text": "selam", "config": config}))
+    finally:
+        executor.shutdown()
+
+    kinds = [(payload["type"], payload.get("text")) for payload in socket.sent]
+    assert kinds == [
+        ("tts_chunk", "Merhaba."),
+        ("tts_chunk", "Nasılsın?"),
+        ("tts_end", None),
+        ("reply", "Merhaba. Nasılsın?"),
+    ]
+    assert [m["role"] for m in memory.list_messages("s1")] == ["user", "assistant"]
@@ -0,0 +1,43 @@
+from __future__ import annotations
+
+import pytest
+
+from core.config import Settings
+from services.migrations import apply_migrations
+from services.sqlite import SQLiteConnectionManager
+from services.write_behind import MessageWriteBehind
+
+
+def _db(tmp_path, *, migrate: bool = True) -> SQLiteConnectionManager:
+    db = SQLiteConnectionManager(Settings(sqlite_path=str(tmp_path / "tohum.db")))
+    if migrate:
+        with db.write() as cur:
+            apply_migrations(cur)
+    return db
+
+
+def test_wait_for_times_out(tmp_path):
+    db = _db(tmp_path)
+    settings = Settings(message_flush_interval_ms=10_000, message_flush_max_rows=100)
+    writer = MessageWriteBehind(db, settings)
+    try:
+        seq = writer.enqueue("m1", "s1", "user", "hi")
+        assert writer.wait_for(seq, timeout=0.05) is False
+        assert writer.flush(timeout=5.0) is True
+    finally:
+        writer.close()
+        db.close()
+
+
+def test_wait_for_raises_writer_error(tmp_path):
+    # Without the schema every flush fails.
+    db = _db(tmp_path, migrate=False)
+    writer = MessageWriteBehind(db, Settings(message_flush_interval_ms=1))
+    try:
+        seq = writer.enqueue("m1", "s1", "user", "hi")
+        with pytest.raises(RuntimeError, match="Message writer failed"):
+            writer.wait_for(seq, timeout=5.0)
+        assert writer.last_error is not None
+    finally:
+        writer.close(timeout=1.0)
+        db.close()
@@ -18,6 +18,7 @@ export function VoiceButton() {
   const wsRef = useRef(null);
   const recorderRef = useRef(null);
   const streamRef = useRef(null);
+  const sendQueueRef = useRef(Promise.resolve());
 
   useEffect(() => {
     connect();
@@ -97,9 +98,19 @@ export function VoiceButton() {
     }
     cleanupStream();
     setIsRecording(false);
-    if (wsRef.current && wsRef.current.readyState === WebSocket.OPEN) {
-      wsRef.current.send(JSON.stringify({ type: "flush" }));
-    }
+  };
+
+  // Chunks are sent in order through one promise chain, so `flush` can only
+  // go out after the recorder's final chunk.
+  const enqueueSend = (producePayload) => {
+    sendQueueRef.current = sendQueueRef.current
+      .then(async () => {
+        const payload = await producePayload();
+        if (wsRef.current && wsRef.current.readyState === WebSocket.OPEN) {
+          wsRef.current.send(payload);
+        }
+      })
+      .catch((sendError) => console.warn("Voice socket send failed", sendError));
   };
 
   const startRecording = async () => {
@@ -129,19 +140,15 @@ export function VoiceButton() {
       recorderRef.current = recorder;
       resetPartial();
 
-      recorder.ondataavailable = async (event) => {
-        if (
-          event.data.size > 0 &&
-          wsRef.current &&
-          wsRef.current.readyState === WebSocket.OPEN
-        ) {
-          const buffer = await event.data.arrayBuffer();
-          wsRef.current.send(buffer);
+      recorder.ondataavailable = (event) => {
+        if (event.data.size > 0) {
+          enqueueSend(() => event.data.arrayBuffer());
         }
       };
 
       recorder.onstop = () => {
         cleanupStream();
+        enqueueSend(() => JSON.stringify({ type: "flush" }));
       };
 
       recorder.start(250);